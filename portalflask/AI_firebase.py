@@ -1,19 +1,50 @@
-from flask import Flask, render_template, request, redirect, url_for, session, send_file, flash, Response, jsonify
+from flask import (Flask, render_template, request, redirect, url_for, session, send_file, flash, Response, jsonify,
+                   stream_with_context)
 from werkzeug.utils import secure_filename
-import pandas as pd
 import os
+import functools
 from datetime import datetime, timedelta
-import hashlib
 import base64
+import hmac
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from .firebase_config import firebase_config
+from .firebase_config import firebase_config, LazyBucket
+from .repositories import (StudentRepo, BatchRepo, FileRepo, TrackingRepo, CredentialRepo, FeedbackRepo,
+                           MessageRepo)
+from .cache import TimedCache
+from .auth_service import AuthService
+from .credentials import hash_password, is_password_hash
+from .session_store import configure_session_store, regenerate_session
+from .student_search import StudentSearchIndex, SEARCH_FIELDS, RESULT_FIELDS
+from .id_counters import next_sequence
+from .batch_time import find_batch, resolve_batch_time, display_name
+from .student_import import read_roster, import_students
+from .fee_ledger import (sync_student_ledger, delete_student_ledger, overdue_this_week, collections_this_month,
+                         FEE_FIELDS)
+from .analytics import RevenueAnalytics
+from .reporting_replica import ReportingReplica, TRACKING_FIELDS
+from .exports import (stream_export, iter_documents, STUDENT_EXPORT_FIELDS, TRACKING_EXPORT_FIELDS,
+                      FEEDBACK_EXPORT_FIELDS)
+from .log_config import get_logger
+from .instrumentation import instrument_app, metrics
+from .fanout import gather
 import random
+import secrets
 import re
 
+auth_log = get_logger('auth')
+files_log = get_logger('files')
+students_log = get_logger('students')
+batches_log = get_logger('batches')
+tracking_log = get_logger('tracking')
+messaging_log = get_logger('messaging')
+reports_log = get_logger('reports')
+
 techzone_app = Flask(__name__)
 techzone_app.secret_key = "techzone_secret"
+configure_session_store(techzone_app)
+instrument_app(techzone_app)
 
 # Custom template filter for date formatting
 @techzone_app.template_filter('format_date')
@@ -31,33 +62,51 @@ def format_date(date_str):
 TRAINER_UPLOADS = "static/uploads"
 os.makedirs(TRAINER_UPLOADS, exist_ok=True)
 
-# ---------- Firebase Collections ----------
-if firebase_config.firebase_available:
-    students_collection = firebase_config.get_collection('students')
-    batches_collection = firebase_config.get_collection('batches')
-    trainer_files_collection = firebase_config.get_collection('trainer_files')
-    course_tracking_collection = firebase_config.get_collection('course_tracking')
-    role_credentials_collection = firebase_config.get_collection('role_credentials')
-    student_feedback_collection = firebase_config.get_collection('student_feedback')
-    messages_collection = firebase_config.get_collection('messages')  # For trainer-student messages
-    storage_bucket = firebase_config.storage_bucket
-    print("Firebase collections initialized!")
-else:
-    print("Firebase not available!")
-    students_collection = None
-    batches_collection = None
-    trainer_files_collection = None
-    course_tracking_collection = None
-    role_credentials_collection = None
-    student_feedback_collection = None
-    messages_collection = None
-    storage_bucket = None
-
-FIREBASE_AVAILABLE = firebase_config.firebase_available
-
-# ---------- Utility Functions ----------
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+# ---------- Data Access ----------
+# Repositories (repositories.py) resolve their collections on first use;
+# firebase_available() connects (or retries) on demand
+storage_bucket = LazyBucket(firebase_config)
+student_repo = StudentRepo(firebase_config)
+batch_repo = BatchRepo(firebase_config)
+file_repo = FileRepo(firebase_config, storage_bucket)
+tracking_repo = TrackingRepo(firebase_config)
+credential_repo = CredentialRepo(firebase_config)
+feedback_repo = FeedbackRepo(firebase_config)
+message_repo = MessageRepo(firebase_config)  # For trainer-student messages
+
+students_collection = student_repo.collection
+batches_collection = batch_repo.collection
+trainer_files_collection = file_repo.collection
+course_tracking_collection = tracking_repo.collection
+role_credentials_collection = credential_repo.collection
+student_feedback_collection = feedback_repo.collection
+messages_collection = message_repo.collection
+
+# Fields each list view reads. List queries select() only these, so base64 file
+# copies, passwords and read_by arrays are not transferred for a listing.
+VIEW_FIELDS = {
+    'batches': ['batch_name', 'original_batch_name', 'start_time', 'end_time', 'batch_start_date', 'description'],
+    'batch_files': ['batch_id', 'original_filename', 'uploaded_by', 'timestamp', 'file_size'] + FileRepo.SOURCE_FIELDS,
+    'student_feedback': FEEDBACK_EXPORT_FIELDS + ['student_id'],
+    'feedback_students': ['student_id', 'student_name', 'student_number', 'batch_time'],
+    'student_search': sorted(set(SEARCH_FIELDS) | set(RESULT_FIELDS)),
+}
+
+def firebase_available():
+    """True when Firebase is connected; the first call (or a retry after a failure) connects"""
+    return firebase_config.firebase_available
+
+# Lets templates hide stored password hashes: {% if student.password is password_hash %}
+techzone_app.add_template_test(is_password_hash, 'password_hash')
+
+# ---------- Login Caches ----------
+# Role credentials and the batch list change rarely but are read on every login,
+# so both are cached in-process and invalidated by the functions that write them.
+auth_service = AuthService(
+    role_credentials_collection,
+    students_collection=students_collection,
+    ttl_seconds=int(os.environ.get('CREDENTIAL_CACHE_TTL', '300'))
+)
 
 # ---------- File Download Route ----------
 @techzone_app.route("/download/<filename>")
@@ -65,14 +114,14 @@ def download_file(filename):
     if not session.get("logged_in"):
         return redirect(url_for("login"))
     
-    print(f"[DEBUG] Download request for file: {filename} by user: {session.get('username')} with role: {session.get('role')}")
+    files_log.debug("Download request for file: %s by user: %s with role: %s", filename, session.get('username'), session.get('role'))
 
     # For student users, check if they can access this file
     if session.get("role") == "Student":
         student_batch_id = session.get("student_batch")  # This should be the batch _id
-        print(f"[DEBUG] Student batch ID from session: {student_batch_id}")
+        files_log.debug("Student batch ID from session: %s", student_batch_id)
         
-        if student_batch_id and FIREBASE_AVAILABLE and trainer_files_collection is not None:
+        if student_batch_id and firebase_available():
             try:
                 # Check if file belongs to student's batch
                 file_record = None
@@ -83,26 +132,26 @@ def download_file(filename):
                 
                 if file_record:
                     file_batch_id = file_record.get('batch_id')
-                    print(f"[DEBUG] File batch_id: {file_batch_id}, Student batch_id: {student_batch_id}")
+                    files_log.debug("File batch_id: %s, Student batch_id: %s", file_batch_id, student_batch_id)
                     
                     # Convert both to strings for comparison
                     if str(file_batch_id) != str(student_batch_id):
-                        print(f"[DEBUG] Access denied: File batch {file_batch_id} != Student batch {student_batch_id}")
+                        files_log.debug("Access denied: File batch %s != Student batch %s", file_batch_id, student_batch_id)
                         flash("You can only download files from your enrolled batch!", "danger")
                         return redirect(url_for("dashboard"))
                     else:
-                        print(f"[DEBUG] Access granted: File belongs to student's batch")
+                        files_log.debug("Access granted: File belongs to student's batch")
                 else:
-                    print(f"[DEBUG] File record not found for filename: {filename}")
+                    files_log.debug("File record not found for filename: %s", filename)
                     flash("File not found in database!", "danger")
                     return redirect(url_for("dashboard"))
             except Exception as e:
-                print(f"Error checking file access: {e}")
+                files_log.error("Error checking file access: %s", e)
                 flash("Error checking file access!", "danger")
                 return redirect(url_for("dashboard"))
 
     # Try to get file from Firebase Storage or Firestore
-    if FIREBASE_AVAILABLE and trainer_files_collection is not None:
+    if firebase_available():
         try:
             file_record = None
             docs = trainer_files_collection.where('filename', '==', filename).stream()
@@ -124,7 +173,7 @@ def download_file(filename):
                             response.headers['Content-Disposition'] = f'attachment; filename="{original_filename}"'
                             return response
                     except Exception as storage_e:
-                        print(f"Error downloading from Firebase Storage: {storage_e}")
+                        files_log.error("Error downloading from Firebase Storage: %s", storage_e)
                 
                 # Fallback to base64 data if available
                 if file_record.get("file_data_base64"):
@@ -150,7 +199,7 @@ def download_file(filename):
                     response.headers['Content-Disposition'] = f'attachment; filename="{original_filename}"'
                     return response
         except Exception as e:
-            print(f"Error downloading from Firebase: {e}")
+            files_log.error("Error downloading from Firebase: %s", e)
 
     # Fallback to file system
     file_path = os.path.join(TRAINER_UPLOADS, filename)
@@ -158,7 +207,7 @@ def download_file(filename):
         try:
             return send_file(file_path, as_attachment=True)
         except Exception as e:
-            print(f"Error sending file from filesystem: {e}")
+            files_log.error("Error sending file from filesystem: %s", e)
             try:
                 with open(file_path, 'rb') as f:
                     file_data = f.read()
@@ -166,7 +215,7 @@ def download_file(filename):
                 response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
                 return response
             except Exception as e2:
-                print(f"Error reading file manually: {e2}")
+                files_log.error("Error reading file manually: %s", e2)
     flash("File not found!", "danger")
     return redirect(url_for("dashboard"))
 
@@ -177,7 +226,7 @@ def delete_file(filename):
         return redirect(url_for("login"))
     username = session.get("username")
     # Check if the file belongs to the current trainer
-    if FIREBASE_AVAILABLE and trainer_files_collection is not None:
+    if firebase_available():
         try:
             file_record = None
             docs = trainer_files_collection.where('filename', '==', filename).stream()
@@ -188,7 +237,7 @@ def delete_file(filename):
                 flash("You can only delete files you uploaded!", "danger")
                 return redirect(url_for("dashboard"))
         except Exception as e:
-            print(f"Error checking file ownership: {e}")
+            files_log.error("Error checking file ownership: %s", e)
     if not filename.startswith(username):
         flash("You can only delete files you uploaded!", "danger")
         return redirect(url_for("dashboard"))
@@ -201,104 +250,31 @@ def delete_file(filename):
 # ---------- Trainer File Management Functions ----------
 def get_trainer_files_by_user(username):
     """Get all files uploaded by a specific trainer"""
-    if not FIREBASE_AVAILABLE or trainer_files_collection is None:
-        return []
-    try:
-        docs = trainer_files_collection.where(filter=('uploaded_by', '==', username)).stream()
-        files = []
-        for doc in docs:
-            file_data = doc.to_dict()
-            file_data['_id'] = doc.id
-            files.append(file_data)
-        return files
-    except Exception as e:
-        print(f"Error getting trainer files: {e}")
-        return []
+    return file_repo.by_uploader(username)
 
 def get_trainer_files_by_batch(batch_id):
     """Get all trainer files for a specific batch - with cleanup of orphaned records"""
-    if not FIREBASE_AVAILABLE or trainer_files_collection is None:
-        return []
-    try:
-        # Convert batch_id to string to match Firestore storage format
-        batch_id_str = str(batch_id)
-        print(f"[DEBUG] Looking for files with batch_id: '{batch_id_str}'")
-        
-        docs = trainer_files_collection.where('batch_id', '==', batch_id_str).stream()
-        files = []
-        orphaned_docs = []
-        
-        for doc in docs:
-            file_data = doc.to_dict()
-            file_data['_id'] = doc.id
-            filename = file_data.get('filename')
-            
-            # Check if file actually exists in Firebase Storage
-            file_exists_in_storage = False
-            if file_data.get('uploaded_to_storage') and storage_bucket:
-                try:
-                    storage_path = file_data.get('storage_path', f"trainer_uploads/{filename}")
-                    blob = storage_bucket.blob(storage_path)
-                    if blob.exists():
-                        file_exists_in_storage = True
-                    else:
-                        print(f"[DEBUG] File {filename} missing from Storage, checking for base64 backup")
-                        # If no base64 backup either, mark as orphaned
-                        if not file_data.get('file_data_base64'):
-                            print(f"[DEBUG] File {filename} has no base64 backup - marking as orphaned")
-                            orphaned_docs.append(doc)
-                            continue
-                except Exception as e:
-                    print(f"[DEBUG] Error checking storage for {filename}: {e}")
-                    # If storage check fails but has base64, keep it
-                    if not file_data.get('file_data_base64'):
-                        orphaned_docs.append(doc)
-                        continue
-            
-            # Keep files that either exist in storage OR have base64 backup
-            if file_exists_in_storage or file_data.get('file_data_base64'):
-                files.append(file_data)
-                print(f"[DEBUG] Found valid file: {filename} for batch {file_data.get('batch_id')}")
-            else:
-                print(f"[DEBUG] File {filename} has no valid source - marking as orphaned")
-                orphaned_docs.append(doc)
-        
-        # Clean up orphaned records
-        if orphaned_docs:
-            print(f"[DEBUG] Cleaning up {len(orphaned_docs)} orphaned file records")
-            for doc in orphaned_docs:
-                try:
-                    print(f"[DEBUG] Deleting orphaned record: {doc.to_dict().get('filename')}")
-                    doc.reference.delete()
-                except Exception as e:
-                    print(f"[DEBUG] Error deleting orphaned record: {e}")
-        
-        print(f"[DEBUG] Total valid files found for batch {batch_id_str}: {len(files)}")
-        return files
-    except Exception as e:
-        print(f"Error getting trainer files by batch: {e}")
-        return []
+    files = []
+    orphaned_ids = []
+    for file_data in file_repo.by_batch(batch_id, VIEW_FIELDS['batch_files']):
+        # Keep files that either exist in storage OR have base64 backup
+        if file_repo.is_orphaned(file_data):
+            files_log.debug("File %s has no valid source - marking as orphaned", file_data.get('filename'))
+            orphaned_ids.append(file_data['_id'])
+        else:
+            files.append(file_data)
+
+    # Clean up orphaned records
+    if orphaned_ids:
+        files_log.info("Cleaning up %d orphaned file records", len(orphaned_ids))
+        file_repo.delete_many(orphaned_ids)
+
+    files_log.debug("Total valid files found for batch %s: %d", batch_id, len(files))
+    return files
 
 def delete_trainer_file(filename, uploaded_by):
     """Delete trainer file from both Firestore and Firebase Storage"""
-    if not FIREBASE_AVAILABLE or trainer_files_collection is None:
-        return False
-    try:
-        # Delete from Firestore
-        docs = trainer_files_collection.where('filename', '==', filename).where('uploaded_by', '==', uploaded_by).stream()
-        for doc in docs:
-            doc.reference.delete()
-        
-        # Delete from Firebase Storage
-        if storage_bucket:
-            blob = storage_bucket.blob(f"trainer_uploads/{filename}")
-            if blob.exists():
-                blob.delete()
-        
-        return True
-    except Exception as e:
-        print(f"Error deleting trainer file: {e}")
-        return False
+    return file_repo.delete_upload(filename, uploaded_by)
 
 # ---------- File Cleanup Utilities ----------
 @techzone_app.route("/admin/cleanup-files", methods=["GET", "POST"])
@@ -321,105 +297,36 @@ def cleanup_files():
 
 def cleanup_orphaned_file_records():
     """Clean up all orphaned file records across all collections"""
-    if not FIREBASE_AVAILABLE or trainer_files_collection is None:
-        return -1
-    
-    try:
-        print("[CLEANUP] Starting cleanup of orphaned file records...")
-        
-        docs = trainer_files_collection.stream()
-        orphaned_docs = []
-        total_checked = 0
-        
-        for doc in docs:
-            total_checked += 1
-            file_data = doc.to_dict()
-            filename = file_data.get('filename')
-            
-            # Check if file actually exists in Firebase Storage or has base64 backup
-            file_exists_in_storage = False
-            has_base64_backup = bool(file_data.get('file_data_base64'))
-            
-            if file_data.get('uploaded_to_storage') and storage_bucket:
-                try:
-                    storage_path = file_data.get('storage_path', f"trainer_uploads/{filename}")
-                    blob = storage_bucket.blob(storage_path)
-                    if blob.exists():
-                        file_exists_in_storage = True
-                    else:
-                        print(f"[CLEANUP] File {filename} missing from Storage")
-                except Exception as e:
-                    print(f"[CLEANUP] Error checking storage for {filename}: {e}")
-            
-            # Mark as orphaned if no valid source exists
-            if not file_exists_in_storage and not has_base64_backup:
-                print(f"[CLEANUP] File {filename} has no valid source - marking as orphaned")
-                orphaned_docs.append(doc)
-        
-        # Clean up orphaned records
-        cleaned_count = 0
-        if orphaned_docs:
-            print(f"[CLEANUP] Cleaning up {len(orphaned_docs)} orphaned file records")
-            for doc in orphaned_docs:
-                try:
-                    orphaned_filename = doc.to_dict().get('filename')
-                    print(f"[CLEANUP] Deleting orphaned record: {orphaned_filename}")
-                    doc.reference.delete()
-                    cleaned_count += 1
-                except Exception as e:
-                    print(f"[CLEANUP] Error deleting orphaned record: {e}")
-        
-        print(f"[CLEANUP] Cleanup completed. Checked {total_checked} files, removed {cleaned_count} orphaned records")
-        return cleaned_count
-    except Exception as e:
-        print(f"Error during cleanup: {e}")
+    if not firebase_available():
         return -1
 
+    files_log.info("Starting cleanup of orphaned file records...")
+    records = file_repo.all(FileRepo.SOURCE_FIELDS)
+    orphaned_ids = [record['_id'] for record in records if file_repo.is_orphaned(record)]
+
+    # Clean up orphaned records
+    cleaned_count = 0
+    if orphaned_ids:
+        files_log.info("Cleaning up %d orphaned file records", len(orphaned_ids))
+        cleaned_count = file_repo.delete_many(orphaned_ids)
+
+    files_log.info("Cleanup completed. Checked %d files, removed %d orphaned records", len(records), cleaned_count)
+    return cleaned_count
+
 def get_orphaned_file_count():
     """Get count of orphaned file records"""
-    if not FIREBASE_AVAILABLE or trainer_files_collection is None:
-        return 0
-    
-    try:
-        docs = trainer_files_collection.stream()
-        orphaned_count = 0
-        
-        for doc in docs:
-            file_data = doc.to_dict()
-            filename = file_data.get('filename')
-            
-            # Check if file actually exists in Firebase Storage or has base64 backup
-            file_exists_in_storage = False
-            has_base64_backup = bool(file_data.get('file_data_base64'))
-            
-            if file_data.get('uploaded_to_storage') and storage_bucket:
-                try:
-                    storage_path = file_data.get('storage_path', f"trainer_uploads/{filename}")
-                    blob = storage_bucket.blob(storage_path)
-                    if blob.exists():
-                        file_exists_in_storage = True
-                except Exception as e:
-                    pass  # Ignore errors during count
-            
-            # Count as orphaned if no valid source exists
-            if not file_exists_in_storage and not has_base64_backup:
-                orphaned_count += 1
-        
-        return orphaned_count
-    except Exception as e:
-        print(f"Error counting orphaned files: {e}")
-        return 0
+    return sum(1 for record in file_repo.all(FileRepo.SOURCE_FIELDS) if file_repo.is_orphaned(record))
 
 # ---------- Student Management Functions ----------
 def generate_student_id_simple(course_initials, phone_number):
     """Generate automatic student ID with format: INITIALS PHONE_NUMBER (e.g., MDA 7456890321)"""
-    if not FIREBASE_AVAILABLE or students_collection is None:
+    if not firebase_available():
         return f"{course_initials} {phone_number}"
     
     try:
         # Check if this exact student ID already exists
         existing_student_id = f"{course_initials} {phone_number}"
-        docs = students_collection.where(filter=('student_id', '==', existing_student_id)).stream()
+        docs = students_collection.where('student_id', '==', existing_student_id).stream()
         
         # If the exact ID exists, return None to indicate it should not be used
         for doc in docs:
@@ -428,7 +335,7 @@ def generate_student_id_simple(course_initials, phone_number):
         return existing_student_id
         
     except Exception as e:
-        print(f"Error generating simple student ID: {e}")
+        students_log.error("Error generating simple student ID: %s", e)
         return f"{course_initials} {phone_number}"
 
 def generate_student_id(course_initials, batch_start_time, batch_end_time, batch_start_date):
@@ -441,41 +348,12 @@ def generate_student_id(course_initials, batch_start_time, batch_end_time, batch
     if batch_start_date == 'Unknown':
         batch_start_date = 'TBD'
         
-    if not FIREBASE_AVAILABLE or students_collection is None:
+    if not firebase_available():
         return f"{course_initials}001 ({batch_start_time})-({batch_end_time}) ({batch_start_date})"
     
     try:
-        @techzone_app.route("/debug/students")
-        def debug_students():
-            if not FIREBASE_AVAILABLE or students_collection is None:
-                return "Students collection not available."
-            students = students_collection.stream()
-            html = "<h2>All Students and batch_time</h2><table border='1'><tr><th>Username</th><th>Password</th><th>Batch Time</th></tr>"
-            for student in students:
-                data = student.to_dict()
-                html += f"<tr><td>{data.get('username')}</td><td>{data.get('password')}</td><td>{data.get('batch_time')}</td></tr>"
-            html += "</table>"
-            return html
-
-        # Get all existing students with the same course initials
-        docs = students_collection.where('course_initials', '==', course_initials).stream()
-        existing_numbers = []
-        
-        for doc in docs:
-            student_data = doc.to_dict()
-            student_id = student_data.get('student_id', '')
-            # Extract number from student ID (e.g., EPE003 -> 3)
-            if student_id.startswith(course_initials):
-                try:
-                    # Find the number part between initials and first space/parenthesis
-                    id_part = student_id[len(course_initials):].split(' ')[0].split('(')[0]
-                    if id_part.isdigit():
-                        existing_numbers.append(int(id_part))
-                except (ValueError, IndexError):
-                    continue
-        
-        # Get the next sequential number
-        next_number = max(existing_numbers, default=0) + 1
+        # Next number from the per-initials counter (seeded by `python -m portalflask.id_counters backfill`)
+        next_number = next_sequence(firebase_config.db, course_initials)
         
         # Format the student ID with proper format: EPE001 (4:00)-(5:00) (01-AUG-2025)
         formatted_number = f"{next_number:03d}"  # 001, 002, etc.
@@ -484,47 +362,79 @@ def generate_student_id(course_initials, batch_start_time, batch_end_time, batch
         return student_id
         
     except Exception as e:
-        print(f"Error generating student ID: {e}")
+        students_log.error("Error generating student ID: %s", e)
         # Fallback ID generation
         return f"{course_initials}001 ({batch_start_time})-({batch_end_time}) ({batch_start_date})"
 
-def get_all_students():
-    """Get all students from Firestore"""
-    if not FIREBASE_AVAILABLE or students_collection is None:
-        return []
-    try:
-        docs = students_collection.stream()
-        students = []
-        for doc in docs:
-            student_data = doc.to_dict()
-            student_data['_id'] = doc.id
-            students.append(student_data)
-        return students
-    except Exception as e:
-        print(f"Error getting students: {e}")
-        return []
+def get_all_students(fields=None):
+    """Get all students from Firestore (only the given fields, if any)"""
+    return student_repo.all(fields)
+
+# Built from get_all_students() on first search, then kept current by the add/update/delete hooks below
+student_search_index = StudentSearchIndex(
+    lambda: get_all_students(VIEW_FIELDS['student_search']),
+    rebuild_seconds=int(os.environ.get('STUDENT_SEARCH_REBUILD_SECONDS', '600'))
+)
+
+revenue_analytics = RevenueAnalytics(
+    lambda: firebase_config.db if firebase_available() else None,
+    os.environ.get('ANALYTICS_DIR', 'analytics_cache'),
+    refresh_seconds=int(os.environ.get('ANALYTICS_REFRESH_SECONDS', '60'))
+)
+
+# SQLite copy of the reporting fields; writes below expire it, deletions force a rebuild
+reporting_replica = ReportingReplica(
+    lambda: firebase_config.db if firebase_available() else None,
+    os.environ.get('REPORTING_DB_PATH', 'techzone_reports.sqlite3'),
+    refresh_seconds=int(os.environ.get('REPORTING_REFRESH_SECONDS', '60'))
+)
+
+STUDENT_PAGE_SIZE = int(os.environ.get('STUDENT_PAGE_SIZE', '50'))
+
+def get_students_page(batch_time=None, fees_status=None, page_size=STUDENT_PAGE_SIZE, after=None, before=None):
+    """Get one page of students filtered server-side, ordered by document ID (see StudentRepo.page)"""
+    return student_repo.page(batch_time, fees_status, page_size=page_size, after=after, before=before)
+
+def find_student_by_student_id(student_id):
+    """Look up a student by student ID: a direct document read, falling back to an indexed query"""
+    student = get_student_by_id(student_id)
+    if student:
+        return student
+    # Documents are keyed by the student ID they were created with; it can change on update
+    return student_repo.find_one('student_id', student_id)
+
+def find_student_conflict(student_data, exclude_doc_id=None):
+    """Return an error message if student_id, email or username is taken by another student, else None.
+
+    Each field is checked with an indexed equality query instead of scanning every student.
+    """
+    unique_fields = [
+        ('student_id', "student id already exists"),
+        ('email', "student email already exists"),
+        ('username', "username already exists"),
+    ]
+    for field, error in unique_fields:
+        value = student_data.get(field)
+        if not value:
+            continue
+        if any(doc_id != exclude_doc_id for doc_id in student_repo.holders(field, value)):
+            students_log.warning("%s %s already exists for another student", field, value)
+            return error
+    return None
 
 def add_student(student_data):
     # Use batch_id from form if present, else resolve from batch_time
     if 'batch_id' in student_data and student_data['batch_id']:
-        print('[DEBUG] Using batch_id from form:', student_data['batch_id'])
+        students_log.debug("Using batch_id from form: %s", student_data['batch_id'])
     else:
-        # Try to find batch_id by matching batch_time or batch_name
-        batch_name = student_data.get('batch_time') or student_data.get('batch_name')
-        batch_id = None
-        if batch_name and batches_collection is not None:
-            all_batches = batches_collection.stream()
-            for batch_doc in all_batches:
-                batch = batch_doc.to_dict()
-                display_name = f"{batch.get('original_batch_name') or batch.get('batch_name', '')} ({batch.get('start_time', '')})-({batch.get('end_time', '')}) ({batch.get('batch_start_date', '')})"
-                if display_name == batch_name:
-                    batch_id = batch_doc.id
-                    break
+        # Try to find batch_id by matching batch_time or batch_name against the batch catalog
+        batch = find_batch(student_data.get('batch_time') or student_data.get('batch_name'), get_cached_batches())
+        batch_id = batch['_id'] if batch else None
         if batch_id:
             student_data['batch_id'] = batch_id
-            print('[DEBUG] Resolved batch_id from batch_time:', batch_id)
+            students_log.debug("Resolved batch_id from batch_time: %s", batch_id)
         else:
-            print('[WARN] Could not resolve batch_id for student:', student_data)
+            students_log.warning("Could not resolve batch_id for student: %s", student_data.get('student_name'))
     # Check OTP verification
     if not session.get('student_email_otp_verified') or session.get('student_email_otp_email') != student_data.get('email'):
         return {"success": False, "error": "Email OTP not verified. Please verify the email before adding the student."}
@@ -532,93 +442,20 @@ def add_student(student_data):
     session.pop('student_email_otp_verified', None)
     session.pop('student_email_otp', None)
     session.pop('student_email_otp_email', None)
-    if not FIREBASE_AVAILABLE or students_collection is None:
-        print("Firebase not available or students collection is None.")
+    if not firebase_available():
+        students_log.warning("Firebase not available.")
         return {"success": False, "error": "Firebase not available"}
     try:
-        print(f"Adding student with data: {student_data}")
+        students_log.info("Adding student %s (%s)", student_data.get('student_name'), student_data.get('email'))
         enrollment_datetime = datetime.now()
         enrollment_date = enrollment_datetime.strftime('%d-%m-%Y')
         enrollment_time = enrollment_datetime.strftime('%I:%M %p')
         assert 'student_name' in student_data, "Student name missing"
         assert isinstance(student_data['total_fees'], float), "Total fees must be a number"
-        existing_students = get_all_students()
-        if student_data.get('student_id'):
-            for student in existing_students:
-                if student.get('student_id') == student_data['student_id']:
-                    print(f"Student ID {student_data['student_id']} already exists")
-                    return {"success": False, "error": "student id already exists"}
-        if student_data.get('email'):
-            for student in existing_students:
-                if student.get('email') == student_data['email']:
-                    print(f"Email {student_data['email']} already exists for another student")
-                    return {"success": False, "error": "student email already exists"}
-        if student_data.get('username'):
-            for student in existing_students:
-                if student.get('username') == student_data['username']:
-                    print(f"Username {student_data['username']} already exists for another student")
-                    return {"success": False, "error": "username already exists"}
-        if student_data.get('password'):
-            for student in existing_students:
-                if student.get('password') == student_data['password']:
-                    print(f"Password already exists for another student")
-                    return {"success": False, "error": "password already exists"}
-        print("Validation passed. Processing student addition...")
-        batch_time = student_data.get('batch_time', '')
-        batch_start_time, batch_end_time = 'Unknown', 'Unknown'
-        batch_start_date = 'Unknown'
-        print(f"Debug: Processing batch_time: {batch_time}")
-        if batch_time:
-            # Handle new batch format: "Batch Name (Start Date) (Start Time-End Time)"
-            # Example: "Prompt Engineering (01-AUG-2025) (4:00-5:00)"
-            if '(' in batch_time and ')' in batch_time:
-                try:
-                    last_open = batch_time.rfind('(')
-                    last_close = batch_time.rfind(')')
-                    if last_open != -1 and last_close != -1 and last_close > last_open:
-                        time_section = batch_time[last_open + 1:last_close]
-                        print(f"Debug: Time section extracted: {time_section}")
-                        if '-' in time_section:
-                            times = time_section.split('-')
-                            if len(times) == 2:
-                                batch_start_time = times[0].strip()
-                                batch_end_time = times[1].strip()
-                                print(f"Debug: Extracted times - Start: {batch_start_time}, End: {batch_end_time}")
-                except Exception as e:
-                    print(f"Error parsing times from new format: {e}")
-            if batch_time.count('(') >= 2:
-                try:
-                    first_open = batch_time.find('(')
-                    first_close = batch_time.find(')', first_open)
-                    if first_close != -1:
-                        second_open = batch_time.find('(', first_close + 1)
-                        if second_open != -1:
-                            second_close = batch_time.find(')', second_open)
-                            if second_close != -1:
-                                date_section = batch_time[second_open + 1:second_close]
-                                print(f"Debug: Date section extracted: {date_section}")
-                                if any(char.isdigit() for char in date_section) and '-' in date_section:
-                                    batch_start_date = date_section.upper()
-                                    print(f"Debug: Formatted date: {batch_start_date}")
-                except Exception as e:
-                    print(f"Error parsing date from batch name: {e}")
-            if batch_start_date == 'Unknown':
-                print("Debug: Trying to get date from batch record")
-                selected_batch_name = batch_time.split(' (')[0] if ' (' in batch_time else batch_time
-                print(f"Debug: Selected batch name: {selected_batch_name}")
-                batches = get_all_batches()
-                for batch in batches:
-                    if batch.get('batch_name') == selected_batch_name or batch.get('original_batch_name') == selected_batch_name:
-                        batch_start_date = batch.get('batch_start_date', 'Unknown')
-                        print(f"Debug: Found batch start date: {batch_start_date}")
-                        if batch_start_date != 'Unknown' and batch_start_date:
-                            try:
-                                date_obj = datetime.strptime(batch_start_date, '%Y-%m-%d')
-                                batch_start_date = date_obj.strftime('%d-%b-%Y').upper()
-                                print(f"Debug: Converted date: {batch_start_date}")
-                            except Exception as e:
-                                print(f"Error parsing batch start date: {e}")
-                        break
+        conflict = find_student_conflict(student_data)
+        if conflict:
+            return {"success": False, "error": conflict}
+        students_log.info("Validation passed. Processing student addition...")
         course_initials = student_data.get('course_initials')
         phone_number = student_data.get('student_number')
         if course_initials and phone_number:
@@ -627,469 +464,328 @@ def add_student(student_data):
             if generated_id is None:
                 return {"success": False, "error": "Student ID already exists for this course type and phone number"}
             student_data['student_id'] = generated_id
-            for student in existing_students:
-                if student.get('student_id') == generated_id:
-                    print(f"Student ID {generated_id} already exists (this should not happen with proper generation)")
-                    return {"success": False, "error": "student id already exists"}
+        if student_data.get('password'):
+            student_data['password'] = hash_password(student_data['password'])
         student_data['created_at'] = enrollment_datetime.strftime('%Y-%m-%d %H:%M:%S')
+        # updated_at is the reporting replica's sync watermark, whatever created_at says
+        student_data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         student_data['enrollment_date'] = enrollment_date
         student_data['enrollment_time'] = enrollment_time
         doc_ref = students_collection.document(student_data['student_id'])
         doc_ref.set(student_data)
-        print("Student added successfully.")
+        sync_fee_ledger(doc_ref, student_data)
+        student_search_index.upsert(doc_ref.id, student_data)
+        reporting_replica.expire()
+        students_log.info("Student added successfully.")
         return {"success": True, "error": None}
     except AssertionError as e:
-        print(f"Validation error: {e}")
+        students_log.warning("Validation error: %s", e)
         return {"success": False, "error": str(e)}
     except Exception as e:
-        print(f"Error adding student: {e}")
+        students_log.error("Error adding student: %s", e)
         return {"success": False, "error": str(e)}
 
+def sync_fee_ledger(doc_ref, student):
+    """Rebuild a student's payments ledger; a ledger failure never fails the student save"""
+    try:
+        student.update(sync_student_ledger(firebase_config.db, doc_ref, student))
+    except Exception as e:
+        students_log.error("Error syncing fee ledger for %s: %s", doc_ref.id, e)
+
 def update_student(student_doc_id, student_data):
     """Update a student in Firestore"""
-    if not FIREBASE_AVAILABLE or students_collection is None:
+    if not firebase_available():
         return {"success": False, "error": "Firebase not available"}
     try:
-        # Check for uniqueness of email, username, and password (excluding current student)
-        existing_students = get_all_students()
-        
-        # Check student ID uniqueness (excluding current student)
-        if student_data.get('student_id'):
-            for student in existing_students:
-                if student.get('_id') != student_doc_id and student.get('student_id') == student_data['student_id']:
-                    print(f"Student ID {student_data['student_id']} already exists for another student")
-                    return {"success": False, "error": "student id already exists"}
+        # Check uniqueness of student ID, email and username (excluding current student)
+        conflict = find_student_conflict(student_data, exclude_doc_id=student_doc_id)
+        if conflict:
+            return {"success": False, "error": conflict}
         
-        # Check email uniqueness
-        if student_data.get('email'):
-            for student in existing_students:
-                if student.get('_id') != student_doc_id and student.get('email') == student_data['email']:
-                    print(f"Email {student_data['email']} already exists for another student")
-                    return {"success": False, "error": "student email already exists"}
-        
-        # Check username uniqueness
-        if student_data.get('username'):
-            for student in existing_students:
-                if student.get('_id') != student_doc_id and student.get('username') == student_data['username']:
-                    print(f"Username {student_data['username']} already exists for another student")
-                    return {"success": False, "error": "username already exists"}
-        
-        # Check password uniqueness
-        if student_data.get('password'):
-            for student in existing_students:
-                if student.get('_id') != student_doc_id and student.get('password') == student_data['password']:
-                    print(f"Password already exists for another student")
-                    return {"success": False, "error": "password already exists"}
+        # A blank password, or the stored hash echoed back by the edit form, keeps the current password
+        password = student_data.pop('password', None)
+        if password and not is_password_hash(password):
+            student_data['password'] = hash_password(password)
         
         student_data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         doc_ref = students_collection.document(student_doc_id)
         doc_ref.update(student_data)
+        if any(field in student_data for field in FEE_FIELDS):
+            sync_fee_ledger(doc_ref, doc_ref.get().to_dict())
+        student_search_index.upsert(student_doc_id, student_data)
+        reporting_replica.expire()
         return {"success": True, "error": None}
     except Exception as e:
-        print(f"Error updating student: {e}")
+        students_log.error("Error updating student: %s", e)
         return {"success": False, "error": str(e)}
 
+def set_student_password(student_doc_id, password):
+    """Replace a student's password (stored hashed); returns True on success"""
+    if not firebase_available():
+        return False
+    try:
+        students_collection.document(student_doc_id).update({
+            'password': hash_password(password),
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        return True
+    except Exception as e:
+        students_log.error("Error setting password for student %s: %s", student_doc_id, e)
+        return False
+
 def delete_student(student_doc_id):
     """Delete a student from Firestore"""
-    if not FIREBASE_AVAILABLE or students_collection is None:
+    if not firebase_available():
         return False
     try:
         doc_ref = students_collection.document(student_doc_id)
+        delete_student_ledger(firebase_config.db, doc_ref)
         doc_ref.delete()
+        student_search_index.remove(student_doc_id)
+        revenue_analytics.invalidate()
+        reporting_replica.invalidate()
         return True
     except Exception as e:
-        print(f"Error deleting student: {e}")
+        students_log.error("Error deleting student: %s", e)
         return False
 
 def get_student_by_id(student_doc_id):
     """Get a specific student by document ID"""
-    if not FIREBASE_AVAILABLE or students_collection is None:
-        return None
-    try:
-        doc_ref = students_collection.document(student_doc_id)
-        doc = doc_ref.get()
-        if doc.exists:
-            student_data = doc.to_dict()
-            student_data['_id'] = doc.id
-            return student_data
-        return None
-    except Exception as e:
-        print(f"Error getting student: {e}")
-        return None
+    return student_repo.get(student_doc_id)
 
 # ---------- Batch Management Functions ----------
 def get_all_batches():
-    """Get all batches from Firestore"""
-    if not FIREBASE_AVAILABLE or batches_collection is None:
-        return []
+    """Get all batches from Firestore (the fields in VIEW_FIELDS['batches'])"""
+    return batch_repo.all(VIEW_FIELDS['batches'])
+
+def load_batch_catalog():
+    """Unguarded batch read for the catalog: a failed read raises instead of caching an empty list"""
+    return batch_repo.records(batch_repo.collection, VIEW_FIELDS['batches'])
+
+batch_catalog = TimedCache(load_batch_catalog, int(os.environ.get('BATCH_CACHE_TTL', '60')))
+
+def get_cached_batches():
+    """Get all batches from the in-process batch catalog (refreshed every BATCH_CACHE_TTL seconds)"""
     try:
-        docs = batches_collection.stream()
-        batches = []
-        for doc in docs:
-            batch_data = doc.to_dict()
-            batch_data['_id'] = doc.id
-            batches.append(batch_data)
-        return batches
+        return batch_catalog.get()
     except Exception as e:
-        print(f"Error getting batches: {e}")
+        batches_log.error("Error getting batches: %s", e)
         return []
 
 def add_batch(batch_data):
     """Add a new batch to Firestore"""
-    if not FIREBASE_AVAILABLE or batches_collection is None:
-        return False
-    try:
-        # Get current datetime for creation timestamp
-        current_datetime = datetime.now()
-        batch_data['created_at'] = current_datetime.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Store the original batch name
-        original_batch_name = batch_data.get('batch_name', '')
-        batch_data['original_batch_name'] = original_batch_name
-        
-        # Keep the batch name as is (without creation date)
-        # The batch name will be displayed as: Batch Name (Start Time)-(End Time)
-        # The creation date is stored separately in batch_start_date
-        
-        doc_ref = batches_collection.document()
-        doc_ref.set(batch_data)
-        return True
-    except Exception as e:
-        print(f"Error adding batch: {e}")
+    # Get current datetime for creation timestamp
+    current_datetime = datetime.now()
+    batch_data['created_at'] = current_datetime.strftime('%Y-%m-%d %H:%M:%S')
+    batch_data['updated_at'] = batch_data['created_at']
+
+    # Store the original batch name
+    original_batch_name = batch_data.get('batch_name', '')
+    batch_data['original_batch_name'] = original_batch_name
+
+    # Keep the batch name as is (without creation date)
+    # The batch name will be displayed as: Batch Name (Start Time)-(End Time)
+    # The creation date is stored separately in batch_start_date
+
+    if not batch_repo.add(batch_data):
         return False
+    batch_catalog.invalidate()
+    reporting_replica.expire()
+    return True
 
 def update_batch(batch_doc_id, batch_data):
     """Update a batch in Firestore"""
-    if not FIREBASE_AVAILABLE or batches_collection is None:
-        return False
-    try:
-        batch_data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Store the original batch name
-        original_batch_name = batch_data.get('batch_name', '')
-        batch_data['original_batch_name'] = original_batch_name
-        
-        # Keep the batch name as is (without creation date)
-        # The batch name will be displayed as: Batch Name (Start Time)-(End Time)
-        # The creation date is stored separately in batch_start_date
-        
-        doc_ref = batches_collection.document(batch_doc_id)
-        doc_ref.update(batch_data)
-        return True
-    except Exception as e:
-        print(f"Error updating batch: {e}")
+    batch_data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    # Store the original batch name
+    original_batch_name = batch_data.get('batch_name', '')
+    batch_data['original_batch_name'] = original_batch_name
+
+    # Keep the batch name as is (without creation date)
+    # The batch name will be displayed as: Batch Name (Start Time)-(End Time)
+    # The creation date is stored separately in batch_start_date
+
+    if not batch_repo.update(batch_doc_id, batch_data):
         return False
+    batch_catalog.invalidate()
+    reporting_replica.expire()
+    return True
 
 def delete_batch(batch_doc_id):
-    """Delete a batch from Firestore"""
-    if not FIREBASE_AVAILABLE or batches_collection is None:
-        return False
-    try:
-        doc_ref = batches_collection.document(batch_doc_id)
-        doc_ref.delete()
-        return True
-    except Exception as e:
-        print(f"Error deleting batch: {e}")
+    """Delete a batch with its students, trainer files (records and Storage blobs) and messages"""
+    counts = batch_repo.delete_cascade(batch_doc_id, storage_bucket)
+    if counts is None:
         return False
+    batches_log.info("Deleted batch %s with %s", batch_doc_id, counts)
+    batch_catalog.invalidate()
+    student_search_index.invalidate()
+    revenue_analytics.invalidate()
+    reporting_replica.invalidate()
+    return True
 
 # ---------- Course Tracking Functions ----------
+TRACKING_COLUMNS = TRACKING_FIELDS + ["_id"]
+TRACKING_PAGE_SIZE = int(os.environ.get('TRACKING_PAGE_SIZE', '50'))
+
 def load_data():
     """Load course tracking data from Firestore"""
-    if not FIREBASE_AVAILABLE or course_tracking_collection is None:
-        return pd.DataFrame(columns=["Trainer Name", "Batch Name", "Ongoing Module Name", 
-                                   "Completed Module", "Upcoming Module", "Class Date",
-                                   "Start Time", "End Time", "Time stamp"])
-    try:
-        docs = course_tracking_collection.stream()
-        records = []
-        for doc in docs:
-            record = doc.to_dict()
-            record['_id'] = doc.id
-            records.append(record)
-        
-        if records:
-            df = pd.DataFrame(records)
-            expected_columns = ["Trainer Name", "Batch Name", "Ongoing Module Name", 
-                               "Completed Module", "Upcoming Module", "Class Date",
-                               "Start Time", "End Time", "Time stamp"]
-            df = df.reindex(columns=expected_columns, fill_value="")
-        else:
-            df = pd.DataFrame(columns=["Trainer Name", "Batch Name", "Ongoing Module Name", 
-                                       "Completed Module", "Upcoming Module", "Class Date",
-                                       "Start Time", "End Time", "Time stamp"])
-        return df
-    except Exception as e:
-        print(f"Error loading course tracking data: {e}")
-        return pd.DataFrame(columns=["Trainer Name", "Batch Name", "Ongoing Module Name", 
-                                   "Completed Module", "Upcoming Module", "Class Date",
-                                   "Start Time", "End Time", "Time stamp"])
+    import pandas as pd
+    return pd.DataFrame(tracking_repo.all(TRACKING_FIELDS)).reindex(columns=TRACKING_FIELDS, fill_value="")
+
+def _tracking_frame(records):
+    import pandas as pd
+    return pd.DataFrame(records).reindex(columns=TRACKING_COLUMNS, fill_value="")
 
 def load_data_by_trainer(trainer_name):
-    """Load all course tracking data from Firestore (showing all records like admin dashboard)"""
-    if not FIREBASE_AVAILABLE or course_tracking_collection is None:
-        return pd.DataFrame(columns=["Trainer Name", "Batch Name", "Ongoing Module Name", 
-                                   "Completed Module", "Upcoming Module", "Class Date",
-                                   "Start Time", "End Time", "Time stamp", "_id"])
-    try:
-        # Get all records from the collection (like admin dashboard)
-        all_docs = course_tracking_collection.stream()
-        all_records = []
-        for doc in all_docs:
-            record = doc.to_dict()
-            record['_id'] = doc.id
-            all_records.append(record)
-        
-        if all_records:
-            df = pd.DataFrame(all_records)
-            expected_columns = ["Trainer Name", "Batch Name", "Ongoing Module Name", 
-                               "Completed Module", "Upcoming Module", "Class Date",
-                               "Start Time", "End Time", "Time stamp", "_id"]
-            df = df.reindex(columns=expected_columns, fill_value="")
-        else:
-            df = pd.DataFrame(columns=["Trainer Name", "Batch Name", "Ongoing Module Name", 
-                                       "Completed Module", "Upcoming Module", "Class Date",
-                                       "Start Time", "End Time", "Time stamp", "_id"])
-        return df
-    except Exception as e:
-        print(f"Error loading course tracking data by trainer: {e}")
-        return pd.DataFrame(columns=["Trainer Name", "Batch Name", "Ongoing Module Name", 
-                                   "Completed Module", "Upcoming Module", "Class Date",
-                                   "Start Time", "End Time", "Time stamp", "_id"])
+    """Load the course tracking records of one trainer (indexed 'Trainer Name' equality query)"""
+    return _tracking_frame(tracking_repo.by_trainer(trainer_name))
+
+def load_course_tracking_page(page_size=TRACKING_PAGE_SIZE, after=None):
+    """Load one page of all course tracking records, ordered by document ID.
+
+    Returns (DataFrame, next_cursor); pass next_cursor as after= for the following page.
+    """
+    records, next_cursor = tracking_repo.page(page_size, after)
+    return _tracking_frame(records), next_cursor
 
 def add_record(data):
     """Add a single record to Firestore"""
-    if not FIREBASE_AVAILABLE or course_tracking_collection is None:
-        return False
-    try:
-        doc_ref = course_tracking_collection.document()
-        doc_ref.set(data)
-        return True
-    except Exception as e:
-        print(f"Error adding course tracking record: {e}")
+    # updated_at is the reporting replica's sync watermark
+    data['created_at'] = data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if not tracking_repo.add(data):
         return False
+    reporting_replica.expire()
+    return True
 
 def edit_record(index, data):
     """Edit a record by index in Firestore"""
-    if not FIREBASE_AVAILABLE or course_tracking_collection is None:
-        return False
-    try:
-        docs = list(course_tracking_collection.stream())
-        if 0 <= index < len(docs):
-            doc_ref = docs[index].reference
-            doc_ref.update(data)
-            return True
-        return False
-    except Exception as e:
-        print(f"Error editing course tracking record: {e}")
+    data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if not tracking_repo.update_nth(index, data):
         return False
+    reporting_replica.expire()
+    return True
 
 def delete_record(index):
     """Delete a record by index from Firestore"""
-    if not FIREBASE_AVAILABLE or course_tracking_collection is None:
-        return False
-    try:
-        docs = list(course_tracking_collection.stream())
-        if 0 <= index < len(docs):
-            doc_ref = docs[index].reference
-            doc_ref.delete()
-            return True
-        return False
-    except Exception as e:
-        print(f"Error deleting course tracking record: {e}")
+    if not tracking_repo.delete_nth(index):
         return False
+    reporting_replica.invalidate()
+    return True
 
 def edit_record_by_id(record_id, data):
     """Edit a record by document ID in Firestore"""
-    if not FIREBASE_AVAILABLE or course_tracking_collection is None:
+    current_data = tracking_repo.get(record_id)
+    if current_data is None:
+        tracking_log.warning("Document with ID %s does not exist!", record_id)
         return False
-    try:
-        # First, let's check if the document exists and get its current data
-        doc_ref = course_tracking_collection.document(record_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            print(f"Document with ID {record_id} does not exist!")
-            return False
-        
-        # Get the current document data
-        current_data = doc.to_dict()
-        
-        # Preserve the original timestamp
-        if 'Time stamp' in current_data:
-            data['Time stamp'] = current_data['Time stamp']
-        else:
-            # If no timestamp exists, create a new one
-            data['Time stamp'] = f"{datetime.now().strftime('%Y-%m-%d %I:%M %p')}"
-        
-        # Update the document
-        doc_ref.update(data)
-        return True
-    except Exception as e:
-        print(f"Error editing course tracking record by ID: {e}")
+
+    # Preserve the original timestamp
+    if 'Time stamp' in current_data:
+        data['Time stamp'] = current_data['Time stamp']
+    else:
+        # If no timestamp exists, create a new one
+        data['Time stamp'] = f"{datetime.now().strftime('%Y-%m-%d %I:%M %p')}"
+
+    data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if not tracking_repo.update(record_id, data):
         return False
+    reporting_replica.expire()
+    return True
 
 # ---------- Messaging Functions ----------
 def send_message(batch_id, trainer_name, message_content):
     """Send a message to a specific batch."""
-    if not FIREBASE_AVAILABLE or messages_collection is None:
-        return False
-    try:
-        message_data = {
-            'batch_id': batch_id,
-            'trainer_name': trainer_name,
-            'message_content': message_content,
-            'timestamp': datetime.now(),
-            'read_by': []  # List of student IDs who have read the message
-        }
-        messages_collection.add(message_data)
-        return True
-    except Exception as e:
-        print(f"Error sending message: {e}")
-        return False
+    return message_repo.add({
+        'batch_id': batch_id,
+        'trainer_name': trainer_name,
+        'message_content': message_content,
+        'timestamp': datetime.now(),
+        'read_by': []  # List of student IDs who have read the message
+    })
 
 def get_messages_for_batch(batch_id):
     """Get all messages for a specific batch."""
-    if not FIREBASE_AVAILABLE or messages_collection is None:
-        return []
-    try:
-        print("[DEBUG] Querying messages for batch_id:", batch_id)
-        docs = messages_collection.where('batch_id', '==', batch_id).order_by('timestamp', direction='DESCENDING').stream()
-        messages = []
-        for doc in docs:
-            message_data = doc.to_dict()
-            message_data['_id'] = doc.id
-            messages.append(message_data)
-        print(f"[DEBUG] Fetched {len(messages)} messages for batch_id {batch_id}")
-        for m in messages:
-            print("[DEBUG] Message:", m)
-        return messages
-    except Exception as e:
-        print(f"Error getting messages: {e}")
-        return []
+    messages = message_repo.for_batch(batch_id)
+    messaging_log.debug("Fetched %d messages for batch_id %s", len(messages), batch_id)
+    return messages
+
+def get_batch_messages_and_files(batch_id):
+    """Messages and trainer files of a batch, as one fan-out call for the trainer dashboard"""
+    return get_messages_for_batch(batch_id), get_trainer_files_by_batch(batch_id)
 
 def mark_messages_as_read(student_id, batch_id):
     """Mark all messages in a batch as read by a student."""
-    if not FIREBASE_AVAILABLE or messages_collection is None:
-        return False
-    try:
-        docs = messages_collection.where(filter=('batch_id', '==', batch_id)).stream()
-        for doc in docs:
-            doc_ref = doc.reference
-            doc_ref.update({
-                'read_by': firestore.ArrayUnion([student_id])
-            })
-        return True
-    except Exception as e:
-        print(f"Error marking messages as read: {e}")
-        return False
+    return message_repo.mark_read(student_id, batch_id)
 
 # ---------- Student Feedback Functions ----------
 def add_student_feedback(feedback_data):
     """Add a new student feedback to Firestore"""
-    if not FIREBASE_AVAILABLE or student_feedback_collection is None:
-        return False
-    try:
-        feedback_data['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        doc_ref = student_feedback_collection.document()
-        doc_ref.set(feedback_data)
-        return True
-    except Exception as e:
-        print(f"Error adding student feedback: {e}")
+    feedback_data['created_at'] = feedback_data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if not feedback_repo.add(feedback_data):
         return False
+    reporting_replica.expire()
+    return True
 
 def get_all_student_feedback():
-    """Get all student feedback from Firestore"""
-    if not FIREBASE_AVAILABLE or student_feedback_collection is None:
-        return []
-    try:
-        docs = student_feedback_collection.order_by('created_at', direction='DESCENDING').stream()
-        feedbacks = []
-        for doc in docs:
-            feedback_data = doc.to_dict()
-            feedback_data['_id'] = doc.id
-            feedbacks.append(feedback_data)
-        return feedbacks
-    except Exception as e:
-        print(f"Error getting student feedback: {e}")
-        return []
+    """Get all student feedback from Firestore, newest first"""
+    return feedback_repo.all(VIEW_FIELDS['student_feedback'])
 
 def delete_student_feedback(feedback_doc_id):
     """Delete a specific feedback by document ID"""
-    if not FIREBASE_AVAILABLE or student_feedback_collection is None:
-        return False
-    try:
-        doc_ref = student_feedback_collection.document(feedback_doc_id)
-        doc_ref.delete()
-        return True
-    except Exception as e:
-        print(f"Error deleting student feedback: {e}")
+    if not feedback_repo.delete(feedback_doc_id):
         return False
+    reporting_replica.invalidate()
+    return True
 
 def delete_all_student_feedback():
-    """Delete all student feedback"""
-    if not FIREBASE_AVAILABLE or student_feedback_collection is None:
-        return False
-    try:
-        docs = student_feedback_collection.stream()
-        for doc in docs:
-            doc.reference.delete()
-        return True
-    except Exception as e:
-        print(f"Error deleting all student feedback: {e}")
+    """Delete all student feedback using batched writes"""
+    deleted_count = feedback_repo.delete_all()
+    if deleted_count is None:
         return False
+    students_log.info("Deleted %d student feedback records", deleted_count)
+    reporting_replica.invalidate()
+    return True
 
 # ---------- Role Credentials Functions ----------
 def check_admin_login(username, password):
     """Check admin login credentials from Firestore"""
-    if not FIREBASE_AVAILABLE or role_credentials_collection is None:
+    if not firebase_available():
         return False
     try:
-        docs = role_credentials_collection.where('username', '==', username).where('password', '==', hash_password(password)).where('role', '==', 'Admin').stream()
-        return len(list(docs)) > 0
+        return auth_service.verify_role_login(username, password, 'Admin')
     except Exception as e:
-        print(f"Error checking admin login: {e}")
+        auth_log.error("Error checking admin login: %s", e)
         return False
 
 def check_role_login(username, password, role):
-    """Check role-based login credentials from Firestore"""
-    if not FIREBASE_AVAILABLE or role_credentials_collection is None:
-        print("[DEBUG] Firebase unavailable or role_credentials_collection is None")
+    """Check role-based login credentials against the cached role_credentials"""
+    if not firebase_available():
+        auth_log.debug("Firebase unavailable")
         return False
     try:
-        hashed_pw = hash_password(password)
-        print(f"[DEBUG] Checking login for username: '{username}', hashed_password: '{hashed_pw}', role: '{role}'")
-        docs = role_credentials_collection.where('username', '==', username).where('password', '==', hashed_pw).where('role', '==', role).stream()
-        found = False
-        for doc in docs:
-            print(f"[DEBUG] Found matching document: {doc.to_dict()}")
-            found = True
+        found = auth_service.verify_role_login(username, password, role)
         if not found:
-            print("[DEBUG] No matching document found for given credentials.")
+            auth_log.debug("Login rejected for username: '%s', role: '%s'", username, role)
         return found
     except Exception as e:
-        print(f"Error checking role login: {e}")
+        auth_log.error("Error checking role login: %s", e)
         return False
 
 def check_student_login(username, password, batch_id):
-    """Check student login credentials from Firestore"""
-    if not FIREBASE_AVAILABLE or students_collection is None:
+    """Check student login credentials with one (batch_id, username) lookup"""
+    if not firebase_available():
         return None
     try:
-        docs = students_collection.where('username', '==', username).where('password', '==', password).where('batch_id', '==', batch_id).stream()
-        for doc in docs:
-            student_data = doc.to_dict()
-            student_data['_id'] = doc.id
-            return student_data
-        return None
+        return auth_service.verify_student_login(username, password, batch_id)
     except Exception as e:
-        print(f"Error checking student login: {e}")
+        auth_log.error("Error checking student login: %s", e)
         return None
 
 # ---------- Email Configuration ----------
 try:
     from .email_config import EMAIL_CONFIG
 except ImportError:
-    print("Warning: email_config.py not found. Using default configuration.")
+    messaging_log.warning("email_config.py not found. Using default configuration.")
     EMAIL_CONFIG = {
         'smtp_server': os.environ.get('SMTP_SERVER', 'smtp.gmail.com'),
         'smtp_port': int(os.environ.get('SMTP_PORT', '587')),
@@ -1097,12 +793,18 @@ except ImportError:
         'password': os.environ.get('EMAIL_PASSWORD', 'your_app_password')
     }
 
-def send_student_email(student_email, student_data):
-    """Send student details via email"""
+def send_student_email(student_email, student_data, password=None):
+    """Send student details via email.
+
+    password is the plaintext login password to include; stored passwords are hashed,
+    so only a legacy plaintext one can be read back from student_data.
+    """
+    if password is None and not is_password_hash(student_data.get('password')):
+        password = student_data.get('password')
     try:
         if (EMAIL_CONFIG['email'] == 'your_email@gmail.com' or 
             EMAIL_CONFIG['password'] == 'your_app_password'):
-            print("Email configuration not set up properly. Please update email_config.py")
+            messaging_log.warning("Email configuration not set up properly. Please update email_config.py")
             return False
         
         msg = MIMEMultipart()
@@ -1139,7 +841,7 @@ def send_student_email(student_email, student_data):
                 <div class="login-credentials">
                     <div class="credentials-title">🔐 Your Login Credentials</div>
                     <div class="credential-item"><strong>Username:</strong> {student_data.get('username', 'Not set')}</div>
-                    <div class="credential-item"><strong>Password:</strong> {student_data.get('password', 'Not set')}</div>
+                    <div class="credential-item"><strong>Password:</strong> {password or 'Not set'}</div>
                     <div class="credential-item"><strong>Portal URL:</strong> http://localhost:5000</div>
                 </div>
                 
@@ -1182,86 +884,59 @@ def send_student_email(student_email, student_data):
         
         return True
     except Exception as e:
-        print(f"Error sending email: {e}")
+        messaging_log.error("Error sending email: %s", e)
         return False
 
 # ---------- Admin Management Functions ----------
 def get_all_admins():
     """Get all admins from Firestore"""
-    if not FIREBASE_AVAILABLE or role_credentials_collection is None:
-        return []
-    try:
-        docs = role_credentials_collection.where(filter=('role', '==', 'Admin')).stream()
-        admins = []
-        for doc in docs:
-            admin_data = doc.to_dict()
-            admin_data['_id'] = doc.id
-            admins.append(admin_data)
-        return admins
-    except Exception as e:
-        print(f"Error getting admins: {e}")
-        return []
+    return credential_repo.by_role('Admin')
 
 def add_admin(admin_data):
     """Add a new admin to Firestore"""
-    if not FIREBASE_AVAILABLE or role_credentials_collection is None:
-        print("Firebase not available or role_credentials collection is None.")
+    if not firebase_available():
+        auth_log.warning("Firebase not available.")
         return False
-    try:
-        # Check if username already exists
-        docs = role_credentials_collection.where('username', '==', admin_data['username']).where('role', '==', 'Admin').stream()
-        for doc in docs:
-            print(f"Admin with username {admin_data['username']} already exists")
-            return False
-        # Store original password for Super Admin visibility
-        original_password = admin_data['password']
-        admin_data['password'] = hash_password(admin_data['password'])
-        admin_data['original_password'] = original_password
-        admin_data['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        admin_data['role'] = 'Admin'
-        admin_data['status'] = 'active'
-        doc_ref = role_credentials_collection.document()
-        doc_ref.set(admin_data)
-        print("Admin added successfully.")
-        return True
-    except Exception as e:
-        print(f"Error adding admin: {e}")
+    # Check if username already exists
+    if credential_repo.find_login(admin_data['username'], 'Admin'):
+        auth_log.warning("Admin with username %s already exists", admin_data['username'])
         return False
+    # Store original password for Super Admin visibility
+    original_password = admin_data['password']
+    admin_data['password'] = hash_password(admin_data['password'])
+    admin_data['original_password'] = original_password
+    admin_data['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    admin_data['role'] = 'Admin'
+    admin_data['status'] = 'active'
+    if not credential_repo.add(admin_data):
+        return False
+    auth_service.invalidate()
+    auth_log.info("Admin added successfully.")
+    return True
 
 def update_admin(admin_id, admin_data):
     """Update an admin in Firestore"""
-    if not FIREBASE_AVAILABLE or role_credentials_collection is None:
-        print("Firebase not available or role_credentials collection is None.")
-        return False
-    try:
-        # Hash the password if it's being updated
-        if 'password' in admin_data and admin_data['password']:
-            original_password = admin_data['password']
-            admin_data['password'] = hash_password(admin_data['password'])
-            admin_data['original_password'] = original_password
-        elif 'password' in admin_data and not admin_data['password']:
-            del admin_data['password']
-        admin_data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        doc_ref = role_credentials_collection.document(admin_id)
-        doc_ref.update(admin_data)
-        print(f"Admin {admin_id} updated successfully.")
-        return True
-    except Exception as e:
-        print(f"Error updating admin: {e}")
+    # Hash the password if it's being updated
+    if 'password' in admin_data and admin_data['password']:
+        original_password = admin_data['password']
+        admin_data['password'] = hash_password(admin_data['password'])
+        admin_data['original_password'] = original_password
+    elif 'password' in admin_data and not admin_data['password']:
+        del admin_data['password']
+    admin_data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if not credential_repo.update(admin_id, admin_data):
         return False
+    auth_service.invalidate()
+    auth_log.info("Admin %s updated successfully.", admin_id)
+    return True
 
 def delete_admin(admin_id):
     """Delete an admin from Firestore"""
-    if not FIREBASE_AVAILABLE or role_credentials_collection is None:
-        return False
-    try:
-        doc_ref = role_credentials_collection.document(admin_id)
-        doc_ref.delete()
-        print(f"Admin {admin_id} deleted successfully.")
-        return True
-    except Exception as e:
-        print(f"Error deleting admin: {e}")
+    if not credential_repo.delete(admin_id):
         return False
+    auth_service.invalidate()
+    auth_log.info("Admin %s deleted successfully.", admin_id)
+    return True
 
 # ---------- Routes ----------
 @techzone_app.route("/student_login", methods=["GET", "POST"])
@@ -1273,41 +948,24 @@ def student_login():
 
         if not username or not password or not batch_id:
             flash("Please fill in all fields and select your batch!", "danger")
-            return render_template("login.html", batches=get_all_batches())
+            return render_template("login.html", batches=get_cached_batches())
 
-        if FIREBASE_AVAILABLE and students_collection is not None:
-            try:
-                print(f"[DEBUG] Submitted username: {username}")
-                print(f"[DEBUG] Submitted password: {password}")
-                print(f"[DEBUG] Submitted batch_id: {batch_id}")
-                # Print all students with this username
-                all_user_docs = students_collection.where('username', '==', username).stream()
-                for doc in all_user_docs:
-                    stu = doc.to_dict()
-                    print(f"[DEBUG] Candidate student: username={stu.get('username')}, password={stu.get('password')}, batch_id={stu.get('batch_id')}, doc_id={doc.id}")
-                # Now try to match all three fields
-                docs = students_collection.where('username', '==', username)\
-                                         .where('password', '==', password)\
-                                         .where('batch_id', '==', batch_id)\
-                                         .stream()
-                student_doc = next(docs, None)
-                print("[DEBUG] Student found:", student_doc)
-                if student_doc:
-                    student_data = student_doc.to_dict()
-                    session["logged_in"] = True
-                    session["username"] = username
-                    session["role"] = "Student"
-                    session["student_batch"] = batch_id
-                    session["student_id"] = student_doc.id
-                    return redirect(url_for("dashboard"))
-            except Exception as e:
-                print(f"Error checking student login: {e}")
+        student = check_student_login(username, password, batch_id)
+        if student:
+            regenerate_session(session)
+            session["logged_in"] = True
+            session["username"] = username
+            session["role"] = "Student"
+            session["student_batch"] = batch_id
+            session["student_id"] = student["_id"]
+            return redirect(url_for("dashboard"))
+        auth_log.debug("Student login rejected for username: %s, batch_id: %s", username, batch_id)
 
         flash("Invalid student credentials or batch selection!", "danger")
-        return render_template("login.html", batches=get_all_batches())
+        return render_template("login.html", batches=get_cached_batches())
 
     # GET request: show the login page with all batches
-    return render_template("login.html", batches=get_all_batches())
+    return render_template("login.html", batches=get_cached_batches())
 
 @techzone_app.route("/", methods=["GET", "POST"])
 def login():
@@ -1319,21 +977,22 @@ def login():
         
         if not role or not username or not password:
             flash("Please fill in all fields and select a role!", "danger")
-            return render_template("login.html", batches=get_all_batches())
+            return render_template("login.html", batches=get_cached_batches())
         
         if role == "Student" and not batch_name:
             flash("Please select your batch!", "danger")
-            return render_template("login.html", batches=get_all_batches())
+            return render_template("login.html", batches=get_cached_batches())
         
         # Check student login
         if role == "Student":
             student = check_student_login(username, password, batch_name)
             if student:
+                regenerate_session(session)
                 session["logged_in"] = True
                 session["username"] = username
                 session["role"] = role
                 # Find the batch _id based on the selected batch_name string
-                batches = get_all_batches()
+                batches = get_cached_batches()
                 batch_id = None
                 for batch in batches:
                     # Compose display name as shown in dropdown
@@ -1343,23 +1002,24 @@ def login():
                         break
                 if not batch_id:
                     flash('Batch not found! Please contact admin.', 'danger')
-                    return render_template('login.html', batches=get_all_batches())
+                    return render_template('login.html', batches=get_cached_batches())
                 session["student_batch"] = batch_id
                 session["student_id"] = student["_id"]
                 return redirect(url_for("dashboard"))
             flash("Invalid student credentials or batch selection!", "danger")
-            return render_template("login.html", batches=get_all_batches())
+            return render_template("login.html", batches=get_cached_batches())
         
         # Check other roles
         if role in ["Super Admin", "Trainer", "Admin"]:
             if check_role_login(username, password, role):
+                regenerate_session(session)
                 session["logged_in"] = True
                 session["username"] = username
                 session["role"] = role
                 return redirect(url_for("dashboard"))
         
         flash("Invalid credentials!", "danger")
-    return render_template("login.html", batches=get_all_batches())
+    return render_template("login.html", batches=get_cached_batches())
 
 @techzone_app.route("/dashboard", methods=["GET", "POST"])
 def dashboard():
@@ -1368,21 +1028,13 @@ def dashboard():
 
     role = session["role"]
     username = session["username"]
-    df = load_data()
 
     if role == "Trainer":
         trainer_name = session.get("username")
         all_batches = get_all_batches()
-        print("Trainer name:", trainer_name)
-        print("All batches:", all_batches)
+        batches_log.debug("Trainer dashboard for %s: %d batches", trainer_name, len(all_batches))
         # Show all batches in dropdown, not just assigned ones
         trainer_batches = all_batches
-        print("Trainer batches:", trainer_batches)
-        # Gather messages for each batch
-        batch_messages = {}
-        for batch in trainer_batches:
-            batch_id = str(batch.get('_id'))
-            batch_messages[batch_id] = get_messages_for_batch(batch_id)
 
         if request.method == "POST":
             # This POST handling is for the file upload form.
@@ -1395,7 +1047,7 @@ def dashboard():
                     # Add trainer username prefix to avoid conflicts
                     prefixed_filename = f"{trainer_name}_{filename}"
                     try:
-                        if FIREBASE_AVAILABLE and storage_bucket is not None:
+                        if firebase_available():
                             # Get file data first for size calculation
                             file.seek(0)
                             file_data = file.read()
@@ -1432,7 +1084,7 @@ def dashboard():
                         else:
                             flash("Firebase Storage not available!", "danger")
                     except Exception as e:
-                        print(f"Error uploading file: {e}")
+                        files_log.error("Error uploading file: %s", e)
                         flash(f"Error uploading file: {str(e)}", "danger")
                 else:
                     flash('No selected file', 'danger')
@@ -1441,13 +1093,15 @@ def dashboard():
             return redirect(url_for('dashboard'))
 
         # This part handles the GET request to display the dashboard.
+        # Batches are read concurrently, one call per batch for both its messages and its files
+        batch_ids = [str(batch['_id']) for batch in trainer_batches]  # Ensure string format for consistency
+        results = gather(*[functools.partial(get_batch_messages_and_files, batch_id) for batch_id in batch_ids],
+                         defaults=[([], [])] * len(batch_ids))
+        batch_messages = {batch_id: messages for batch_id, (messages, _) in zip(batch_ids, results)}
         trainer_batch_files = {}
-        for batch in trainer_batches:
-            batch_id = str(batch['_id'])  # Ensure string format for consistency
-            batch_name = batch.get('batch_name', 'Unknown Batch')
-            files_for_batch = get_trainer_files_by_batch(batch_id)
+        for batch, batch_id, (_, files_for_batch) in zip(trainer_batches, batch_ids, results):
             trainer_batch_files[batch_id] = {
-                'batch_name': batch_name,
+                'batch_name': batch.get('batch_name', 'Unknown Batch'),
                 'files': files_for_batch
             }
 
@@ -1456,6 +1110,7 @@ def dashboard():
             username=trainer_name, 
             batches=trainer_batches, 
             trainer_batch_files=trainer_batch_files,
+            batch_messages=batch_messages,
             trainer_name=trainer_name
         )
 
@@ -1494,14 +1149,16 @@ def dashboard():
                 index = int(request.form["delete_index"])
                 delete_record(index)
                 flash("Record deleted!", "warning")
-            df = load_data()
         
+        # Admins edit records by position, so they get the live collection
+        df = load_data()
         batches = get_all_batches()
         return render_template("dashboard_admin.html", data=df, batches=batches)
 
     elif role == "Super Admin":
-        batches = get_all_batches()
-        return render_template("dashboard_boss.html", data=df, batches=batches)
+        # Read-only overview, served from the reporting replica
+        data, batches = _tracking_overview()
+        return render_template("dashboard_boss.html", data=data, batches=batches)
 
     elif role == "Student":
         if request.method == "POST":
@@ -1536,9 +1193,8 @@ def dashboard():
         
         # Fetch messages for the student's batch
         batch_id = session.get("student_batch")
-        print("[DEBUG] Student batch_id from session:", batch_id)
         messages = get_messages_for_batch(batch_id)
-        print("[DEBUG] Messages fetched for batch:", messages)
+        messaging_log.debug("Student dashboard: %d messages for batch %s", len(messages), batch_id)
         
         # Calculate unread message count
         unread_count = 0
@@ -1575,7 +1231,9 @@ def trainer_modules():
         return redirect(url_for("login"))
     
     username = session["username"]
-    df = load_data_by_trainer(username)
+    # Own records by default; show=all pages through every trainer's records
+    show_all = request.args.get("show") == "all"
+    after = request.args.get("after") or None
     
     if request.method == "POST":
         action = request.form.get("action")
@@ -1596,19 +1254,69 @@ def trainer_modules():
                 flash("Record updated successfully!", "success")
             else:
                 flash("Error updating record!", "danger")
-            
-            df = load_data_by_trainer(username)
+        return redirect(url_for("trainer_modules", show="all" if show_all else None, after=after))
     
-    batches = get_all_batches()
-    return render_template("trainer_modules.html", data=df, batches=batches, trainer_name=username)
+    next_cursor = None
+    if show_all:
+        df, next_cursor = load_course_tracking_page(after=after)
+    else:
+        df = load_data_by_trainer(username)
+    batches = get_cached_batches()
+    return render_template("trainer_modules.html", data=df, batches=batches, trainer_name=username,
+                           show_all=show_all, after=after, next_cursor=next_cursor)
+
+# ---------- Batch Summary Figures ----------
+# Stand-ins for figures that could not be read (or missed the request deadline)
+NO_REPLICA_FIGURES = ([], {}, {'students': 0, 'paid': 0, 'with_due_fees': 0, 'total_fees': 0})
+NO_LEDGER_FIGURES = ([], {'total': 0, 'by_batch': {}})
+NO_REVENUE_TOTALS = {'billed': 0.0, 'collected': 0.0, 'outstanding': 0.0, 'students': 0}
+
+def _replica_figures():
+    """Batches, per-batch counts and student totals from the reporting replica instead of scanning every student"""
+    try:
+        return reporting_replica.batches(), reporting_replica.batch_counts(), reporting_replica.student_totals()
+    except Exception as e:
+        reports_log.error("Error reading the reporting replica: %s", e)
+        return NO_REPLICA_FIGURES
+
+def _tracking_overview():
+    """Course tracking records and batches for the Super Admin dashboard: from the reporting
+    replica, or read live from Firestore if the replica can't be read"""
+    try:
+        return reporting_replica.tracking_frame(), reporting_replica.batches()
+    except Exception as e:
+        reports_log.error("Error reading the reporting replica, reading Firestore instead: %s", e)
+        return load_data(), get_cached_batches()
+
+def _ledger_figures():
+    """Students overdue this week and this month's collections, from indexed fee ledger queries"""
+    if not firebase_available():
+        return NO_LEDGER_FIGURES
+    try:
+        return overdue_this_week(students_collection), collections_this_month(firebase_config.db)
+    except Exception as e:
+        reports_log.error("Error loading fee ledger figures: %s", e)
+        return NO_LEDGER_FIGURES
+
+def _revenue_totals():
+    try:
+        return revenue_analytics.totals()
+    except Exception as e:
+        reports_log.error("Error loading revenue totals: %s", e)
+        return NO_REVENUE_TOTALS
 
 @techzone_app.route("/batch-summary")
 def batch_summary():
     if not session.get("logged_in") or session.get("role") not in ["Super Admin", "Admin"]:
         return redirect(url_for("login"))
     
-    batches = get_all_batches()
-    students = get_all_students()
+    # The replica counts, ledger figures and revenue totals are independent reads, made concurrently
+    (batches, batch_counts, student_totals), (overdue_students, collections), revenue_totals = gather(
+        _replica_figures, _ledger_figures, _revenue_totals,
+        defaults=(NO_REPLICA_FIGURES, NO_LEDGER_FIGURES, NO_REVENUE_TOTALS))
+    overdue_by_batch = {}
+    for student in overdue_students:
+        overdue_by_batch[student.get('batch_id')] = overdue_by_batch.get(student.get('batch_id'), 0) + 1
     
     # Calculate batch-wise summary
     batch_summary = []
@@ -1632,33 +1340,32 @@ def batch_summary():
         else:
             batch_display_name = f"{batch.get('batch_name', 'Unknown')} ({batch.get('start_time', 'Unknown')})-({batch.get('end_time', 'Unknown')}) ({formatted_date})"
         
-        # Count students in this batch
-        batch_students = [s for s in students if s.get('batch_id') == batch_id]
-        total_students = len(batch_students)
-        
-        # Count paid and unpaid students
-        paid_students = len([s for s in batch_students if s.get('fees_status') == 'Paid'])
-        unpaid_students = total_students - paid_students
+        # Paid and unpaid students in this batch
+        counts = batch_counts.get(batch_id, {'total_students': 0, 'paid_students': 0})
         
         batch_summary.append({
             'batch_name': batch_display_name,
-            'total_students': total_students,
-            'paid_students': paid_students,
-            'unpaid_students': unpaid_students
+            'total_students': counts['total_students'],
+            'paid_students': counts['paid_students'],
+            'unpaid_students': counts['total_students'] - counts['paid_students'],
+            'overdue_this_week': overdue_by_batch.get(batch_id, 0),
+            'collected_this_month': collections['by_batch'].get(batch_id, 0)
         })
     
     # Sort batch summary by batch name
     batch_summary.sort(key=lambda x: x['batch_name'])
     
-    return render_template("batch_summary.html", batches=batches, students=students, batch_summary=batch_summary)
+    return render_template("batch_summary.html", batches=batches, student_totals=student_totals, batch_summary=batch_summary,
+                           overdue_students=overdue_students, collected_this_month=collections['total'],
+                           revenue_totals=revenue_totals)
 
 @techzone_app.route("/student-management")
 def student_management():
     if not session.get("logged_in") or session.get("role") != "Admin":
         return redirect(url_for("login"))
     
-    batches = get_all_batches()
-    students = get_all_students()
+    # Counts come from the reporting replica instead of scanning every student
+    batches, batch_counts, student_totals = _replica_figures()
     
     # Calculate batch-wise summary
     batch_summary = []
@@ -1666,46 +1373,40 @@ def student_management():
         batch_id = batch['_id']
         batch_display_name = f"{batch.get('batch_name', 'Unknown')} ({batch.get('start_time', 'Unknown')}-{batch.get('end_time', 'Unknown')}) ({batch.get('batch_start_date', 'Unknown')})"
         
-        # Count students in this batch
-        batch_students = [s for s in students if s.get('batch_id') == batch_id]
-        total_students = len(batch_students)
-        
-        # Count paid and unpaid students
-        paid_students = len([s for s in batch_students if s.get('fees_status') == 'Paid'])
-        unpaid_students = total_students - paid_students
+        # Paid and unpaid students in this batch
+        counts = batch_counts.get(batch_id, {'total_students': 0, 'paid_students': 0})
         
         batch_summary.append({
             'batch_name': batch_display_name,
-            'total_students': total_students,
-            'paid_students': paid_students,
-            'unpaid_students': unpaid_students
+            'total_students': counts['total_students'],
+            'paid_students': counts['paid_students'],
+            'unpaid_students': counts['total_students'] - counts['paid_students']
         })
     
     # Sort batch summary by batch name
     batch_summary.sort(key=lambda x: x['batch_name'])
     
-    return render_template("student_management.html", batches=batches, students=students, batch_summary=batch_summary)
+    return render_template("student_management.html", batches=batches, student_totals=student_totals,
+                           batch_summary=batch_summary)
 
 @techzone_app.route("/student-details", methods=["GET", "POST"])
 def student_details():
     if not session.get("logged_in") or session.get("role") != "Admin":
         return redirect(url_for("login"))
     
-    # Handle search via GET request
+    # Search, filters and page cursors all come from the query string
     search_query = request.args.get('search_query', '').strip()
-
-    # Initialize filter variables
-    selected_batch = request.form.get("batch") if request.method == "POST" else None
-    selected_status = request.form.get("fee_status") if request.method == "POST" else None
+    selected_batch = request.args.get("batch") or None
+    selected_status = request.args.get("fee_status") or None
     
     if request.method == "POST":
         action = request.form.get("action")
         
-        # Handle filter form submission
+        # Filter form posts from older pages: redirect to the GET form of the filter
         if action == "filter_students":
-            selected_batch = request.form.get("batch")
-            selected_status = request.form.get("fee_status")
-            # Don't process other POST actions, just filter
+            return redirect(url_for("student_details",
+                                    batch=request.form.get("batch") or None,
+                                    fee_status=request.form.get("fee_status") or None))
         elif action == "add_student":
             # Handle fees due date
             fees_due_date = request.form["fees_due_date"]
@@ -1723,7 +1424,7 @@ def student_details():
                     # Continue with error but use default
                     course_initials = "CUSTOM"
             
-            print("[DEBUG] Received batch_id from form:", request.form.get("batch_id"))
+            students_log.debug("Received batch_id from form: %s", request.form.get("batch_id"))
             student_data = {
                 "course_initials": course_initials,
                 "student_name": request.form["student_name"],
@@ -1790,101 +1491,11 @@ def student_details():
             # Regenerate student_id if batch_time or batch_start_date changes
             old_student = get_student_by_id(student_id)
             old_batch_time = old_student.get("batch_time") if old_student else None
-            old_batch_start_date = None
-            if old_student:
-                # Find the batch for the old batch_time
-                old_batches = get_all_batches()
-                old_selected_batch_name = old_batch_time.split(' (')[0] if old_batch_time and ' (' in old_batch_time else old_batch_time
-                for batch in old_batches:
-                    if batch.get('batch_name') == old_selected_batch_name:
-                        old_batch_start_date = batch.get('batch_start_date', None)
-                        break
-            # Get new batch start date and times using the same logic as add_student
             new_batch_time = student_data["batch_time"]
-            new_batch_start_date = 'Unknown'
-            batch_start_time, batch_end_time = 'Unknown', 'Unknown'
-            
-            if new_batch_time:
-                # Handle new batch format: "Batch Name (Start Date) (Start Time-End Time)"
-                # Example: "Prompt Engineering (01-AUG-2025) (4:00-5:00)"
-                
-                # Extract times from the new format
-                if '(' in new_batch_time and ')' in new_batch_time:
-                    try:
-                        # Find the time section in the last set of parentheses
-                        last_open = new_batch_time.rfind('(')
-                        last_close = new_batch_time.rfind(')')
-                        if last_open != -1 and last_close != -1 and last_close > last_open:
-                            time_section = new_batch_time[last_open + 1:last_close]
-                            print(f"Debug: Time section extracted: {time_section}")
-                            
-                            # Split by "-" to get start and end times
-                            if '-' in time_section:
-                                times = time_section.split('-')
-                                if len(times) == 2:
-                                    batch_start_time = times[0].strip()
-                                    batch_end_time = times[1].strip()
-                                    print(f"Debug: Extracted times - Start: {batch_start_time}, End: {batch_end_time}")
-                    except Exception as e:
-                        print(f"Error parsing times from new format: {e}")
-                        # Fallback: try to get times from batch record
-                        try:
-                            new_selected_batch_name = new_batch_time.split(' (')[0] if ' (' in new_batch_time else new_batch_time
-                            batches = get_all_batches()
-                            for batch in batches:
-                                if batch.get('batch_name') == new_selected_batch_name or batch.get('original_batch_name') == new_selected_batch_name:
-                                    batch_start_time = batch.get('start_time', 'Unknown')
-                                    batch_end_time = batch.get('end_time', 'Unknown')
-                                    print(f"Debug: Fallback times from batch - Start: {batch_start_time}, End: {batch_end_time}")
-                                    break
-                        except Exception as fallback_e:
-                            print(f"Error in fallback time parsing: {fallback_e}")
-                
-                # Extract batch start date from the second set of parentheses
-                if new_batch_time.count('(') >= 2:  # Should have at least 2 sets of parentheses
-                    try:
-                        # Find the second set of parentheses (date section)
-                        first_open = new_batch_time.find('(')
-                        first_close = new_batch_time.find(')', first_open)
-                        if first_close != -1:
-                            second_open = new_batch_time.find('(', first_close + 1)
-                            if second_open != -1:
-                                second_close = new_batch_time.find(')', second_open)
-                                if second_close != -1:
-                                    date_section = new_batch_time[second_open + 1:second_close]
-                                    print(f"Debug: Date section extracted: {date_section}")
-                                    
-                                    # Check if this is a date format (contains numbers and dashes)
-                                    if any(char.isdigit() for char in date_section) and '-' in date_section:
-                                        new_batch_start_date = date_section.upper()
-                                        print(f"Debug: Formatted date: {new_batch_start_date}")
-                    except Exception as e:
-                        print(f"Error parsing date from batch name: {e}")
-                
-                # If we still don't have a batch start date, try to get it from the batch record
-                if new_batch_start_date == 'Unknown':
-                    print("Debug: Trying to get date from batch record")
-                    # Extract the base batch name (before the first parenthesis)
-                    new_selected_batch_name = new_batch_time.split(' (')[0] if ' (' in new_batch_time else new_batch_time
-                    print(f"Debug: Selected batch name: {new_selected_batch_name}")
-                    
-                    # Find the batch to get its start date
-                    batches = get_all_batches()
-                    for batch in batches:
-                        if batch.get('batch_name') == new_selected_batch_name or batch.get('original_batch_name') == new_selected_batch_name:
-                            new_batch_start_date = batch.get('batch_start_date', 'Unknown')
-                            print(f"Debug: Found batch start date: {new_batch_start_date}")
-                            # Convert date format from YYYY-MM-DD to DD-Mon-YYYY
-                            if new_batch_start_date != 'Unknown' and new_batch_start_date:
-                                try:
-                                    date_obj = datetime.strptime(new_batch_start_date, '%Y-%m-%d')
-                                    new_batch_start_date = date_obj.strftime('%d-%b-%Y').upper()
-                                    print(f"Debug: Converted date: {new_batch_start_date}")
-                                except Exception as e:
-                                    print(f"Error parsing batch start date: {e}")
-                            break
-            # If batch_time or batch_start_date changed, regenerate student_id
-            if (old_batch_time != new_batch_time) or (old_batch_start_date != new_batch_start_date):
+            batches = get_cached_batches()
+            old_batch = resolve_batch_time(old_batch_time, batches)
+            new_batch = resolve_batch_time(new_batch_time, batches)
+            if (old_batch_time != new_batch_time) or (old_batch.start_date != new_batch.start_date):
                 course_initials = student_data.get('course_initials')
                 phone_number = student_data.get('student_number')
                 if course_initials and phone_number:
@@ -1893,18 +1504,11 @@ def student_details():
                     if generated_id is not None:
                         student_data['student_id'] = generated_id
                     else:
-                        # If simple ID exists, keep the old complex format but with proper fallback
-                        if batch_start_time == 'Unknown' or batch_end_time == 'Unknown':
-                            # Try to get times from the batch record instead
-                            batches = get_all_batches()
-                            new_selected_batch_name = new_batch_time.split(' (')[0] if new_batch_time and ' (' in new_batch_time else new_batch_time
-                            for batch in batches:
-                                if batch.get('batch_name') == new_selected_batch_name or batch.get('original_batch_name') == new_selected_batch_name:
-                                    batch_start_time = batch.get('start_time', batch_start_time)
-                                    batch_end_time = batch.get('end_time', batch_end_time)
-                                    break
-                        
-                        generated_id = generate_student_id(course_initials, batch_start_time, batch_end_time, new_batch_start_date)
+                        # If simple ID exists, keep the old complex format
+                        generated_id = generate_student_id(course_initials,
+                                                           new_batch.start_time or 'Unknown',
+                                                           new_batch.end_time or 'Unknown',
+                                                           new_batch.start_date or 'Unknown')
                         student_data['student_id'] = generated_id
             # Remove the student_id from update data to keep original ID if not changed
             elif 'student_id' in student_data:
@@ -1926,34 +1530,151 @@ def student_details():
             student_id = request.form["student_id_hidden"]
             student = get_student_by_id(student_id)
             if student and student.get('email'):
-                if send_student_email(student['email'], student):
-                    flash(f"Email sent successfully to {student['email']}!", "success")
+                # The stored password is a hash, so the email carries a new one, saved once it is sent
+                new_password = secrets.token_urlsafe(9) if is_password_hash(student.get('password')) else None
+                if send_student_email(student['email'], student, password=new_password):
+                    if new_password and not set_student_password(student_id, new_password):
+                        flash(f"Email sent to {student['email']}, but the new password could not be saved!", "danger")
+                    else:
+                        flash(f"Email sent successfully to {student['email']}!", "success")
                 else:
                     flash("Error sending email. Please check email configuration.", "danger")
             else:
                 flash("Student not found or email not provided!", "danger")
     
-    batches = get_all_batches()
-    all_students = get_all_students()
+    batches = get_cached_batches()
+    page = {'students': [], 'next_cursor': None, 'prev_cursor': None}
     
     # Determine which students to display
     if search_query:
-        student = next((s for s in all_students if s.get('student_id') == search_query), None)
+        student = find_student_by_student_id(search_query)
         if student:
-            filtered_students = [student]
+            page['students'] = [student]
             flash(f"Showing result for student ID: {search_query}", "info")
         else:
-            filtered_students = []
             flash(f"No student found with ID: {search_query}", "danger")
     else:
-        # Apply filters if they exist
-        filtered_students = all_students
-        if selected_batch:
-            filtered_students = [s for s in filtered_students if s.get('batch_time') == selected_batch]
-        if selected_status:
-            filtered_students = [s for s in filtered_students if s.get('fees_status') == selected_status]
+        try:
+            page_size = min(max(int(request.args.get('per_page', STUDENT_PAGE_SIZE)), 10), 200)
+        except ValueError:
+            page_size = STUDENT_PAGE_SIZE
+        page = get_students_page(
+            batch_time=selected_batch,
+            fees_status=selected_status,
+            page_size=page_size,
+            after=request.args.get('after'),
+            before=request.args.get('before')
+        )
     
-    return render_template("student_details.html", students=filtered_students, batches=batches, selected_batch=selected_batch, selected_status=selected_status)
+    # Pagination links carry every active filter (batch, fee status, page size, ...) besides the cursor
+    page_args = {key: value for key, value in request.args.items() if value and key not in ('after', 'before')}
+    return render_template("student_details.html", students=page['students'], batches=batches,
+                           selected_batch=selected_batch, selected_status=selected_status, page_args=page_args,
+                           next_cursor=page['next_cursor'], prev_cursor=page['prev_cursor'])
+
+@techzone_app.route("/api/students/search")
+def search_students_api():
+    """Autocomplete: students matching a partial name, phone, email or student ID"""
+    if not session.get("logged_in") or session.get("role") not in ["Admin", "Super Admin"]:
+        return jsonify({'success': False, 'message': 'Authentication required.'}), 401
+    query = request.args.get('q', '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    return jsonify({'success': True, 'results': student_search_index.search(query, limit=limit)})
+
+def on_student_imported(doc_id, student_data):
+    # The import already wrote the student's fee ledger with the student
+    student_search_index.upsert(doc_id, student_data)
+    reporting_replica.expire()
+
+@techzone_app.route("/students/import", methods=["POST"])
+def import_students_route():
+    """Bulk import students from an uploaded CSV/XLSX roster; returns a per-row error report"""
+    if not session.get("logged_in") or session.get("role") != "Admin":
+        return jsonify({'success': False, 'message': 'Authentication required.'}), 401
+    if not firebase_available():
+        return jsonify({'success': False, 'message': 'Firebase not available'}), 503
+    upload = request.files.get('roster')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'message': 'No roster file uploaded.'}), 400
+    try:
+        roster = read_roster(upload, upload.filename)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    report = import_students(students_collection, firebase_config.db, roster, get_cached_batches(),
+                             dry_run=request.form.get('dry_run') == 'true',
+                             on_imported=on_student_imported)
+    return jsonify(dict(report, success=True))
+
+@techzone_app.route("/export/<dataset>.<export_format>")
+def export_data(dataset, export_format):
+    """Stream students (with the student details filters), course tracking or feedback as CSV/XLSX"""
+    role = session.get("role") if session.get("logged_in") else None
+    allowed_roles = {'students': ["Admin"], 'course-tracking': ["Admin", "Super Admin"], 'student-feedback': ["Admin"]}
+    if dataset not in allowed_roles:
+        return "Unknown export", 404
+    if role not in allowed_roles[dataset]:
+        return redirect(url_for("login"))
+    if not firebase_available():
+        flash("Firebase not available", "danger")
+        return redirect(request.referrer or url_for("dashboard"))
+    if dataset == 'students':
+        query, fields = students_collection, STUDENT_EXPORT_FIELDS
+        if request.args.get('batch'):
+            query = query.where('batch_time', '==', request.args['batch'])
+        if request.args.get('fee_status'):
+            query = query.where('fees_status', '==', request.args['fee_status'])
+    elif dataset == 'course-tracking':
+        query, fields = course_tracking_collection, TRACKING_EXPORT_FIELDS
+    else:
+        query, fields = student_feedback_collection, FEEDBACK_EXPORT_FIELDS
+    try:
+        body, mimetype = stream_export(export_format, fields, iter_documents(query, fields), title=dataset)
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(request.referrer or url_for("dashboard"))
+    filename = f"{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@techzone_app.route("/api/analytics/revenue")
+def revenue_analytics_api():
+    """Daily enrollment / collection / outstanding series per batch or per course, for dashboard charts"""
+    if not session.get("logged_in") or session.get("role") not in ["Admin", "Super Admin"]:
+        return jsonify({'success': False, 'message': 'Authentication required.'}), 401
+    dimension = request.args.get('by', 'batch')
+    try:
+        days = min(max(int(request.args.get('days', 90)), 7), 730)
+    except ValueError:
+        days = 90
+    try:
+        result = revenue_analytics.series(dimension, days=days)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        reports_log.error("Error building revenue analytics: %s", e)
+        return jsonify({'success': False, 'message': 'Analytics unavailable.'}), 503
+    if dimension == 'batch':
+        names = {batch['_id']: display_name(batch) for batch in get_cached_batches()}
+        result['labels'] = {key: names.get(key, key) for key in result['series']}
+    else:
+        result['labels'] = {key: key for key in result['series']}
+    return jsonify(dict(result, success=True, totals=revenue_analytics.totals()))
+
+@techzone_app.route("/metrics")
+def prometheus_metrics():
+    """Request and Firestore/Storage call metrics in the Prometheus text format (Bearer METRICS_TOKEN).
+
+    Without METRICS_TOKEN configured the endpoint does not exist (404).
+    """
+    token = os.environ.get('METRICS_TOKEN')
+    if not token:
+        return Response("Not Found\n", status=404, mimetype='text/plain')
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return Response("Unauthorized\n", status=401, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 @techzone_app.route("/batch-management", methods=["GET", "POST"])
 def batch_management():
@@ -2018,7 +1739,7 @@ def print_student(student_id):
             flash("Student not found!", "danger")
             return redirect(url_for("student_details"))
     except Exception as e:
-        print(f"Error in print_student: {e}")
+        students_log.error("Error in print_student: %s", e)
         flash("Error retrieving student details for printing!", "danger")
         return redirect(url_for("student_details"))
 
@@ -2048,8 +1769,9 @@ def student_feedback():
         
         return redirect(url_for("student_feedback"))
     
-    feedbacks = get_all_student_feedback()
-    students = get_all_students()
+    feedbacks, students = gather(get_all_student_feedback,
+                                 lambda: get_all_students(VIEW_FIELDS['feedback_students']),
+                                 defaults=([], []))
     student_lookup = {student['_id']: student for student in students}
     
     enriched_feedbacks = []
@@ -2154,7 +1876,7 @@ def mark_as_read():
     student_doc = students_collection.document(student_id).get()
     if not student_doc.exists:
          # If student_id is not a doc id, it might be the username
-        docs = students_collection.where(filter=('student_id', '==', student_id)).limit(1).stream()
+        docs = students_collection.where('student_id', '==', student_id).limit(1).stream()
         student_doc = next(docs, None)
         if not student_doc:
             return jsonify({'success': False, 'message': 'Student not found.'}), 404
@@ -2172,13 +1894,12 @@ def mark_as_read():
 
 @techzone_app.route("/logout")
 def logout():
-    session.clear()
+    regenerate_session(session)
     return redirect(url_for("login"))
 
 @techzone_app.route('/send-otp', methods=['POST'])
 def send_otp():
     email = request.form.get('email')
-    print('SEND OTP email:', email)
     if not email:
         return jsonify({'success': False, 'message': 'Email is required.'}), 400
     # Email format validation
@@ -2188,7 +1909,6 @@ def send_otp():
     otp = str(random.randint(100000, 999999))
     session['student_email_otp'] = otp
     session['student_email_otp_email'] = email
-    print('SEND OTP SESSION:', dict(session))
     # Send OTP email
     try:
         msg = MIMEMultipart()
@@ -2204,15 +1924,13 @@ def send_otp():
         server.quit()
         return jsonify({'success': True, 'message': 'OTP sent successfully.'})
     except Exception as e:
-        print(f"Error sending OTP: {e}")
+        messaging_log.error("Error sending OTP: %s", e)
         return jsonify({'success': False, 'message': f'Failed to send OTP. {str(e)}'}), 500
 
 @techzone_app.route('/verify-otp', methods=['POST'])
 def verify_otp():
     email = request.form.get('email')
     otp = request.form.get('otp')
-    print('VERIFY OTP email:', email, 'otp:', otp)
-    print('VERIFY OTP SESSION:', dict(session))
     if (
         'student_email_otp' in session and
         'student_email_otp_email' in session and
@@ -0,0 +1,311 @@
+"""
+Revenue and collection analytics for TechZone Academy Student Management System
+Keeps a snapshot of the fields analytics needs (students and ledger payments) as
+pandas frames, aggregates them into daily enrollment / billed / collected rows per
+batch and per course, and serves time series (with running outstanding balance)
+from those rows.
+
+The snapshot and the daily rows are persisted under ANALYTICS_DIR (Parquet when a
+Parquet engine is installed, pickle otherwise). A refresh only fetches students
+and payments written since the last watermark and re-aggregates just the days
+those writes touched; deletions mark the snapshot for a full rebuild.
+
+Workers share the snapshot, so invalidate() bumps a generation stamp in
+ANALYTICS_DIR: every worker checks it before refreshing and drops (or reloads) a
+snapshot built for an older generation instead of saving it over the rebuilt one.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from .fee_ledger import PAYMENTS_SUBCOLLECTION
+from .log_config import get_logger
+
+log = get_logger('reports')
+
+STUDENT_FIELDS = ['batch_id', 'course_name', 'total_fees', 'fees_paid', 'created_at', 'enrollment_date']
+PAYMENT_FIELDS = ['student_id', 'batch_id', 'amount', 'paid_on']
+DIMENSIONS = {'batch': 'batch_id', 'course': 'course_name'}
+DAILY_COLUMNS = ['dimension', 'key', 'date', 'enrollments', 'billed', 'collected']
+# Re-read writes from slightly before the watermark in case of clock skew between workers
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+@lru_cache(maxsize=None)
+def snapshot_format():
+    """'parquet' when a Parquet engine is installed, else 'pickle'"""
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(engine)
+            return 'parquet'
+        except ImportError:
+            pass
+    return 'pickle'
+
+
+def _student_frame(records):
+    """records: iterable of (doc_id, dict) -> frame indexed by student doc id"""
+    import pandas as pd
+    rows = [dict({field: data.get(field) for field in STUDENT_FIELDS}, _id=doc_id) for doc_id, data in records]
+    frame = pd.DataFrame(rows, columns=STUDENT_FIELDS + ['_id']).set_index('_id')
+    enrolled = pd.to_datetime(frame['created_at'], errors='coerce', format='%Y-%m-%d %H:%M:%S')
+    fallback = pd.to_datetime(frame['enrollment_date'], errors='coerce', format='%d-%m-%Y')
+    frame['enrolled_on'] = enrolled.fillna(fallback).dt.normalize()
+    for column in ('total_fees', 'fees_paid'):
+        frame[column] = pd.to_numeric(frame[column], errors='coerce').fillna(0.0)
+    frame['batch_id'] = frame['batch_id'].fillna('Unknown').astype(str)
+    frame['course_name'] = frame['course_name'].fillna('Unknown').astype(str)
+    return frame[['batch_id', 'course_name', 'total_fees', 'fees_paid', 'enrolled_on']]
+
+
+def _payment_frame(records):
+    """records: iterable of (doc_id, dict) -> frame indexed by payment doc path"""
+    import pandas as pd
+    rows = [dict({field: data.get(field) for field in PAYMENT_FIELDS}, _id=doc_id) for doc_id, data in records]
+    frame = pd.DataFrame(rows, columns=PAYMENT_FIELDS + ['_id']).set_index('_id')
+    frame['amount'] = pd.to_numeric(frame['amount'], errors='coerce').fillna(0.0)
+    frame['paid_on'] = pd.to_datetime(frame['paid_on'], errors='coerce', format='%Y-%m-%d')
+    frame['batch_id'] = frame['batch_id'].fillna('Unknown').astype(str)
+    return frame[['student_id', 'batch_id', 'amount', 'paid_on']]
+
+
+def aggregate_daily(students, payments, dates=None):
+    """Daily enrollments, billed fees and collections per batch and per course.
+
+    Only the given dates (a collection of normalized Timestamps) are aggregated when
+    dates is not None. Returns a long frame with DAILY_COLUMNS.
+    """
+    import pandas as pd
+    if dates is not None:
+        payments = payments[payments['paid_on'].isin(dates)]
+    # Payments are attributed to the course of the student who made them
+    courses = students['course_name'].reindex(payments['student_id'].unique()).fillna('Unknown')
+    payments = payments.join(courses, on='student_id')
+    if dates is not None:
+        students = students[students['enrolled_on'].isin(dates)]
+    frames = []
+    for dimension, column in DIMENSIONS.items():
+        enrolled = students.dropna(subset=['enrolled_on']).groupby([column, 'enrolled_on'])['total_fees']\
+                           .agg(enrollments='size', billed='sum')
+        collected = payments.dropna(subset=['paid_on']).groupby([column, 'paid_on'])['amount'].sum().rename('collected')
+        enrolled.index.names = collected.index.names = ['key', 'date']
+        daily = pd.concat([enrolled, collected], axis=1).fillna(0.0).reset_index()
+        daily.insert(0, 'dimension', dimension)
+        frames.append(daily)
+    result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=DAILY_COLUMNS)
+    return result.reindex(columns=DAILY_COLUMNS)
+
+
+class RevenueAnalytics:
+    """Cached, incrementally refreshed revenue time series"""
+
+    def __init__(self, db_loader, cache_dir, refresh_seconds=60, full_rebuild_seconds=6 * 3600):
+        self._db_loader = db_loader
+        self._cache_dir = cache_dir
+        self._refresh_seconds = refresh_seconds
+        self._full_rebuild_seconds = full_rebuild_seconds
+        self._lock = threading.Lock()
+        self._students = self._payments = self._daily = None
+        self._meta = {}
+        self._checked_at = None
+        self._needs_full_rebuild = False
+
+    # ----- persistence -----
+    def _path(self, name):
+        return os.path.join(self._cache_dir, f"{name}.{snapshot_format()}")
+
+    def _generation(self):
+        """The shared invalidation stamp ('0' until the first invalidate())"""
+        try:
+            with open(os.path.join(self._cache_dir, 'generation')) as f:
+                return f.read().strip() or '0'
+        except OSError:
+            return '0'
+
+    def _bump_generation(self):
+        os.makedirs(self._cache_dir, exist_ok=True)
+        path = os.path.join(self._cache_dir, 'generation')
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, 'w') as f:
+            f.write(str(time.time_ns()))
+        os.replace(temp, path)
+
+    def _save(self):
+        """Write every file to a temporary name first and os.replace them into place, meta.json
+        last, so a crash or a concurrent reader never sees a half-written snapshot"""
+        os.makedirs(self._cache_dir, exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        written = []
+        try:
+            for name, frame in (('students', self._students), ('payments', self._payments), ('daily', self._daily)):
+                path = self._path(name)
+                written.append(path)
+                if snapshot_format() == 'parquet':
+                    frame.to_parquet(path + suffix)
+                else:
+                    frame.to_pickle(path + suffix)
+            meta_path = os.path.join(self._cache_dir, 'meta.json')
+            written.append(meta_path)
+            with open(meta_path + suffix, 'w') as f:
+                json.dump(self._meta, f)
+            for path in written:
+                os.replace(path + suffix, path)
+        finally:
+            for path in written:
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def _load(self):
+        import pandas as pd
+        try:
+            with open(os.path.join(self._cache_dir, 'meta.json')) as f:
+                meta = json.load(f)
+            reader = pd.read_parquet if snapshot_format() == 'parquet' else pd.read_pickle
+            self._students, self._payments, self._daily = (reader(self._path(name))
+                                                           for name in ('students', 'payments', 'daily'))
+            self._meta = meta
+            return True
+        except Exception as e:
+            # Missing, truncated or unreadable (e.g. written by another pandas/pyarrow): rebuild it
+            log.info("No usable analytics snapshot in %s (%s); rebuilding", self._cache_dir, e)
+            return False
+
+    # ----- refresh -----
+    def _fetch(self, db, since=None):
+        students_query = db.collection('students').select(STUDENT_FIELDS + ['updated_at'])
+        payments_query = db.collection_group(PAYMENTS_SUBCOLLECTION).where('kind', '==', 'payment')
+        if since is None:
+            students = [(doc.id, doc.to_dict()) for doc in students_query.stream()]
+            payments_docs = payments_query.select(PAYMENT_FIELDS).stream()
+        else:
+            # New students carry created_at, edited ones updated_at
+            students = {}
+            for field in ('created_at', 'updated_at'):
+                for doc in students_query.where(field, '>=', since).stream():
+                    students[doc.id] = doc.to_dict()
+            students = list(students.items())
+            payments_docs = payments_query.where('paid_on', '>=', since[:10]).select(PAYMENT_FIELDS).stream()
+        payments = [(doc.reference.path, doc.to_dict()) for doc in payments_docs]
+        return _student_frame(students), _payment_frame(payments)
+
+    def _full_rebuild(self, db, started):
+        self._students, self._payments = self._fetch(db)
+        self._daily = aggregate_daily(self._students, self._payments)
+        self._meta = {'watermark': started, 'full_built_at': time.time()}
+
+    def _incremental(self, db, started):
+        import pandas as pd
+        since = (datetime.strptime(self._meta['watermark'], '%Y-%m-%d %H:%M:%S') - WATERMARK_OVERLAP)\
+            .strftime('%Y-%m-%d %H:%M:%S')
+        students, payments = self._fetch(db, since)
+        if students.empty and payments.empty:
+            self._meta['watermark'] = started
+            return False
+        # Days touched: old and new enrollment days of changed students, the days of their
+        # payments (their course may have changed) and the days of new payments
+        touched = set(students['enrolled_on'].dropna())
+        touched.update(self._students['enrolled_on'].reindex(students.index).dropna())
+        touched.update(self._payments.loc[self._payments['student_id'].isin(students.index), 'paid_on'].dropna())
+        touched.update(payments['paid_on'].dropna())
+
+        self._students = pd.concat([self._students.drop(students.index, errors='ignore'), students])
+        self._payments = pd.concat([self._payments.drop(payments.index, errors='ignore'), payments])
+        untouched = self._daily[~self._daily['date'].isin(touched)]
+        self._daily = pd.concat([untouched, aggregate_daily(self._students, self._payments, dates=touched)],
+                                ignore_index=True)
+        self._meta['watermark'] = started
+        return True
+
+    def refresh(self, force=False):
+        """Bring the snapshot up to date (at most once every refresh_seconds unless forced)"""
+        with self._lock:
+            now = time.monotonic()
+            generation = self._generation()
+            if self._daily is not None and self._meta.get('generation', '0') != generation:
+                # Another worker invalidated the snapshot (deletions): forget this copy
+                self._students = self._payments = self._daily = None
+                self._meta = {}
+                self._checked_at = None
+            if not force and self._checked_at is not None and now - self._checked_at < self._refresh_seconds:
+                return
+            db = self._db_loader()
+            if db is None:
+                return
+            started = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            if self._daily is None and not self._needs_full_rebuild:
+                # The shared snapshot is only usable if it was built since the last invalidation
+                if self._load() and self._meta.get('generation', '0') != generation:
+                    self._students = self._payments = self._daily = None
+            stale = time.time() - self._meta.get('full_built_at', 0) > self._full_rebuild_seconds
+            if self._daily is None or self._needs_full_rebuild or stale:
+                self._full_rebuild(db, started)
+                changed = True
+            else:
+                changed = self._incremental(db, started)
+            self._meta['generation'] = generation
+            self._needs_full_rebuild = False
+            self._checked_at = now
+            if changed and self._generation() == generation:
+                try:
+                    self._save()
+                except Exception as e:
+                    log.warning("Could not persist analytics snapshot: %s", e)
+
+    def invalidate(self):
+        """Rebuild everything on the next refresh (after deletions), in every worker"""
+        with self._lock:
+            self._needs_full_rebuild = True
+            self._checked_at = None
+            try:
+                self._bump_generation()
+            except OSError as e:
+                log.warning("Could not flag the analytics snapshot for a rebuild: %s", e)
+
+    # ----- queries -----
+    def series(self, dimension='batch', days=90, today=None):
+        """Daily series per key over the last `days` days.
+
+        Returns {'dates': [...], 'series': {key: {'enrollments', 'billed', 'collected', 'outstanding'}}}
+        where outstanding is the running billed minus collected balance (from the first day on record).
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown analytics dimension: {dimension}")
+        import pandas as pd
+        self.refresh()
+        with self._lock:
+            daily = self._daily[self._daily['dimension'] == dimension] if self._daily is not None else None
+        end = pd.Timestamp(today or datetime.now()).normalize()
+        start = end - pd.Timedelta(days=days - 1)
+        dates = pd.date_range(start, end, freq='D')
+        result = {'dates': [day.strftime('%Y-%m-%d') for day in dates], 'series': {}}
+        if daily is None or daily.empty:
+            return result
+        for key, rows in daily.groupby('key'):
+            per_day = rows.set_index('date')[['enrollments', 'billed', 'collected']].resample('D').sum()
+            per_day['outstanding'] = (per_day['billed'] - per_day['collected']).cumsum()
+            # Days before the window still count towards the running balance
+            window = per_day.reindex(dates)
+            window[['enrollments', 'billed', 'collected']] = window[['enrollments', 'billed', 'collected']].fillna(0)
+            window['outstanding'] = window['outstanding'].ffill()
+            if start > per_day.index.min():
+                window['outstanding'] = window['outstanding'].fillna(
+                    per_day.loc[per_day.index < start, 'outstanding'].iloc[-1])
+            window['outstanding'] = window['outstanding'].fillna(0)
+            result['series'][key] = {column: [round(float(value), 2) for value in window[column]]
+                                     for column in ('enrollments', 'billed', 'collected', 'outstanding')}
+        return result
+
+    def totals(self):
+        """{'billed', 'collected', 'outstanding', 'students'} over the whole snapshot"""
+        self.refresh()
+        with self._lock:
+            students = self._students
+        if students is None or students.empty:
+            return {'billed': 0.0, 'collected': 0.0, 'outstanding': 0.0, 'students': 0}
+        billed, collected = float(students['total_fees'].sum()), float(students['fees_paid'].sum())
+        return {'billed': round(billed, 2), 'collected': round(collected, 2),
+                'outstanding': round(billed - collected, 2), 'students': int(len(students))}
@@ -0,0 +1,113 @@
+"""
+Authentication service for TechZone Academy Student Management System
+Verifies Super Admin / Admin / Trainer logins against a cached index of the
+role_credentials collection, and student logins with a single indexed
+(batch_id, username) lookup, so a login costs at most one Firestore read.
+The index only maps (username, role) to document ids: the matched document is
+read fresh on every login, so a password changed or an account deleted by
+another worker takes effect immediately.
+Legacy password formats are rehashed with the current KDF after a successful login.
+"""
+
+from .cache import TimedCache
+from .credentials import hash_password, verify_password
+from .log_config import get_logger
+
+log = get_logger('auth')
+
+
+class AuthService:
+    """Role and student credential verification"""
+
+    def __init__(self, credentials_collection, students_collection=None,
+                 ttl_seconds=300, miss_refresh_seconds=30):
+        self._collection = credentials_collection
+        self._students_collection = students_collection
+        self._miss_refresh_seconds = miss_refresh_seconds
+        self._credentials = TimedCache(self._load_credentials, ttl_seconds)
+
+    def _load_credentials(self):
+        """Read every role credential's username and role once and index doc ids by (username, role).
+
+        Raises if the read fails, so an empty or partial index is never cached.
+        """
+        index = {}
+        if self._collection is None:
+            return index
+        for doc in self._collection.select(['username', 'role']).stream():
+            record = doc.to_dict()
+            key = (record.get('username'), record.get('role'))
+            index.setdefault(key, []).append(doc.id)
+        log.info("Loaded %d role credentials into the login cache", len(index))
+        return index
+
+    def _candidates(self, username, role):
+        """Cached doc ids for the login, None if unknown or the credentials can't be read"""
+        try:
+            return self._credentials.get().get((username, role))
+        except Exception as e:
+            log.error("Error loading role credentials: %s", e)
+            return None
+
+    def invalidate(self):
+        """Forget cached credentials; call after any write to role_credentials"""
+        self._credentials.invalidate()
+
+    def verify_role_login(self, username, password, role):
+        """Return True if the username/password pair is valid for the role"""
+        candidates = self._candidates(username, role)
+        if candidates is None:
+            # Unknown user: the account may have been created since the last load,
+            # so refresh once, but never more often than miss_refresh_seconds.
+            age = self._credentials.age()
+            if age is None or age < self._miss_refresh_seconds:
+                return False
+            self._credentials.invalidate()
+            candidates = self._candidates(username, role)
+            if candidates is None:
+                return False
+        for doc_id in candidates:
+            try:
+                doc = self._collection.document(doc_id).get()
+            except Exception as e:
+                log.error("Error reading role credential %s: %s", doc_id, e)
+                return False
+            record = doc.to_dict() if doc.exists else None
+            if not record or (record.get('username'), record.get('role')) != (username, role):
+                # Deleted or renamed since the index was loaded (possibly by another worker)
+                self.invalidate()
+                continue
+            matches, needs_rehash = verify_password(password, record.get('password'))
+            if matches:
+                if needs_rehash:
+                    self._rehash(doc.reference, password)
+                return True
+        return False
+
+    def verify_student_login(self, username, password, batch_id):
+        """Return the student record (with '_id') if the credentials match a student of the batch, else None"""
+        if self._students_collection is None:
+            return None
+        docs = self._students_collection.where('batch_id', '==', batch_id)\
+                                        .where('username', '==', username)\
+                                        .limit(1)\
+                                        .stream()
+        student_doc = next(iter(docs), None)
+        if student_doc is None:
+            return None
+        student_data = student_doc.to_dict()
+        matches, needs_rehash = verify_password(password, student_data.get('password'))
+        if not matches:
+            return None
+        if needs_rehash:
+            self._rehash(student_doc.reference, password)
+        student_data['_id'] = student_doc.id
+        return student_data
+
+    @staticmethod
+    def _rehash(doc_ref, password):
+        """Upgrade a stored password to the current KDF; a failure here must not block the login"""
+        try:
+            doc_ref.update({'password': hash_password(password)})
+        except Exception as e:
+            log.warning("Could not rehash password for %s: %s", doc_ref.id, e)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Cascading batch deletion for TechZone Academy Student Management System
+Deleting a batch also removes its students (with their payments ledgers),
+trainer_files records, the files' Storage blobs and the batch's messages. Dependents are found with indexed
+batch_id queries, deleted page by page with batched writes (blobs in parallel),
+and the batch document itself is deleted last.
+
+Progress is recorded in the batch_deletion_jobs collection (one document per
+batch). Every stage is idempotent, so an interrupted job is resumed by running it
+again:  python -m portalflask.batch_cascade resume
+A file whose Storage blob could not be deleted keeps its record (the path is
+listed in the job's failed_blobs) and the job is marked failed, so the resume
+retries the blob instead of orphaning it.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .bulk_writer import bulk_delete
+from .fee_ledger import PAYMENTS_SUBCOLLECTION
+from .log_config import get_logger
+
+log = get_logger('batches')
+
+JOBS_COLLECTION = 'batch_deletion_jobs'
+PAGE_SIZE = 2000
+BLOB_WORKERS = 8
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class BlobDeletionError(RuntimeError):
+    """Some Storage blobs could not be deleted; their file records are kept so a resume retries them"""
+
+
+def _delete_blob(bucket, storage_path):
+    """True once the blob is gone (deleted now, or already missing), False if deleting it failed"""
+    try:
+        bucket.blob(storage_path).delete()
+        return True
+    except Exception as e:
+        if type(e).__name__ == 'NotFound':
+            return True
+        log.warning("Could not delete blob %s: %s", storage_path, e)
+        return False
+
+
+def _delete_matching(db, query, on_deleted, on_page=None):
+    """Delete every document matched by query, one page of references at a time.
+
+    on_page(docs), if given, runs before a page is deleted and returns the documents
+    that may be deleted (the others are left in place); on_deleted(count) runs after.
+    """
+    cursor = None
+    while True:
+        docs = list((query.start_after(cursor) if cursor else query).limit(PAGE_SIZE).stream())
+        if not docs:
+            return
+        deletable = on_page(docs) if on_page else docs
+        on_deleted(bulk_delete(db, [doc.reference for doc in deletable]))
+        if len(docs) < PAGE_SIZE:
+            return
+        cursor = docs[-1]
+
+
+def cascade_delete_batch(db, bucket, batch_id, progress=None):
+    """Delete a batch and everything that belongs to it.
+
+    progress, if given, is called as progress(stage, counts) after every page.
+    Returns the final counts dict, e.g. {'payments': 90, 'students': 30, 'messages': 12, 'files': 4, 'blobs': 4}.
+    """
+    batch_id = str(batch_id)
+    job_ref = db.collection(JOBS_COLLECTION).document(batch_id)
+    job_snapshot = job_ref.get()
+    previous_job = job_snapshot.to_dict() if job_snapshot.exists else {}
+    counts = {'payments': 0, 'students': 0, 'messages': 0, 'files': 0, 'blobs': 0}
+    counts.update(previous_job.get('counts', {}))
+    job_ref.set({
+        'batch_id': batch_id,
+        'status': 'running',
+        'counts': counts,
+        'started_at': previous_job.get('started_at', _now()),
+        'updated_at': _now(),
+    }, merge=True)
+
+    def counter(stage):
+        def on_deleted(count):
+            counts[stage] += count
+            job_ref.update({'stage': stage, 'counts': counts, 'updated_at': _now()})
+            if progress:
+                progress(stage, dict(counts))
+        return on_deleted
+
+    try:
+        # Payments ledgers before their students, so a resumed job can still find them by batch_id.
+        # Ledger rows of a student who moved batches keep the old batch_id, so each
+        # student's own subcollection is cleared as well.
+        payments_query = db.collection_group(PAYMENTS_SUBCOLLECTION).where('batch_id', '==', batch_id).select([])
+        _delete_matching(db, payments_query, counter('payments'))
+
+        def delete_ledgers(docs):
+            refs = [payment.reference for doc in docs
+                    for payment in doc.reference.collection(PAYMENTS_SUBCOLLECTION).select([]).stream()]
+            counts['payments'] += bulk_delete(db, refs)
+            return docs
+
+        # Students and messages of the batch: only references are needed
+        students_query = db.collection('students').where('batch_id', '==', batch_id).select([])
+        _delete_matching(db, students_query, counter('students'), on_page=delete_ledgers)
+
+        messages_query = db.collection('messages').where('batch_id', '==', batch_id).select([])
+        _delete_matching(db, messages_query, counter('messages'))
+
+        # Trainer files: delete the Storage blobs of each page before their records. A record whose
+        # blob could not be deleted is kept (and its path noted on the job) so a resume retries it.
+        failed_blobs = []
+
+        def delete_blobs(docs):
+            if bucket is None:
+                return docs
+            paths = {}
+            for doc in docs:
+                record = doc.to_dict()
+                if record.get('uploaded_to_storage'):
+                    paths[doc.id] = record.get('storage_path') or f"trainer_uploads/{record.get('filename')}"
+            with ThreadPoolExecutor(max_workers=BLOB_WORKERS) as executor:
+                deleted = dict(zip(paths, executor.map(lambda path: _delete_blob(bucket, path), paths.values())))
+            counts['blobs'] += sum(deleted.values())
+            failed_blobs.extend(paths[doc_id] for doc_id, ok in deleted.items() if not ok)
+            return [doc for doc in docs if deleted.get(doc.id, True)]
+
+        files_query = db.collection('trainer_files').where('batch_id', '==', batch_id)\
+                                                     .select(['filename', 'storage_path', 'uploaded_to_storage'])
+        _delete_matching(db, files_query, counter('files'), on_page=delete_blobs)
+        if failed_blobs:
+            job_ref.update({'failed_blobs': failed_blobs})
+            raise BlobDeletionError(f"{len(failed_blobs)} Storage blob(s) could not be deleted")
+
+        db.collection('batches').document(batch_id).delete()
+        job_ref.update({'status': 'completed', 'stage': 'batch', 'counts': counts, 'error': None, 'failed_blobs': [],
+                        'completed_at': _now()})
+        if progress:
+            progress('batch', dict(counts))
+        log.info("Cascade delete of batch %s completed: %s", batch_id, counts)
+        return counts
+    except Exception as e:
+        job_ref.update({'status': 'failed', 'error': str(e), 'counts': counts, 'updated_at': _now()})
+        raise
+
+
+def resume_pending_deletions(db, bucket, progress=None):
+    """Re-run every batch deletion job that did not complete; returns the batch ids resumed"""
+    resumed = []
+    for job in db.collection(JOBS_COLLECTION).where('status', 'in', ['running', 'failed']).stream():
+        batch_id = job.to_dict().get('batch_id', job.id)
+        log.info("Resuming cascade delete of batch %s", batch_id)
+        cascade_delete_batch(db, bucket, batch_id, progress=progress)
+        resumed.append(batch_id)
+    return resumed
+
+
+if __name__ == "__main__":
+    from .firebase_config import firebase_config
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ('resume', 'delete'):
+        print("Usage: python -m portalflask.batch_cascade resume | delete <batch_id>")
+        sys.exit(1)
+    if not firebase_config.firebase_available:
+        print("Firebase not available!")
+        sys.exit(1)
+
+    def print_progress(stage, counts):
+        print(f"[{stage}] {counts}")
+
+    if sys.argv[1] == 'resume':
+        batch_ids = resume_pending_deletions(firebase_config.db, firebase_config.storage_bucket, print_progress)
+        print(f"Resumed {len(batch_ids)} batch deletion(s)")
+    else:
+        cascade_delete_batch(firebase_config.db, firebase_config.storage_bucket, sys.argv[2], print_progress)
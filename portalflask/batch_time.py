@@ -0,0 +1,95 @@
+"""
+Batch time parsing for TechZone Academy Student Management System
+A student's batch_time is the batch display string chosen in the admin forms:
+    "Prompt Engineering (4:00)-(5:00) (01-AUG-2025)"   current format
+    "Prompt Engineering (01-AUG-2025) (4:00-5:00)"     older format
+parse_batch_time() turns either into a BatchTime with precompiled regexes and is
+memoized by input string; resolve_batch_time() fills anything missing from the
+batch catalog instead of re-reading batches from Firestore.
+"""
+
+import re
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+BatchTime = namedtuple('BatchTime', ['name', 'start_time', 'end_time', 'start_date'])
+BatchTime.__doc__ = "Parsed batch_time; missing parts are None. start_date is DD-MON-YYYY, e.g. 01-AUG-2025"
+
+# "Name (start)-(end) (date)"
+_DISPLAY_FORMAT = re.compile(r'^(?P<name>.*?) \((?P<start>[^()]*)\)-\((?P<end>[^()]*)\) \((?P<date>[^()]*)\)$')
+# "Name (date) (start-end)"
+_LEGACY_FORMAT = re.compile(r'^(?P<name>.*?) \((?P<date>[^()]*)\) \((?P<start>[^()-]*)-(?P<end>[^()-]*)\)$')
+_DATE = re.compile(r'^(?=.*\d)[0-9A-Za-z]+-[0-9A-Za-z]+-[0-9A-Za-z]+$')
+
+
+def format_batch_date(date_str):
+    """Format a batch record date from YYYY-MM-DD to DD-MON-YYYY; other values are returned unchanged"""
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').strftime('%d-%b-%Y').upper()
+    except (TypeError, ValueError):
+        return date_str
+
+
+def _clean(value):
+    value = (value or '').strip()
+    return value if value and value not in ('Unknown', 'TBD') else None
+
+
+@lru_cache(maxsize=4096)
+def parse_batch_time(batch_time):
+    """Parse a batch_time display string; never raises"""
+    text = (batch_time or '').strip()
+    match = _DISPLAY_FORMAT.match(text) or _LEGACY_FORMAT.match(text)
+    if not match:
+        # Plain batch name, or something we cannot split: keep the part before any parenthesis
+        return BatchTime(_clean(text.split(' (')[0]), None, None, None)
+    date = _clean(match.group('date'))
+    if date and not _DATE.match(date):
+        date = None
+    return BatchTime(
+        _clean(match.group('name')),
+        _clean(match.group('start')),
+        _clean(match.group('end')),
+        date.upper() if date else None,
+    )
+
+
+def find_batch(batch_time, batches):
+    """Return the batch record from the catalog that batch_time refers to, or None.
+
+    Matches the exact display string first, then the batch name.
+    """
+    if not batch_time:
+        return None
+    for batch in batches:
+        if display_name(batch) == batch_time:
+            return batch
+    name = parse_batch_time(batch_time).name
+    for batch in batches:
+        if name and name in (batch.get('batch_name'), batch.get('original_batch_name')):
+            return batch
+    return None
+
+
+def display_name(batch):
+    """The batch_time string the admin forms use for a batch record"""
+    name = batch.get('original_batch_name') or batch.get('batch_name', '')
+    start_date = format_batch_date(batch.get('batch_start_date')) or 'Unknown'
+    return f"{name} ({batch.get('start_time', '')})-({batch.get('end_time', '')}) ({start_date})"
+
+
+def resolve_batch_time(batch_time, batches):
+    """Parse batch_time and fill missing start/end time and start date from the matching catalog batch"""
+    parsed = parse_batch_time(batch_time)
+    if parsed.start_time and parsed.end_time and parsed.start_date:
+        return parsed
+    batch = find_batch(batch_time, batches)
+    if batch is None:
+        return parsed
+    return BatchTime(
+        parsed.name,
+        parsed.start_time or _clean(batch.get('start_time')),
+        parsed.end_time or _clean(batch.get('end_time')),
+        parsed.start_date or _clean(format_batch_date(batch.get('batch_start_date'))),
+    )
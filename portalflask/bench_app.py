@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for TechZone Academy Student Management System
+Seeds a synthetic academy into the in-process Firestore/Storage fakes
+(fake_firestore), serves the real Flask app against them and measures, per page,
+latency and the Firestore reads / round trips each request costs:
+    dashboards for every role, /batch-summary, /student-details, both logins
+    and a file download.
+
+Results can be saved as JSON and compared with an earlier run; the comparison
+fails (exit code 1) when a page reads more documents or gets slower than the
+baseline by more than --tolerance.
+
+Usage:
+    python -m portalflask.bench_app [--scale small|full] [--rounds 5] [--latency-ms 0]
+                                    [--save results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SCALES = {
+    'small': dict(batches=5, students=200, tracking=500, files=50, messages=100, feedback=50),
+    'full': dict(batches=50, students=5000, tracking=20000, files=2000, messages=2000, feedback=1000),
+}
+COURSES = [('PE', 'Prompt Engineering'), ('DS', 'Data Science'), ('WD', 'Web Development'),
+           ('AI', 'Artificial Intelligence'), ('CS', 'Cyber Security')]
+TRAINERS = ['Asha', 'Ravi', 'Meera', 'Kiran', 'Sana']
+MODULES = ['Introduction', 'Python Basics', 'Data Handling', 'APIs', 'Projects', 'Revision']
+BENCH_PASSWORD = 'bench-password'
+FILE_BYTES = 2048
+
+
+def seed_academy(db, bucket=None, batches=50, students=5000, tracking=20000, files=2000, messages=2000,
+                 feedback=1000, seed=7):
+    """Write a synthetic academy through the regular client API.
+
+    Every account (students, Super Admin 'boss', Admin 'admin', trainers) uses
+    BENCH_PASSWORD. Returns sample identifiers for building requests:
+    {'batch_ids', 'student': {'username', 'batch_id', '_id'}, 'trainer', 'filename'}.
+    """
+    from .batch_time import display_name
+    from .bulk_writer import bulk_write
+    from .credentials import hash_password
+
+    rng = random.Random(seed)
+    password_hash = hash_password(BENCH_PASSWORD)
+    start = datetime(2025, 1, 6, 10, 0)
+    operations = []
+
+    batch_records = []
+    for number in range(batches):
+        initials, course = COURSES[number % len(COURSES)]
+        batch_start = start + timedelta(days=7 * number)
+        batch = {
+            'batch_name': f"{course} {number + 1:02d}",
+            'original_batch_name': f"{course} {number + 1:02d}",
+            'start_time': f"{4 + number % 6}:00",
+            'end_time': f"{5 + number % 6}:00",
+            'batch_start_date': batch_start.strftime('%Y-%m-%d'),
+            'created_at': batch_start.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        reference = db.collection('batches').document(f"batch-{number:03d}")
+        batch_records.append(dict(batch, _id=reference.id, course_initials=initials, course_name=course))
+        operations.append(('set', reference, batch))
+
+    for number in range(students):
+        batch = batch_records[number % batches]
+        enrolled = start + timedelta(days=number % 300, minutes=number)
+        total_fees = rng.choice([20000.0, 30000.0, 45000.0])
+        fees_paid = rng.choice([0.0, total_fees / 2, total_fees])
+        student_id = f"{batch['course_initials']} {9000000000 + number}"
+        operations.append(('set', db.collection('students').document(student_id), {
+            'student_id': student_id,
+            'student_name': f"Student {number:05d}",
+            'student_number': str(9000000000 + number),
+            'email': f"student{number:05d}@example.com",
+            'course_initials': batch['course_initials'],
+            'course_name': batch['course_name'],
+            'batch_time': display_name(batch),
+            'batch_id': batch['_id'],
+            'total_fees': total_fees,
+            'fees_paid': fees_paid,
+            'due_fees': total_fees - fees_paid,
+            'installments': 'NAN' if fees_paid == total_fees else '3',
+            'fees_due_date': (enrolled + timedelta(days=30)).strftime('%Y-%m-%d'),
+            'fees_status': 'Paid' if fees_paid == total_fees else 'Unpaid',
+            'username': f"student{number:05d}",
+            'password': password_hash,
+            'created_at': enrolled.strftime('%Y-%m-%d %H:%M:%S'),
+            'enrollment_date': enrolled.strftime('%d-%m-%Y'),
+            'enrollment_time': enrolled.strftime('%I:%M %p'),
+        }))
+
+    for number in range(tracking):
+        batch = batch_records[number % batches]
+        class_day = start + timedelta(days=number % 365)
+        operations.append(('set', db.collection('course_tracking').document(), {
+            'Trainer Name': TRAINERS[number % len(TRAINERS)],
+            'Batch Name': display_name(batch),
+            'Ongoing Module Name': MODULES[number % len(MODULES)],
+            'Completed Module': MODULES[(number - 1) % len(MODULES)],
+            'Upcoming Module': MODULES[(number + 1) % len(MODULES)],
+            'Class Date': class_day.strftime('%Y-%m-%d'),
+            'Start Time': batch['start_time'],
+            'End Time': batch['end_time'],
+            'Time stamp': class_day.strftime('%Y-%m-%d %H:%M:%S'),
+        }))
+
+    filenames = []
+    for number in range(files):
+        batch = batch_records[number % batches]
+        trainer = TRAINERS[number % len(TRAINERS)]
+        filename = f"{trainer}_notes_{number:05d}.pdf"
+        filenames.append((filename, batch['_id']))
+        storage_path = f"trainer_uploads/{filename}"
+        if bucket is not None:
+            bucket.blob(storage_path).upload_from_string(bytes(FILE_BYTES), content_type='application/pdf')
+        operations.append(('set', db.collection('trainer_files').document(), {
+            'filename': filename,
+            'original_filename': f"notes_{number:05d}.pdf",
+            'uploaded_by': trainer,
+            'batch_id': batch['_id'],
+            'timestamp': (start + timedelta(hours=number)).strftime('%Y-%m-%d %H:%M:%S'),
+            'file_size': FILE_BYTES,
+            'content_type': 'application/pdf',
+            'storage_path': storage_path,
+            'uploaded_to_storage': bucket is not None,
+            'has_base64_backup': False,
+        }))
+
+    for number in range(messages):
+        batch = batch_records[number % batches]
+        operations.append(('set', db.collection('messages').document(), {
+            'batch_id': batch['_id'],
+            'trainer_name': TRAINERS[number % len(TRAINERS)],
+            'message_content': f"Class update {number}",
+            'timestamp': start + timedelta(hours=number),
+            'read_by': [],
+        }))
+
+    for number in range(feedback):
+        student = number % max(students, 1)
+        batch = batch_records[student % batches]
+        operations.append(('set', db.collection('student_feedback').document(), {
+            'student_id': f"{batch['course_initials']} {9000000000 + student}",
+            'student_record_id': f"{batch['course_initials']} {9000000000 + student}",
+            'student_name': f"Student {student:05d}",
+            'student_number': str(9000000000 + student),
+            'batch_name': display_name(batch),
+            'feedback_text': f"Feedback {number}",
+            'submitted_by': f"student{student:05d}",
+            'created_at': (start + timedelta(hours=number)).strftime('%Y-%m-%d %H:%M:%S'),
+        }))
+
+    roles = [('boss', 'Super Admin'), ('admin', 'Admin')] + [(trainer, 'Trainer') for trainer in TRAINERS]
+    for username, role in roles:
+        operations.append(('set', db.collection('role_credentials').document(), {
+            'username': username, 'password': password_hash, 'role': role, 'created_at': start.strftime('%Y-%m-%d %H:%M:%S'),
+        }))
+
+    bulk_write(db, operations)
+    sample_batch = batch_records[0]
+    filename, file_batch = filenames[0] if filenames else (None, sample_batch['_id'])
+    return {
+        'batch_ids': [batch['_id'] for batch in batch_records],
+        'student': {'username': 'student00000', 'batch_id': sample_batch['_id'],
+                    '_id': f"{sample_batch['course_initials']} 9000000000"},
+        'trainer': TRAINERS[0],
+        'filename': filename,
+        'file_batch_id': file_batch,
+    }
+
+
+def scenarios(sample):
+    """(name, session dict or None, method, path, form data)"""
+    student = sample['student']
+    student_session = {'logged_in': True, 'username': student['username'], 'role': 'Student',
+                       'student_batch': sample['file_batch_id'], 'student_id': student['_id']}
+    return [
+        ('login_student', None, 'POST', '/student_login',
+         {'username': student['username'], 'password': BENCH_PASSWORD, 'batch_id': student['batch_id']}),
+        ('login_admin', None, 'POST', '/', {'role': 'Admin', 'username': 'admin', 'password': BENCH_PASSWORD}),
+        ('dashboard_super_admin', {'logged_in': True, 'username': 'boss', 'role': 'Super Admin'}, 'GET', '/dashboard',
+         None),
+        ('dashboard_admin', {'logged_in': True, 'username': 'admin', 'role': 'Admin'}, 'GET', '/dashboard', None),
+        ('dashboard_trainer', {'logged_in': True, 'username': sample['trainer'], 'role': 'Trainer'}, 'GET',
+         '/dashboard', None),
+        ('dashboard_student', student_session, 'GET', '/dashboard', None),
+        ('batch_summary', {'logged_in': True, 'username': 'admin', 'role': 'Admin'}, 'GET', '/batch-summary', None),
+        ('student_details', {'logged_in': True, 'username': 'admin', 'role': 'Admin'}, 'GET', '/student-details',
+         None),
+        ('download', student_session, 'GET', f"/download/{sample['filename']}", None),
+    ]
+
+
+def _request(client, session_data, method, path, data):
+    if session_data is not None:
+        with client.session_transaction() as session:
+            session.clear()
+            session.update(session_data)
+    return client.open(path, method=method, data=data)
+
+
+def run_benchmark(scale='small', rounds=5, latency_ms=0.0, seed=7):
+    """Seed the fakes, serve every scenario `rounds` times and return the results dict"""
+    os.environ.setdefault('SESSION_SQLITE_PATH', os.path.join(tempfile.mkdtemp(), 'sessions.sqlite3'))
+    os.environ.setdefault('ANALYTICS_DIR', tempfile.mkdtemp())
+    os.environ.setdefault('REPORTING_DB_PATH', os.path.join(tempfile.mkdtemp(), 'reports.sqlite3'))
+    from .fake_firestore import FakeBucket, FakeFirestore
+    from .firebase_config import firebase_config
+
+    db, bucket = FakeFirestore(), FakeBucket()
+    seed_started = time.perf_counter()
+    sample = seed_academy(db, bucket, seed=seed, **SCALES[scale])
+    seed_seconds = time.perf_counter() - seed_started
+    db.rpc_latency = bucket.rpc_latency = latency_ms / 1000.0
+    firebase_config.use_clients(db, bucket)
+
+    from .AI_firebase import techzone_app
+    techzone_app.config['TESTING'] = True
+    client = techzone_app.test_client()
+
+    results = {}
+    for name, session_data, method, path, data in scenarios(sample):
+        db.reset_stats()
+        bucket.reset_stats()
+        # The first request fills the in-process caches; it is reported separately
+        response = _request(client, session_data, method, path, data)
+        cold_reads = db.stats['reads']
+        timings, stats = [], []
+        for _ in range(rounds):
+            db.reset_stats()
+            bucket.reset_stats()
+            started = time.perf_counter()
+            response = _request(client, session_data, method, path, data)
+            timings.append((time.perf_counter() - started) * 1000)
+            stats.append((db.stats['reads'], db.stats['calls'], db.stats['writes'], bucket.stats['calls']))
+        timings.sort()
+        results[name] = {
+            'status': response.status_code,
+            'cold_reads': cold_reads,
+            'reads': max(row[0] for row in stats),
+            'calls': max(row[1] for row in stats),
+            'writes': max(row[2] for row in stats),
+            'storage_calls': max(row[3] for row in stats),
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        }
+    return {
+        'meta': {'scale': scale, 'rounds': rounds, 'latency_ms': latency_ms, 'seed': seed,
+                 'seed_seconds': round(seed_seconds, 2), 'python': platform.python_version(),
+                 'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), **SCALES[scale]},
+        'scenarios': results,
+    }
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Regression messages for scenarios that read more or got slower than baseline * (1 + tolerance)"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        if current['reads'] > previous['reads']:
+            regressions.append(f"{name}: reads {previous['reads']} -> {current['reads']}")
+        if current['median_ms'] > previous['median_ms'] * (1 + tolerance) + 1:
+            regressions.append(f"{name}: median {previous['median_ms']}ms -> {current['median_ms']}ms")
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print(f"{'Scenario':<24} {'Status':<7} {'Cold reads':<11} {'Reads':<8} {'Calls':<7} {'Median ms':<11} {'p95 ms':<9}"
+          + (" Baseline median" if baseline else ""))
+    for name, row in results['scenarios'].items():
+        line = (f"{name:<24} {row['status']:<7} {row['cold_reads']:<11} {row['reads']:<8} {row['calls']:<7} "
+                f"{row['median_ms']:<11} {row['p95_ms']:<9}")
+        if baseline and name in baseline.get('scenarios', {}):
+            line += f" {baseline['scenarios'][name]['median_ms']}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end page benchmark against in-process Firestore fakes")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="simulated latency per Firestore/Storage call")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed median slowdown (fraction)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.scale, args.rounds, args.latency_ms, args.seed)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.save}")
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Student login benchmark: compares the old /student_login lookup (stream every
+student with the username, then a three-field query) with the single
+(batch_id, username) lookup used by AuthService.verify_student_login.
+Runs against an in-memory collection that simulates Firestore round-trip latency.
+Timings for the new path include the password KDF verify; compare reads for the I/O saving.
+"""
+
+import time
+
+from portalflask.auth_service import AuthService
+
+RPC_LATENCY_SECONDS = 0.02
+
+
+class _Doc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.reference = self
+
+    def to_dict(self):
+        return dict(self._data)
+
+    def update(self, data):
+        self._data.update(data)
+
+
+class _Query:
+    def __init__(self, collection, filters=(), limit=None):
+        self._collection = collection
+        self._filters = filters
+        self._limit = limit
+
+    def where(self, field, op, value):
+        return _Query(self._collection, self._filters + ((field, value),), self._limit)
+
+    def limit(self, count):
+        return _Query(self._collection, self._filters, count)
+
+    def stream(self):
+        self._collection.reads += 1
+        time.sleep(RPC_LATENCY_SECONDS)
+        matches = [_Doc(doc_id, data) for doc_id, data in self._collection.docs.items()
+                   if all(data.get(field) == value for field, value in self._filters)]
+        return iter(matches[:self._limit] if self._limit else matches)
+
+
+class _Collection(_Query):
+    def __init__(self, docs):
+        self.docs = docs
+        self.reads = 0
+        super().__init__(self)
+
+
+def old_student_login(students_collection, username, password, batch_id):
+    """The pre-AuthService lookup, kept here as the benchmark baseline"""
+    for doc in students_collection.where('username', '==', username).stream():
+        doc.to_dict()
+    docs = students_collection.where('username', '==', username)\
+                              .where('password', '==', password)\
+                              .where('batch_id', '==', batch_id)\
+                              .stream()
+    return next(docs, None)
+
+
+def bench_login(rounds=25):
+    docs = {
+        f"student{i}": {'username': f"user{i}", 'password': f"pass{i}", 'batch_id': f"batch{i % 20}"}
+        for i in range(2000)
+    }
+    students = _Collection(docs)
+    auth = AuthService(None, students_collection=students)
+
+    results = {}
+    for name, login in (
+        ('old', lambda: old_student_login(students, 'user42', 'pass42', 'batch2')),
+        ('new', lambda: auth.verify_student_login('user42', 'pass42', 'batch2')),
+    ):
+        students.reads = 0
+        start = time.perf_counter()
+        for _ in range(rounds):
+            assert login() is not None
+        elapsed = time.perf_counter() - start
+        results[name] = {'reads_per_login': students.reads / rounds, 'ms_per_login': elapsed * 1000 / rounds}
+
+    print(f"{'Path':<6} {'Reads/login':<14} {'ms/login':<10}")
+    for name, result in results.items():
+        print(f"{name:<6} {result['reads_per_login']:<14.1f} {result['ms_per_login']:<10.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    bench_login()
@@ -0,0 +1,92 @@
+"""
+Bulk Firestore mutations for TechZone Academy Student Management System
+Groups set/update/delete operations into WriteBatch commits of up to 500 writes
+(the Firestore per-commit limit), commits several batches in parallel and retries
+a batch with exponential backoff when Firestore reports contention or a transient error.
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .log_config import get_logger
+
+log = get_logger('firestore')
+
+try:
+    from google.api_core import exceptions as gcloud_exceptions
+    RETRYABLE_ERRORS = (
+        gcloud_exceptions.Aborted,
+        gcloud_exceptions.DeadlineExceeded,
+        gcloud_exceptions.InternalServerError,
+        gcloud_exceptions.ResourceExhausted,
+        gcloud_exceptions.ServiceUnavailable,
+    )
+except ImportError:
+    RETRYABLE_ERRORS = ()
+
+MAX_BATCH_SIZE = 500
+
+
+def _commit_chunk(db, operations, max_retries):
+    """Commit one chunk of (op, doc_ref, data) tuples as a single WriteBatch, retrying transient failures"""
+    for attempt in range(max_retries + 1):
+        batch = db.batch()
+        for op, doc_ref, data in operations:
+            if op == 'set':
+                batch.set(doc_ref, data)
+            elif op == 'update':
+                batch.update(doc_ref, data)
+            elif op == 'delete':
+                batch.delete(doc_ref)
+            else:
+                raise ValueError(f"Unknown bulk operation: {op}")
+        try:
+            batch.commit()
+            return len(operations)
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            delay = min(0.25 * (2 ** attempt), 8) + random.uniform(0, 0.25)
+            log.warning("Bulk commit of %d writes failed (%s); retrying in %.2fs", len(operations), e, delay)
+            time.sleep(delay)
+
+
+def bulk_write(db, operations, chunk_size=MAX_BATCH_SIZE, max_workers=4, max_retries=5, progress=None):
+    """Apply an iterable of ('set' | 'update' | 'delete', doc_ref, data) operations in batched commits.
+
+    At most max_workers batches are in flight at once, so the operations iterable
+    is consumed lazily. progress, if given, is called with the running total of
+    committed writes. Returns the number of writes committed.
+    """
+    chunk_size = min(chunk_size, MAX_BATCH_SIZE)
+    committed = 0
+    pending = set()
+
+    def collect(done):
+        nonlocal committed
+        for future in done:
+            committed += future.result()
+            if progress:
+                progress(committed)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        chunk = []
+        for operation in operations:
+            chunk.append(operation)
+            if len(chunk) == chunk_size:
+                pending.add(executor.submit(_commit_chunk, db, chunk, max_retries))
+                chunk = []
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+        if chunk:
+            pending.add(executor.submit(_commit_chunk, db, chunk, max_retries))
+        done, _ = wait(pending)
+        collect(done)
+    return committed
+
+
+def bulk_delete(db, doc_refs, **kwargs):
+    """Delete every document reference in doc_refs using batched commits; returns the number deleted"""
+    return bulk_write(db, (('delete', doc_ref, None) for doc_ref in doc_refs), **kwargs)
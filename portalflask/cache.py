@@ -0,0 +1,50 @@
+"""
+In-process caches for TechZone Academy Student Management System
+Keeps small, rarely-changing Firestore reads (batches, role credentials)
+off the per-request path. Every cache can be invalidated explicitly after a write.
+"""
+
+import threading
+import time
+
+
+class TimedCache:
+    """Thread-safe single-value cache with a time-to-live and explicit invalidation"""
+
+    def __init__(self, loader, ttl_seconds):
+        self._loader = loader
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded_at = None
+
+    def get(self):
+        """Return the cached value, calling the loader if it is missing or expired.
+
+        A loader that raises caches nothing: the previous value, if any, is served and
+        the next call retries; with nothing to fall back on the error propagates.
+        """
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self._ttl_seconds:
+                try:
+                    value = self._loader()
+                except Exception:
+                    if self._value is None:
+                        raise
+                    return self._value
+                self._value = value
+                self._loaded_at = time.monotonic()
+            return self._value
+
+    def invalidate(self):
+        """Drop the cached value so the next get() reloads it"""
+        with self._lock:
+            self._value = None
+            self._loaded_at = None
+
+    def age(self):
+        """Seconds since the value was loaded, or None if nothing is cached"""
+        with self._lock:
+            if self._loaded_at is None:
+                return None
+            return time.monotonic() - self._loaded_at
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Password storage for TechZone Academy Student Management System
+Hashes passwords with salted scrypt (memory-hard) and verifies legacy formats
+(unsalted SHA-256 role credentials, plaintext student passwords) so they can be
+rehashed transparently on the next successful login.
+
+Stored format: scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>
+Tune the cost for the deployment host with:  python -m portalflask.credentials tune
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import re
+import sys
+import time
+
+from .log_config import get_logger
+
+log = get_logger('auth')
+
+SCHEME = 'scrypt'
+SALT_BYTES = 16
+KEY_BYTES = 32
+DEFAULT_SCRYPT_N = 2 ** 14
+DEFAULT_SCRYPT_R = 8
+DEFAULT_SCRYPT_P = 1
+DEFAULT_TARGET_MS = 50
+
+_LEGACY_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+def current_params():
+    """Return the (n, r, p) scrypt parameters configured for new hashes"""
+    return (
+        int(os.environ.get('PASSWORD_SCRYPT_N', DEFAULT_SCRYPT_N)),
+        int(os.environ.get('PASSWORD_SCRYPT_R', DEFAULT_SCRYPT_R)),
+        int(os.environ.get('PASSWORD_SCRYPT_P', DEFAULT_SCRYPT_P)),
+    )
+
+
+def _scrypt(password, salt, n, r, p):
+    # scrypt needs 128 * r * n bytes of working memory; allow that plus headroom
+    maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=KEY_BYTES)
+
+
+def hash_password(password):
+    """Hash a password with a random salt and the configured scrypt parameters"""
+    n, r, p = current_params()
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, n, r, p)
+    return '$'.join([
+        SCHEME, str(n), str(r), str(p),
+        base64.b64encode(salt).decode('ascii'),
+        base64.b64encode(digest).decode('ascii'),
+    ])
+
+
+def is_password_hash(value):
+    """True if value is a password hash in the current scrypt format"""
+    return isinstance(value, str) and value.startswith(SCHEME + '$')
+
+
+def verify_password(password, stored):
+    """Check a password against a stored value.
+
+    Returns (matches, needs_rehash). needs_rehash is True when the stored value
+    is a legacy SHA-256 hash, plaintext, or scrypt with weaker parameters than
+    currently configured, so callers can upgrade it after a successful login.
+    """
+    if not password or stored is None or stored == '':
+        return False, False
+    if isinstance(stored, (int, float)) and not isinstance(stored, bool):
+        # Legacy numeric password imported from a spreadsheet cell (12345 or 12345.0)
+        stored = str(int(stored)) if float(stored).is_integer() else str(stored)
+    elif not isinstance(stored, str):
+        return False, False
+    if is_password_hash(stored):
+        try:
+            _, n, r, p, salt_b64, digest_b64 = stored.split('$')
+            n, r, p = int(n), int(r), int(p)
+            expected = base64.b64decode(digest_b64)
+            actual = _scrypt(password, base64.b64decode(salt_b64), n, r, p)
+        except (ValueError, TypeError) as e:
+            log.warning("Malformed password hash, treating it as a mismatch: %s", e)
+            return False, False
+        if not hmac.compare_digest(actual, expected):
+            return False, False
+        return True, (n, r, p) != current_params()
+    if _LEGACY_SHA256.match(stored):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored), True
+    return hmac.compare_digest(password.encode(), stored.encode()), True
+
+
+def tune_scrypt(target_ms=DEFAULT_TARGET_MS, r=DEFAULT_SCRYPT_R, p=DEFAULT_SCRYPT_P, max_n=2 ** 20):
+    """Return the largest power-of-two n whose verify time stays within target_ms on this host"""
+    n = 2 ** 12
+    salt = os.urandom(SALT_BYTES)
+    while n < max_n:
+        start = time.perf_counter()
+        _scrypt('benchmark-password', salt, n * 2, r, p)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > target_ms:
+            break
+        n *= 2
+    return n
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == 'tune':
+        target = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TARGET_MS
+        tuned_n = tune_scrypt(target)
+        print(f"PASSWORD_SCRYPT_N={tuned_n}  # ~{target} ms per verify on this host")
+    else:
+        print("Usage: python -m portalflask.credentials tune [target_ms]")
@@ -0,0 +1,99 @@
+"""
+Streaming exports for TechZone Academy Student Management System
+Rows are read from Firestore one page at a time (ordered by document id, resumed
+with a cursor) and written straight to the response: CSV as a generator of
+encoded lines, XLSX through openpyxl's write-only workbook, which keeps rows on
+disk rather than in memory. Nothing holds the whole export at once.
+"""
+
+import csv
+import io
+import os
+import tempfile
+
+from .firestore_indexes import field_path
+
+EXPORT_PAGE_SIZE = 1000
+XLSX_CHUNK_SIZE = 64 * 1024
+
+STUDENT_EXPORT_FIELDS = ['student_id', 'student_name', 'student_number', 'email', 'course_initials', 'course_name',
+                         'batch_time', 'batch_id', 'total_fees', 'fees_paid', 'due_fees', 'installments',
+                         'fees_due_date', 'fees_status', 'username', 'enrollment_date', 'enrollment_time']
+TRACKING_EXPORT_FIELDS = ['Trainer Name', 'Batch Name', 'Ongoing Module Name', 'Completed Module', 'Upcoming Module',
+                          'Class Date', 'Start Time', 'End Time', 'Time stamp']
+FEEDBACK_EXPORT_FIELDS = ['student_record_id', 'student_name', 'student_number', 'batch_name', 'feedback_text',
+                          'submitted_by', 'created_at']
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def iter_documents(query, fields, page_size=EXPORT_PAGE_SIZE):
+    """Yield {field: value} dicts for every document matched by query, one page at a time"""
+    # Field paths with spaces (course_tracking) have to be quoted for select()
+    query = query.select([field_path(field) for field in fields]).order_by('__name__')
+    last_id = None
+    while True:
+        page = query.start_after({'__name__': last_id}) if last_id else query
+        count = 0
+        for doc in page.limit(page_size).stream():
+            count += 1
+            last_id = doc.id
+            record = doc.to_dict()
+            yield {field: record.get(field, '') for field in fields}
+        if count < page_size:
+            return
+
+
+def stream_csv(fields, rows):
+    """Encode rows as CSV, one line at a time (with a BOM so Excel picks up UTF-8)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    yield '﻿' + buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def stream_xlsx(fields, rows, title='Export'):
+    """Write rows to a write-only workbook in a temporary file and stream the file back"""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ValueError("XLSX export requires openpyxl; install it or export as CSV")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(fields)
+
+    def generate():
+        handle, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(handle)
+        try:
+            for row in rows:
+                sheet.append([row.get(field, '') for field in fields])
+            workbook.save(path)
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(XLSX_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            os.remove(path)
+    return generate()
+
+
+def stream_export(export_format, fields, rows, title='Export'):
+    """Return (body generator, mimetype) for an export format; raises ValueError for unknown formats"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if export_format == 'csv':
+        body = (line.encode('utf-8') for line in stream_csv(fields, rows))
+    else:
+        body = stream_xlsx(fields, rows, title=title)
+    return body, EXPORT_FORMATS[export_format]
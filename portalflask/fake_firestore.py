@@ -0,0 +1,711 @@
+"""
+In-process Firestore and Storage fakes for TechZone Academy Student Management System
+Implements the part of the google-cloud-firestore / google-cloud-storage API the
+app uses (collections, subcollections, collection groups, where / order_by /
+limit / offset / select / cursors, streams, write batches, transactions and
+blobs) over plain dicts, so tests and benchmarks run without Firebase:
+
+    from portalflask.fake_firestore import FakeFirestore, FakeBucket
+    firebase_config.use_clients(FakeFirestore(), FakeBucket())
+
+Every simulated round trip is counted in .stats (calls, billed reads, writes)
+and can be slowed down with rpc_latency (seconds) to model network cost.
+Query semantics follow Firestore: field paths that are not simple identifiers
+must be backquoted, results are ordered by document id unless ordered
+otherwise, documents missing an order_by field are left out, and range filters
+only match values of the same type.
+"""
+
+import copy
+import random
+import re
+import string
+import threading
+import time
+from datetime import date, datetime
+
+try:
+    from google.api_core.exceptions import AlreadyExists, NotFound
+except ImportError:
+    class NotFound(LookupError):
+        pass
+
+    class AlreadyExists(ValueError):
+        pass
+
+AUTO_ID_CHARS = string.ascii_letters + string.digits
+_EQUALITY_OPS = ('==', 'in', 'array_contains', 'array-contains', 'array_contains_any', 'array-contains-any')
+
+
+def _auto_id():
+    return ''.join(random.choice(AUTO_ID_CHARS) for _ in range(20))
+
+
+_SIMPLE_PART = re.compile(r'[_a-zA-Z][_a-zA-Z0-9]*')
+_QUOTED_PART = re.compile(r'`(?:[^`\\]|\\.)+`')
+
+
+def _check_field_path(field_path):
+    """Raise ValueError, as the Firestore client does for queries, unless every dotted part of field_path
+    is a simple identifier or backquoted (e.g. 'Trainer Name' has to be written `Trainer Name`)"""
+    position = 0
+    while True:
+        match = _SIMPLE_PART.match(field_path, position) or _QUOTED_PART.match(field_path, position)
+        if not match:
+            break
+        position = match.end()
+        if position == len(field_path):
+            return field_path
+        if field_path[position] != '.':
+            break
+        position += 1
+    raise ValueError(f"Path {field_path} not consumed, residue: {field_path[position:]}")
+
+
+def _field_parts(field_path):
+    """The names in a field path: dotted parts, backquoted ones unescaped (`a.b` is one name).
+    Unparseable paths (document data keys) are split on dots as they are"""
+    parts, position = [], 0
+    while position <= len(field_path):
+        match = _QUOTED_PART.match(field_path, position)
+        if match:
+            parts.append(re.sub(r'\\(.)', r'\1', match.group()[1:-1]))
+        else:
+            match = re.compile(r'[^.]*').match(field_path, position)
+            parts.append(match.group())
+        position = match.end()
+        if position < len(field_path) and field_path[position] != '.':
+            return field_path.split('.')
+        position += 1
+    return parts
+
+
+_MISSING = object()
+
+
+def _get_field(data, field_path):
+    value = data
+    for part in _field_parts(field_path):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _type_rank(value):
+    """Firestore's cross-type ordering: null < bool < number < timestamp < string < bytes < array < map"""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, (datetime, date)):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, (list, tuple)):
+        return 7
+    return 8
+
+
+def _sort_key(value):
+    rank = _type_rank(value)
+    if rank == 7:
+        return rank, [_sort_key(item) for item in value]
+    if rank == 8:
+        return rank, sorted((key, _sort_key(item)) for key, item in value.items()) if isinstance(value, dict) else 0
+    return rank, value if value is not None else 0
+
+
+def _matches(value, op, expected):
+    if op in ('array_contains', 'array-contains'):
+        return isinstance(value, list) and expected in value
+    if op in ('array_contains_any', 'array-contains-any'):
+        return isinstance(value, list) and any(item in value for item in expected)
+    if value is _MISSING:
+        return False
+    if op == '==':
+        return value == expected and _type_rank(value) == _type_rank(expected)
+    if op == '!=':
+        return value is not None and not (value == expected and _type_rank(value) == _type_rank(expected))
+    if op == 'in':
+        return any(value == item and _type_rank(value) == _type_rank(item) for item in expected)
+    if op == 'not-in':
+        return value is not None and value not in expected
+    if _type_rank(value) != _type_rank(expected):
+        return False
+    if op == '<':
+        return value < expected
+    if op == '<=':
+        return value <= expected
+    if op == '>':
+        return value > expected
+    if op == '>=':
+        return value >= expected
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def _project(data, fields):
+    if fields is None:
+        return copy.deepcopy(data)
+    projected = {}
+    for field in fields:
+        value = _get_field(data, field)
+        if value is _MISSING:
+            continue
+        target = projected
+        parts = _field_parts(field)
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = copy.deepcopy(value)
+    return projected
+
+
+def _apply_transform(current, value):
+    """Resolve ArrayUnion / ArrayRemove / Increment / DELETE_FIELD / SERVER_TIMESTAMP by duck type"""
+    kind = type(value).__name__
+    if kind == 'ArrayUnion':
+        result = list(current) if isinstance(current, list) else []
+        return result + [item for item in value.values if item not in result]
+    if kind == 'ArrayRemove':
+        return [item for item in current if item not in value.values] if isinstance(current, list) else []
+    if kind == 'Increment':
+        return (current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0) + value.value
+    if kind == 'Sentinel':
+        description = getattr(value, 'description', '').lower()
+        if 'delete' in description:
+            return _MISSING
+        if 'server' in description:
+            return datetime.now()
+    return copy.deepcopy(value)
+
+
+def _set_path(data, parts, value):
+    for part in parts[:-1]:
+        if not isinstance(data.get(part), dict):
+            data[part] = {}
+        data = data[part]
+    resolved = _apply_transform(data.get(parts[-1]), value)
+    if resolved is _MISSING:
+        data.pop(parts[-1], None)
+    else:
+        data[parts[-1]] = resolved
+
+
+def _merge(target, data):
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            _set_path(target, [key], value)
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data, fields=None):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self._fields = fields
+        self.create_time = self.update_time = self.read_time = None
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return _project(self._data, self._fields) if self._data is not None else None
+
+    def get(self, field_path):
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class FakeDocumentReference:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    @property
+    def parent(self):
+        return FakeCollectionReference(self._client, self.path.rsplit('/', 1)[0])
+
+    def collection(self, collection_id):
+        return FakeCollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def get(self, field_paths=None, transaction=None, **kwargs):
+        self._client._round_trip()
+        self._client.stats['reads'] += 1
+        data = self._client._read(self.path)
+        return FakeSnapshot(self, copy.deepcopy(data) if data is not None else None, field_paths)
+
+    def set(self, document_data, merge=False):
+        self._client._commit([('set', self, document_data, merge)])
+
+    def update(self, field_updates, **kwargs):
+        self._client._commit([('update', self, field_updates, False)])
+
+    def create(self, document_data):
+        self._client._commit([('create', self, document_data, False)])
+
+    def delete(self, **kwargs):
+        self._client._commit([('delete', self, None, False)])
+
+    def __eq__(self, other):
+        return isinstance(other, FakeDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f"<FakeDocumentReference {self.path}>"
+
+
+class FakeQuery:
+    ASCENDING = 'ASCENDING'
+    DESCENDING = 'DESCENDING'
+
+    def __init__(self, client, path=None, group=None, filters=(), orders=(), limit=None, limit_to_last=False,
+                 offset=0, fields=None, start=None, end=None):
+        self._client = client
+        self._path = path
+        self._group = group
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit
+        self._limit_to_last = limit_to_last
+        self._offset = offset
+        self._fields = fields
+        self._start = start
+        self._end = end
+
+    def _copy(self, **changes):
+        state = dict(path=self._path, group=self._group, filters=self._filters, orders=self._orders,
+                     limit=self._limit, limit_to_last=self._limit_to_last, offset=self._offset,
+                     fields=self._fields, start=self._start, end=self._end)
+        state.update(changes)
+        return FakeQuery(self._client, **state)
+
+    # ----- builders -----
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            if isinstance(filter, tuple):
+                raise ValueError("Filter must be provided through positional arguments or the 'filter' keyword argument.")
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        _check_field_path(field_path)
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        _check_field_path(field_path)
+        return self._copy(orders=self._orders + ((field_path, str(direction).upper().endswith('DESCENDING')),))
+
+    def limit(self, count):
+        return self._copy(limit=count, limit_to_last=False)
+
+    def limit_to_last(self, count):
+        return self._copy(limit=count, limit_to_last=True)
+
+    def offset(self, num_to_skip):
+        return self._copy(offset=num_to_skip)
+
+    def select(self, field_paths):
+        return self._copy(fields=[_check_field_path(field) for field in field_paths])
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, True))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, False))
+
+    def end_at(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, True))
+
+    def end_before(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, False))
+
+    # ----- execution -----
+    def _effective_orders(self):
+        orders = list(self._orders)
+        if not orders:
+            inequality = next((field for field, op, _ in self._filters if op not in _EQUALITY_OPS), None)
+            if inequality and inequality != '__name__':
+                orders.append((inequality, False))
+        if not any(field == '__name__' for field, _ in orders):
+            orders.append(('__name__', orders[-1][1] if orders else False))
+        return orders
+
+    @staticmethod
+    def _value(path, data, field):
+        if field == '__name__':
+            return path
+        return _get_field(data, field)
+
+    def _cursor_values(self, cursor, orders):
+        if isinstance(cursor, FakeSnapshot):
+            return [cursor.reference.path if field == '__name__' else _get_field(cursor._data or {}, field)
+                    for field, _ in orders]
+        if isinstance(cursor, dict):
+            values = []
+            for field, _ in orders:
+                if field not in cursor:
+                    break
+                value = cursor[field]
+                if field == '__name__':
+                    value = value.path if isinstance(value, FakeDocumentReference) else \
+                        value if '/' in str(value) else f"{self._path}/{value}"
+                values.append(value)
+            return values
+        values = list(cursor) if isinstance(cursor, (list, tuple)) else [cursor]
+        return [f"{self._path}/{value}" if field == '__name__' and '/' not in str(value) else value
+                for (field, _), value in zip(orders, values)]
+
+    @staticmethod
+    def _compare(row_values, cursor_values, orders):
+        """-1 / 0 / 1 comparing a row with a (possibly partial) cursor in query order"""
+        for value, cursor_value, (_, descending) in zip(row_values, cursor_values, orders):
+            left, right = _sort_key(value), _sort_key(cursor_value)
+            if left != right:
+                result = -1 if left < right else 1
+                return -result if descending else result
+        return 0
+
+    def _run(self):
+        orders = self._effective_orders()
+        equalities = [(field, value) for field, op, value in self._filters if op == '==' and field != '__name__']
+        rows = []
+        for path, data in self._client._scan(self._path, self._group, equalities):
+            if not all(_matches(self._value(path, data, field), op, value) for field, op, value in self._filters):
+                continue
+            values = [self._value(path, data, field) for field, _ in orders]
+            if any(value is _MISSING for value in values):
+                continue
+            rows.append((values, path, copy.deepcopy(data)))
+        for index in range(len(orders) - 1, -1, -1):
+            rows.sort(key=lambda row: _sort_key(row[0][index]), reverse=orders[index][1])
+        if self._start is not None:
+            cursor, inclusive = self._start
+            cursor_values = self._cursor_values(cursor, orders)
+            rows = [row for row in rows
+                    if self._compare(row[0], cursor_values, orders) > (-1 if inclusive else 0)]
+        if self._end is not None:
+            cursor, inclusive = self._end
+            cursor_values = self._cursor_values(cursor, orders)
+            rows = [row for row in rows
+                    if self._compare(row[0], cursor_values, orders) < (1 if inclusive else 0)]
+        rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[-self._limit:] if self._limit_to_last else rows[:self._limit]
+        return [FakeSnapshot(FakeDocumentReference(self._client, path), data, self._fields) for _, path, data in rows]
+
+    def stream(self, transaction=None, **kwargs):
+        self._client._round_trip()
+        snapshots = self._run()
+        # Firestore bills one read for a query that matches nothing
+        self._client.stats['reads'] += max(len(snapshots), 1)
+        return iter(snapshots)
+
+    def get(self, transaction=None, **kwargs):
+        return list(self.stream(transaction=transaction))
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client, path):
+        super().__init__(client, path=path)
+        self.id = path.rsplit('/', 1)[-1]
+
+    @property
+    def parent(self):
+        return FakeDocumentReference(self._client, self._path.rsplit('/', 1)[0]) if '/' in self._path else None
+
+    def document(self, document_id=None):
+        return FakeDocumentReference(self._client, f"{self._path}/{document_id or _auto_id()}")
+
+    def add(self, document_data, document_id=None, **kwargs):
+        reference = self.document(document_id)
+        reference.create(document_data)
+        return datetime.now(), reference
+
+    def list_documents(self, page_size=None, **kwargs):
+        self._client._round_trip()
+        return [FakeDocumentReference(self._client, path) for path, _ in self._client._scan(self._path, None, ())]
+
+
+class FakeWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(('set', reference, document_data, merge))
+        return self
+
+    def update(self, reference, field_updates, **kwargs):
+        self._writes.append(('update', reference, field_updates, False))
+        return self
+
+    def create(self, reference, document_data):
+        self._writes.append(('create', reference, document_data, False))
+        return self
+
+    def delete(self, reference, **kwargs):
+        self._writes.append(('delete', reference, None, False))
+        return self
+
+    def commit(self, **kwargs):
+        writes, self._writes = self._writes, []
+        return self._client._commit(writes)
+
+    def __len__(self):
+        return len(self._writes)
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Duck-types the Transaction interface used by firestore.transactional (writes apply on commit)"""
+
+    def __init__(self, client, max_attempts=5, read_only=False):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id = None
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def in_progress(self):
+        return self._id is not None
+
+    def _begin(self, retry_id=None):
+        self._id = _auto_id().encode()
+
+    def _clean_up(self):
+        self._writes = []
+        self._id = None
+
+    def _rollback(self):
+        self._clean_up()
+
+    def _commit(self):
+        try:
+            return self.commit()
+        finally:
+            self._id = None
+
+    def get(self, ref_or_query, **kwargs):
+        if isinstance(ref_or_query, FakeDocumentReference):
+            return iter([ref_or_query.get()])
+        return ref_or_query.stream()
+
+
+class FakeFirestore:
+    """A Firestore client over an in-memory {document path: dict} store"""
+
+    def __init__(self, rpc_latency=0.0):
+        self.rpc_latency = rpc_latency
+        self._documents = {}
+        self._lock = threading.RLock()
+        self.stats = {'calls': 0, 'reads': 0, 'writes': 0}
+
+    def reset_stats(self):
+        self.stats = {'calls': 0, 'reads': 0, 'writes': 0}
+
+    def _round_trip(self):
+        self.stats['calls'] += 1
+        if self.rpc_latency:
+            time.sleep(self.rpc_latency)
+
+    def _commit(self, writes):
+        """Apply writes atomically: all of them or, if any fails, none"""
+        self._round_trip()
+        with self._write_transaction():
+            pending = {}
+            for op, reference, data, merge in writes:
+                path = reference.path
+                current = pending[path] if path in pending else self._read(path)
+                if op == 'create' and current is not None:
+                    raise AlreadyExists(f"Document already exists: {path}")
+                if op == 'update' and current is None:
+                    raise NotFound(f"No document to update: {path}")
+                if op == 'delete':
+                    pending[path] = None
+                    continue
+                if op == 'update':
+                    updated = copy.deepcopy(current)
+                    for field, value in data.items():
+                        _set_path(updated, _field_parts(field), value)
+                else:
+                    updated = copy.deepcopy(current) if merge and current is not None else {}
+                    _merge(updated, data)
+                pending[path] = updated
+            self._store(pending)
+            self.stats['writes'] += len(writes)
+        return [None] * len(writes)
+
+    def collection(self, *path):
+        return FakeCollectionReference(self, '/'.join(path))
+
+    def collection_group(self, collection_id):
+        return FakeQuery(self, group=collection_id)
+
+    def document(self, *path):
+        return FakeDocumentReference(self, '/'.join(path))
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def transaction(self, max_attempts=5, read_only=False):
+        return FakeTransaction(self, max_attempts=max_attempts, read_only=read_only)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        for reference in references:
+            yield reference.get(field_paths=field_paths)
+
+    def collections(self):
+        with self._lock:
+            names = sorted({path.split('/', 1)[0] for path in self._documents})
+        return [FakeCollectionReference(self, name) for name in names]
+
+    # ----- storage; SQLiteFirestore (sqlite_store) keeps documents in a file instead -----
+    def _read(self, path):
+        """The stored data of one document, or None"""
+        with self._lock:
+            return self._documents.get(path)
+
+    def _scan(self, collection_path, group, equalities):
+        """(path, data) of the documents in a collection (or collection group), sorted by path.
+
+        The caller copies what it keeps and must not modify data. equalities is a list of
+        (field, value) the caller filters on anyway; a store may use them to narrow the scan.
+        """
+        with self._lock:
+            items = sorted(self._documents.items())
+        rows = []
+        for path, data in items:
+            parent = path.rpartition('/')[0]
+            if (parent.rsplit('/', 1)[-1] == group) if group is not None else parent == collection_path:
+                rows.append((path, data))
+        return rows
+
+    def _write_transaction(self):
+        """Context manager holding the store consistent across the reads and the _store() of one commit"""
+        return self._lock
+
+    def _store(self, pending):
+        """Apply {path: data, or None to delete}"""
+        for path, data in pending.items():
+            if data is None:
+                self._documents.pop(path, None)
+            else:
+                self._documents[path] = data
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+
+    @property
+    def size(self):
+        entry = self.bucket._load_blob(self.name)
+        return len(entry[0]) if entry else None
+
+    @property
+    def content_type(self):
+        entry = self.bucket._load_blob(self.name)
+        return entry[1] if entry else None
+
+    def exists(self, **kwargs):
+        self.bucket._round_trip()
+        return self.bucket._load_blob(self.name) is not None
+
+    def reload(self, **kwargs):
+        if not self.exists():
+            raise NotFound(f"No such object: {self.bucket.name}/{self.name}")
+
+    def upload_from_string(self, data, content_type='text/plain', **kwargs):
+        self.bucket._round_trip()
+        data = data.encode('utf-8') if isinstance(data, str) else bytes(data)
+        self.bucket._save_blob(self.name, data, content_type)
+        self.bucket.stats['bytes_written'] += len(data)
+
+    def upload_from_file(self, file_obj, content_type=None, **kwargs):
+        self.upload_from_string(file_obj.read(), content_type=content_type or 'application/octet-stream')
+
+    def upload_from_filename(self, filename, content_type=None, **kwargs):
+        with open(filename, 'rb') as f:
+            self.upload_from_file(f, content_type=content_type)
+
+    def download_as_bytes(self, **kwargs):
+        self.bucket._round_trip()
+        entry = self.bucket._load_blob(self.name)
+        if entry is None:
+            raise NotFound(f"No such object: {self.bucket.name}/{self.name}")
+        self.bucket.stats['bytes_read'] += len(entry[0])
+        return entry[0]
+
+    def download_as_text(self, encoding='utf-8', **kwargs):
+        return self.download_as_bytes().decode(encoding)
+
+    def download_to_filename(self, filename, **kwargs):
+        with open(filename, 'wb') as f:
+            f.write(self.download_as_bytes())
+
+    def delete(self, **kwargs):
+        self.bucket._round_trip()
+        if not self.bucket._remove_blob(self.name):
+            raise NotFound(f"No such object: {self.bucket.name}/{self.name}")
+
+
+class FakeBucket:
+    """A Storage bucket over an in-memory {blob name: (bytes, content type)} store"""
+
+    def __init__(self, name='techzone-test.firebasestorage.app', rpc_latency=0.0):
+        self.name = name
+        self.rpc_latency = rpc_latency
+        self._blobs = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'bytes_read': 0, 'bytes_written': 0}
+
+    def reset_stats(self):
+        self.stats = {'calls': 0, 'bytes_read': 0, 'bytes_written': 0}
+
+    def _round_trip(self):
+        self.stats['calls'] += 1
+        if self.rpc_latency:
+            time.sleep(self.rpc_latency)
+
+    def blob(self, blob_name, **kwargs):
+        return FakeBlob(self, blob_name)
+
+    def get_blob(self, blob_name, **kwargs):
+        blob = FakeBlob(self, blob_name)
+        return blob if blob.exists() else None
+
+    def list_blobs(self, prefix=None, **kwargs):
+        self._round_trip()
+        return [FakeBlob(self, name) for name in self._blob_names(prefix)]
+
+    # ----- storage; SQLiteBucket (sqlite_store) keeps blobs in a file instead -----
+    def _load_blob(self, name):
+        """(bytes, content type) or None"""
+        with self._lock:
+            return self._blobs.get(name)
+
+    def _save_blob(self, name, data, content_type):
+        with self._lock:
+            self._blobs[name] = (data, content_type)
+
+    def _remove_blob(self, name):
+        """Delete a blob; False if there was none"""
+        with self._lock:
+            return self._blobs.pop(name, None) is not None
+
+    def _blob_names(self, prefix=None):
+        with self._lock:
+            return sorted(name for name in self._blobs if not prefix or name.startswith(prefix))
@@ -0,0 +1,121 @@
+"""
+Concurrent reads for TechZone Academy Student Management System
+A page that needs several independent reads (feedback and students, the batch
+list and its ledger figures, the files of every batch) hands them to gather(),
+which runs them on a shared thread pool, so the page waits for the slowest read
+instead of the sum of all of them.
+
+Each call runs in a copy of the caller's context, so the instrumentation still
+counts its Firestore calls against the request. Every request has a deadline
+(REQUEST_DEADLINE_MS after it started): a call still running at the deadline is
+abandoned, logged, and its default is used in its place. An abandoned call keeps
+its worker until it returns, which is logged too.
+
+One gather() holds at most FANOUT_PER_REQUEST workers at a time, so a single page
+with many reads cannot take the whole pool from concurrent requests. Size
+FANOUT_WORKERS to roughly FANOUT_PER_REQUEST x the requests a process serves at once.
+
+Environment:
+    FANOUT_WORKERS       threads shared by all requests (default 8, 0 = run calls one after another)
+    FANOUT_PER_REQUEST   calls of one gather() running at the same time (default 4)
+    REQUEST_DEADLINE_MS  time a request may spend waiting on its reads (default 10000)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import ContextVar, copy_context
+
+from flask import g, has_request_context
+
+from .log_config import get_logger
+
+log = get_logger('requests')
+
+FANOUT_WORKERS = int(os.getenv('FANOUT_WORKERS', '8'))
+FANOUT_PER_REQUEST = max(1, int(os.getenv('FANOUT_PER_REQUEST', '4')))
+REQUEST_DEADLINE_SECONDS = int(os.getenv('REQUEST_DEADLINE_MS', '10000')) / 1000.0
+
+_executor = None
+_executor_lock = threading.Lock()
+# Set inside pool threads: a gather() there runs inline instead of waiting on the pool it occupies
+_in_worker = ContextVar('fanout_worker', default=False)
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='fanout')
+    return _executor
+
+
+def deadline():
+    """time.perf_counter() value by which the current request's reads have to finish"""
+    if not has_request_context():
+        return time.perf_counter() + REQUEST_DEADLINE_SECONDS
+    if 'request_deadline' not in g:
+        # request_started is set by the instrumentation; without it the clock starts at the first fan-out
+        g.request_deadline = g.get('request_started', time.perf_counter()) + REQUEST_DEADLINE_SECONDS
+    return g.request_deadline
+
+
+def _run(call):
+    _in_worker.set(True)
+    return call()
+
+
+def _name(call):
+    return getattr(call, '__name__', None) or getattr(getattr(call, 'func', None), '__name__', repr(call))
+
+
+def _log_late_finish(call, missed_at):
+    def done(future):
+        log.warning("Read %s finished %.0f ms after the request deadline (its worker was busy until then)",
+                    _name(call), (time.perf_counter() - missed_at) * 1000)
+    return done
+
+
+def gather(*calls, defaults=()):
+    """Run zero-argument callables concurrently and return their results in order.
+
+    At most FANOUT_PER_REQUEST of the calls run at once. defaults[i] stands in
+    for calls[i] if it has not finished by the request deadline (None when
+    defaults is shorter). An exception raised by a call is raised here.
+    """
+    defaults = list(defaults) + [None] * (len(calls) - len(defaults))
+    if len(calls) <= 1 or FANOUT_WORKERS <= 0 or _in_worker.get():
+        return [call() for call in calls]
+
+    end = deadline()
+    futures = {}
+    running = set()
+    waiting = list(range(len(calls)))
+    while waiting or running:
+        while waiting and len(running) < FANOUT_PER_REQUEST:
+            index = waiting.pop(0)
+            # Each call gets its own copy of the context (a context cannot be entered by two threads at once)
+            futures[index] = _pool().submit(copy_context().run, _run, calls[index])
+            running.add(futures[index])
+        done, running = wait(running, timeout=max(0.0, end - time.perf_counter()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+
+    missed_at = time.perf_counter()
+    busy = 0
+    results = []
+    for index, (call, default) in enumerate(zip(calls, defaults)):
+        future = futures.get(index)
+        if future is not None and future.done():
+            results.append(future.result())
+            continue
+        if future is not None and not future.cancel():
+            busy += 1
+            future.add_done_callback(_log_late_finish(call, missed_at))
+        log.warning("Read %s missed the request deadline; using %r", _name(call), default)
+        results.append(default)
+    if busy:
+        log.warning("%d fan-out worker(s) still busy after the request deadline", busy)
+    return results
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Fee ledger for TechZone Academy Student Management System
+Every student has a payments subcollection (students/{id}/payments) holding:
+    installment rows  - the schedule: amount, due_date and how much of it is paid
+    payment rows      - money received: amount and paid_on (negative for corrections)
+The student document keeps denormalized next_due_date and due_fees, so "who is
+overdue" and "what was collected" are indexed range queries (see
+firestore.indexes.json) instead of scans over every student.
+
+Dates are stored as YYYY-MM-DD strings so they sort and range-filter correctly.
+Build ledgers for existing students with:
+    python -m portalflask.fee_ledger backfill
+"""
+
+import calendar
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from .bulk_writer import bulk_delete
+
+PAYMENTS_SUBCOLLECTION = 'payments'
+# Student fields that feed the ledger; updating any of them re-syncs it
+FEE_FIELDS = ('total_fees', 'fees_paid', 'installments', 'fees_due_date')
+MAX_INSTALLMENTS = 60
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(str(value)[:10], DATE_FORMAT).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _add_months(day, months):
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _installment_count(installments):
+    try:
+        return min(max(int(float(installments)), 1), MAX_INSTALLMENTS)
+    except (TypeError, ValueError):
+        # 'NAN' (fully paid) or anything unparseable is a single installment
+        return 1
+
+
+def build_schedule(total_fees, fees_paid, installments, first_due_date):
+    """Split total_fees into monthly installments from first_due_date and apply fees_paid in order.
+
+    Returns a list of installment rows: installment_no, amount, due_date, paid_amount, status.
+    """
+    count = _installment_count(installments)
+    total = round(float(total_fees or 0), 2)
+    base = round(total / count, 2)
+    amounts = [base] * (count - 1) + [round(total - base * (count - 1), 2)]
+    remaining_paid = float(fees_paid or 0)
+    schedule = []
+    for number, amount in enumerate(amounts, start=1):
+        paid = round(min(amount, max(remaining_paid, 0)), 2)
+        remaining_paid -= paid
+        schedule.append({
+            'kind': 'installment',
+            'installment_no': number,
+            'amount': amount,
+            'due_date': _add_months(first_due_date, number - 1).strftime(DATE_FORMAT),
+            'paid_amount': paid,
+            'status': 'Paid' if paid >= amount else 'Due',
+        })
+    return schedule
+
+
+def summarize_schedule(schedule, total_fees, fees_paid, due_fees=None, fees_status=None):
+    """The denormalized student fields for a schedule: next_due_date, due_fees and fees_status.
+
+    due_fees and fees_status entered by an admin are kept as they are; they are only
+    derived (total_fees - fees_paid, Paid/Unpaid) when missing.
+    """
+    try:
+        due_fees = round(float(due_fees), 2)
+    except (TypeError, ValueError):
+        due_fees = round(max(float(total_fees or 0) - float(fees_paid or 0), 0), 2)
+    fees_status = fees_status or ('Paid' if due_fees <= 0 else 'Unpaid')
+    next_due = next((row['due_date'] for row in schedule if row['status'] != 'Paid'), None)
+    return {
+        'next_due_date': next_due if due_fees > 0 and fees_status != 'Paid' else None,
+        'due_fees': due_fees,
+        'fees_status': fees_status,
+    }
+
+
+def ledger_writes(student_ref, student, rows=(), today=None):
+    """The payments writes that bring a student's ledger in line with its flat fee fields, and the summary.
+
+    rows are the student's current payments documents (none for a new student).
+    Returns (operations, summary): bulk_write style ('set' | 'delete', ref, data)
+    tuples that record any change in fees_paid as a payment row dated today and
+    rewrite the installment schedule, and the next_due_date / due_fees /
+    fees_status fields for the student document.
+    """
+    today = today or date.today()
+    payments = student_ref.collection(PAYMENTS_SUBCOLLECTION)
+    received = sum(row.to_dict().get('amount', 0) for row in rows if row.to_dict().get('kind') == 'payment')
+    fees_paid = float(student.get('fees_paid') or 0)
+    first_due = _parse_date(student.get('fees_due_date')) or _parse_date(student.get('created_at')) or today
+    schedule = build_schedule(student.get('total_fees'), fees_paid, student.get('installments'), first_due)
+    summary = summarize_schedule(schedule, student.get('total_fees'), fees_paid,
+                                 student.get('due_fees'), student.get('fees_status'))
+
+    operations = []
+    common = {'student_id': student_ref.id, 'batch_id': student.get('batch_id')}
+    delta = round(fees_paid - received, 2)
+    if delta:
+        operations.append(('set', payments.document(), dict(common, kind='payment', amount=delta,
+                                                             paid_on=today.strftime(DATE_FORMAT),
+                                                             note='Fees paid updated' if rows else 'Opening balance')))
+    installment_ids = set()
+    for row in schedule:
+        doc_id = f"installment-{row['installment_no']:02d}"
+        installment_ids.add(doc_id)
+        operations.append(('set', payments.document(doc_id), dict(common, **row)))
+    for row in rows:
+        if row.to_dict().get('kind') == 'installment' and row.id not in installment_ids:
+            operations.append(('delete', row.reference, None))
+    return operations, summary
+
+
+def sync_student_ledger(db, student_ref, student, today=None):
+    """Bring a student's ledger in line with its flat fee fields (see ledger_writes).
+
+    Reads the current payments, then writes the ledger changes and the summary
+    fields on the student document in one batch. Returns the summary fields.
+    """
+    rows = list(student_ref.collection(PAYMENTS_SUBCOLLECTION).stream())
+    operations, summary = ledger_writes(student_ref, student, rows, today)
+    batch = db.batch()
+    for op, doc_ref, data in operations:
+        if op == 'delete':
+            batch.delete(doc_ref)
+        else:
+            batch.set(doc_ref, data)
+    batch.update(student_ref, summary)
+    batch.commit()
+    return summary
+
+
+def delete_student_ledger(db, student_ref):
+    """Delete a student's payments subcollection; returns the number of rows deleted"""
+    return bulk_delete(db, [doc.reference for doc in student_ref.collection(PAYMENTS_SUBCOLLECTION).select([]).stream()])
+
+
+def week_bounds(today=None):
+    """(monday, next monday) of the week containing today, as YYYY-MM-DD strings"""
+    today = today or date.today()
+    monday = today - timedelta(days=today.weekday())
+    return monday.strftime(DATE_FORMAT), (monday + timedelta(days=7)).strftime(DATE_FORMAT)
+
+
+def month_bounds(today=None):
+    """(first of the month, first of next month) as YYYY-MM-DD strings"""
+    first = (today or date.today()).replace(day=1)
+    return first.strftime(DATE_FORMAT), _add_months(first, 1).strftime(DATE_FORMAT)
+
+
+def overdue_this_week(students_collection, today=None, batch_id=None):
+    """Students with an unpaid installment that fell due this week before today.
+
+    Index: students (batch_id ASC, next_due_date ASC) when batch_id is given.
+    """
+    today = today or date.today()
+    week_start, _ = week_bounds(today)
+    query = students_collection
+    if batch_id:
+        query = query.where('batch_id', '==', batch_id)
+    query = query.where('next_due_date', '>=', week_start).where('next_due_date', '<', today.strftime(DATE_FORMAT))
+    return [dict(doc.to_dict(), _id=doc.id) for doc in query.stream()]
+
+
+def collections_between(db, start, end):
+    """Payment rows received in [start, end) across all students (collection group query).
+
+    Index: payments collection group (kind ASC, paid_on ASC).
+    """
+    query = db.collection_group(PAYMENTS_SUBCOLLECTION).where('kind', '==', 'payment')\
+                                                        .where('paid_on', '>=', start).where('paid_on', '<', end)
+    return [doc.to_dict() for doc in query.select(['amount', 'batch_id', 'paid_on']).stream()]
+
+
+def collections_this_month(db, today=None):
+    """{'total': amount, 'by_batch': {batch_id: amount}} for payments received this month"""
+    by_batch = defaultdict(float)
+    for payment in collections_between(db, *month_bounds(today)):
+        by_batch[payment.get('batch_id')] += payment.get('amount', 0)
+    return {'total': round(sum(by_batch.values()), 2), 'by_batch': {key: round(value, 2) for key, value in by_batch.items()}}
+
+
+def backfill_ledgers(db, progress=None):
+    """Create ledgers for students that do not have one yet (no next_due_date / due_fees sync)"""
+    created = 0
+    for doc in db.collection('students').stream():
+        student = doc.to_dict()
+        if 'next_due_date' in student:
+            continue
+        sync_student_ledger(db, doc.reference, student,
+                            today=_parse_date(student.get('created_at')) or date.today())
+        created += 1
+        if progress:
+            progress(created)
+    return created
+
+
+if __name__ == "__main__":
+    from .firebase_config import firebase_config
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'backfill':
+        print("Usage: python -m portalflask.fee_ledger backfill")
+        sys.exit(1)
+    if not firebase_config.firebase_available:
+        print("Firebase not available!")
+        sys.exit(1)
+    count = backfill_ledgers(firebase_config.db, progress=lambda n: n % 100 == 0 and print(f"{n} ledgers created"))
+    print(f"Created {count} ledgers")
@@ -2,47 +2,116 @@
 """
 Firebase Configuration for TechZone Academy Student Management System
 Uses FIREBASE_CONFIG environment variable instead of a local JSON file.
+The Firebase clients are created lazily on first use (thread-safe); if that fails
+it is retried with backoff on later use instead of disabling Firebase for the
+life of the process.
+
+Without FIREBASE_CONFIG, FIRESTORE_EMULATOR_HOST points the app at the Firestore
+emulator; tests and benchmarks can also hand in their own clients with
+firebase_config.use_clients() (see fake_firestore).
+
+DATA_BACKEND selects where the data lives: firestore (default), sqlite (a local
+file at DATA_SQLITE_PATH, see sqlite_store) or memory (in-process, lost on exit).
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore, storage
 import os
 import json
+import threading
+import time
 from datetime import datetime
 from dotenv import load_dotenv
-import tempfile
-import logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
+from .log_config import configure_logging, get_logger
+from .instrumentation import instrument_client, instrument_bucket
 
 # Load .env file locally (safe in dev)
 if os.path.exists(".env"):
     load_dotenv()
 
+configure_logging()
+log = get_logger('firebase')
+
 class FirebaseConfig:
+    RETRY_INITIAL_SECONDS = 5
+    RETRY_MAX_SECONDS = 300
+
     def __init__(self):
-        self.db = None
-        self.storage_bucket = None
-        self.firebase_available = False
-        self.initialize_firebase()
+        self._db = None
+        self._storage_bucket = None
+        self._available = False
+        self._lock = threading.Lock()
+        self._next_attempt = 0.0
+        self._retry_delay = self.RETRY_INITIAL_SECONDS
+
+    def _ensure_initialized(self):
+        """Initialize on first use; after a failure, try again once the backoff delay has passed"""
+        if self._available or time.monotonic() < self._next_attempt:
+            return self._available
+        with self._lock:
+            if self._available or time.monotonic() < self._next_attempt:
+                return self._available
+            if self.initialize_firebase():
+                self._retry_delay = self.RETRY_INITIAL_SECONDS
+            else:
+                self._next_attempt = time.monotonic() + self._retry_delay
+                log.warning("Firebase unavailable; retrying in %ss", self._retry_delay)
+                self._retry_delay = min(self._retry_delay * 2, self.RETRY_MAX_SECONDS)
+            return self._available
+
+    @property
+    def firebase_available(self):
+        return self._ensure_initialized()
+
+    @property
+    def db(self):
+        self._ensure_initialized()
+        return self._db
+
+    @property
+    def storage_bucket(self):
+        self._ensure_initialized()
+        return self._storage_bucket
+
+    def use_clients(self, db, storage_bucket=None):
+        """Serve the given clients (fake_firestore, an emulator client) instead of connecting to Firebase"""
+        with self._lock:
+            self._db = instrument_client(db)
+            self._storage_bucket = instrument_bucket(storage_bucket)
+            self._available = db is not None
+            self._next_attempt = 0.0
+
+    def reconnect(self):
+        """Drop the current clients so the next use builds new ones (e.g. after repeated transport errors)"""
+        with self._lock:
+            self._db = None
+            self._storage_bucket = None
+            self._available = False
+            self._next_attempt = 0.0
 
     def initialize_firebase(self):
-        """Initialize Firebase Admin SDK from environment variable via temp file"""
-        temp_json_file = None
+        """Initialize Firebase Admin SDK from the FIREBASE_CONFIG environment variable; returns True on success"""
+        backend = os.getenv("DATA_BACKEND", "firestore").strip().lower()
+        if backend != "firestore":
+            return self._connect_local(backend)
+
+        import firebase_admin
+        from firebase_admin import credentials, firestore, storage
+
         try:
             firebase_config_str = os.getenv("FIREBASE_CONFIG")
-            logging.debug(f"FIREBASE_CONFIG raw: {firebase_config_str}")
+
+            if not firebase_config_str and os.getenv("FIRESTORE_EMULATOR_HOST"):
+                return self._connect_emulator()
 
             if not firebase_config_str:
-                logging.error("❌ FIREBASE_CONFIG environment variable not set!")
-                return
+                log.error("❌ FIREBASE_CONFIG environment variable not set!")
+                return False
 
             try:
                 firebase_config = json.loads(firebase_config_str)
             except json.JSONDecodeError as e:
-                logging.error(f"❌ Invalid FIREBASE_CONFIG JSON: {e}")
-                return
+                log.error("❌ Invalid FIREBASE_CONFIG JSON: %s", e)
+                return False
 
             # Fix all forms of newlines in private_key
             if "private_key" in firebase_config:
@@ -50,39 +119,63 @@ class FirebaseConfig:
                 # Handle both '\\n' and '\n' (double-escaped and single-escaped)
                 pk_fixed = pk.replace('\\n', '\n').replace('\r\n', '\n').replace('\r', '\n')
                 firebase_config["private_key"] = pk_fixed
-                logging.debug(f"private_key repr: {repr(pk_fixed)}")
-                logging.debug(f"private_key length: {len(pk_fixed)}")
-                logging.debug(f"private_key start: {pk_fixed[:40]}")
-                logging.debug(f"private_key end: {pk_fixed[-40:]}")
-
-            # Write the fixed config to a temp file
-            with tempfile.NamedTemporaryFile("w", delete=False, suffix=".json") as tf:
-                json.dump(firebase_config, tf)
-                temp_json_file = tf.name
-                logging.debug(f"Wrote fixed FIREBASE_CONFIG to temp file: {temp_json_file}")
 
             if not firebase_admin._apps:
-                cred = credentials.Certificate(temp_json_file)
+                # Built straight from the parsed service account; the key never touches disk or the logs
+                cred = credentials.Certificate(firebase_config)
                 firebase_admin.initialize_app(cred, {
                     'storageBucket': firebase_config.get('project_id') + '.firebasestorage.app'
                 })
 
-            self.db = firestore.client()
-            self.storage_bucket = storage.bucket()
-            self.firebase_available = True
-            logging.info("✅ Firebase Firestore connected successfully!")
-            logging.info("✅ Firebase Storage connected successfully!")
+            self._db = instrument_client(firestore.client())
+            self._storage_bucket = instrument_bucket(storage.bucket())
+            self._available = True
+            log.info("✅ Firebase Firestore connected successfully!")
+            log.info("✅ Firebase Storage connected successfully!")
+            return True
         except Exception as e:
-            logging.error(f"❌ Firebase initialization failed: {e}")
-            self.firebase_available = False
-        finally:
-            # Clean up temp file
-            if temp_json_file and os.path.exists(temp_json_file):
-                try:
-                    os.remove(temp_json_file)
-                    logging.debug(f"Deleted temp file: {temp_json_file}")
-                except Exception as cleanup_err:
-                    logging.warning(f"Could not delete temp file: {cleanup_err}")
+            log.error("❌ Firebase initialization failed: %s", e)
+            self._available = False
+            return False
+
+    def _connect_emulator(self):
+        """Connect to the Firestore emulator at FIRESTORE_EMULATOR_HOST (no credentials, no Storage)"""
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud import firestore as cloud_firestore
+
+        project_id = os.getenv("FIREBASE_PROJECT_ID", "demo-techzone")
+        self._db = instrument_client(cloud_firestore.Client(project=project_id, credentials=AnonymousCredentials()))
+        self._storage_bucket = None
+        self._available = True
+        log.info("✅ Using Firestore emulator at %s (project %s)", os.getenv("FIRESTORE_EMULATOR_HOST"), project_id)
+        return True
+
+    def _connect_local(self, backend):
+        """Serve data from a local store instead of Firebase (DATA_BACKEND=sqlite or memory)"""
+        try:
+            if backend == "sqlite":
+                from .sqlite_store import SQLiteBucket, SQLiteFirestore
+
+                path = os.getenv("DATA_SQLITE_PATH", "techzone_data.sqlite3")
+                db, bucket = SQLiteFirestore(path), SQLiteBucket(path)
+                location = path
+            elif backend == "memory":
+                from .fake_firestore import FakeBucket, FakeFirestore
+
+                db, bucket = FakeFirestore(), FakeBucket()
+                location = "memory"
+            else:
+                log.error("❌ Unknown DATA_BACKEND %r (expected firestore, sqlite or memory)", backend)
+                return False
+        except Exception as e:
+            log.error("❌ %s data backend failed: %s", backend, e)
+            return False
+
+        self._db = instrument_client(db)
+        self._storage_bucket = instrument_bucket(bucket)
+        self._available = True
+        log.info("✅ Using %s data backend (%s)", backend, location)
+        return True
 
     def get_collection(self, collection_name):
         """Get a Firestore collection reference"""
@@ -102,11 +195,44 @@ class FirebaseConfig:
                 'message': 'Firebase connection test successful'
             })
             test_doc.delete()
-            logging.info("✅ Firebase connection test passed!")
+            log.info("✅ Firebase connection test passed!")
             return True
         except Exception as e:
-            logging.error(f"❌ Firebase connection test failed: {e}")
+            log.error("❌ Firebase connection test failed: %s", e)
             return False
 
-# Global Firebase instance
+class LazyCollection:
+    """A collection reference resolved on first use, so importing the app never connects to Firebase"""
+
+    def __init__(self, config, name):
+        self._config = config
+        self._name = name
+
+    def __getattr__(self, attr):
+        collection = self._config.get_collection(self._name)
+        if collection is None:
+            raise RuntimeError(f"Firebase not available (collection {self._name})")
+        return getattr(collection, attr)
+
+    def __repr__(self):
+        return f"<LazyCollection {self._name}>"
+
+
+class LazyBucket:
+    """The default Storage bucket, resolved on first use"""
+
+    def __init__(self, config):
+        self._config = config
+
+    def __getattr__(self, attr):
+        bucket = self._config.storage_bucket
+        if bucket is None:
+            raise RuntimeError("Firebase Storage not available")
+        return getattr(bucket, attr)
+
+    def __bool__(self):
+        return self._config.storage_bucket is not None
+
+
+# Global Firebase instance (connects on first use)
 firebase_config = FirebaseConfig()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Firestore index manifest for TechZone Academy Student Management System
+QUERY_SHAPES lists every query shape the app issues (collection or collection
+group, equality fields, range field, sort order). plan() applies Firestore's
+index rules to a shape; generate() derives firestore.indexes.json from the
+manifest, keeping any index already in the file that the manifest does not produce.
+
+    python -m portalflask.firestore_indexes generate        rewrite firestore.indexes.json
+    python -m portalflask.firestore_indexes check           fail if the file lacks a required index
+    python -m portalflask.firestore_indexes check --run     also run every shape against the backend
+
+check --run executes each shape (with placeholder values, limit 1) against the
+configured backend, normally the emulator (FIRESTORE_EMULATOR_HOST), so invalid
+field paths or operators fail in CI instead of in a request. The emulator does
+not enforce indexes, so index coverage always comes from the manifest; shapes
+that Firestore can only serve by merging single-field indexes are reported too.
+"""
+
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+# equals: fields filtered with == (or in); range: one field filtered with <, >= ...;
+# order: ((field, 'ASCENDING' | 'DESCENDING'), ...); group: collection group query;
+# composite: declare a composite index even where Firestore could merge single-field indexes
+QueryShape = namedtuple('QueryShape', ['name', 'collection', 'equals', 'range', 'order', 'group', 'composite'],
+                        defaults=((), None, (), False, False))
+
+ASC, DESC = 'ASCENDING', 'DESCENDING'
+
+QUERY_SHAPES = [
+    # students
+    QueryShape('student login', 'students', equals=('batch_id', 'username'), composite=True),
+    QueryShape('student by student ID', 'students', equals=('student_id',)),
+    QueryShape('student by email', 'students', equals=('email',)),
+    QueryShape('student by username', 'students', equals=('username',)),
+    QueryShape('students of a batch', 'students', equals=('batch_id',)),
+    QueryShape('students by course (ID counters)', 'students', equals=('course_initials',)),
+    QueryShape('students page / export', 'students', equals=('batch_time', 'fees_status'), order=(('__name__', ASC),)),
+    QueryShape('students page backwards', 'students', equals=('batch_time', 'fees_status'),
+               order=(('__name__', DESC),)),
+    QueryShape('overdue this week', 'students', range='next_due_date'),
+    QueryShape('overdue this week by batch', 'students', equals=('batch_id',), range='next_due_date'),
+    QueryShape('students updated since', 'students', range='updated_at'),
+    # payments ledger (subcollection of students)
+    QueryShape('payments of a batch', 'payments', equals=('batch_id',), group=True),
+    QueryShape('all payments', 'payments', equals=('kind',), group=True),
+    QueryShape('payments between dates', 'payments', equals=('kind',), range='paid_on', group=True),
+    # batches
+    QueryShape('batches updated since', 'batches', range='updated_at'),
+    # messages
+    QueryShape('messages of a batch, newest first', 'messages', equals=('batch_id',), order=(('timestamp', DESC),)),
+    QueryShape('messages of a batch', 'messages', equals=('batch_id',)),
+    # trainer files
+    QueryShape('files of a batch', 'trainer_files', equals=('batch_id',)),
+    QueryShape('files of a trainer', 'trainer_files', equals=('uploaded_by',)),
+    QueryShape('file by name', 'trainer_files', equals=('filename',)),
+    QueryShape('file by name and trainer', 'trainer_files', equals=('filename', 'uploaded_by')),
+    # course tracking
+    QueryShape('tracking of a trainer', 'course_tracking', equals=('Trainer Name',)),
+    QueryShape('tracking page', 'course_tracking', order=(('__name__', ASC),)),
+    QueryShape('tracking updated since', 'course_tracking', range='updated_at'),
+    # student feedback
+    QueryShape('feedback, newest first', 'student_feedback', order=(('created_at', DESC),)),
+    QueryShape('feedback updated since', 'student_feedback', range='updated_at'),
+    # role credentials
+    QueryShape('role login', 'role_credentials', equals=('username', 'role'), composite=True),
+    QueryShape('credentials of a role', 'role_credentials', equals=('role',)),
+    # batch deletion jobs
+    QueryShape('unfinished deletion jobs', 'batch_deletion_jobs', equals=('status',)),
+]
+
+SIMPLE_FIELD = re.compile(r'^[_a-zA-Z][_a-zA-Z0-9]*$')
+
+
+def field_path(name):
+    """A field name as a Firestore field path (backquoted unless it is a simple identifier)"""
+    if SIMPLE_FIELD.match(name) or name == '__name__':
+        return name
+    return '`' + name.replace('\\', '\\\\').replace('`', '\\`') + '`'
+
+
+def index_fields(shape):
+    """The (field, order) list an index must have to serve the shape; the implicit __name__ is dropped"""
+    fields = [(field, ASC) for field in shape.equals]
+    order = list(shape.order)
+    if shape.range:
+        # The range field comes first among the sort fields, in the query's direction for it
+        direction = order.pop(0)[1] if order and order[0][0] == shape.range else ASC
+        fields.append((shape.range, direction))
+    fields += order
+    if fields and fields[-1][0] == '__name__':
+        fields.pop()
+    return fields
+
+
+def plan(shape):
+    """How Firestore serves the shape: ('single', field), ('merge', fields) or ('composite', fields)"""
+    fields = index_fields(shape)
+    names = {field for field, _ in fields}
+    if len(names) <= 1:
+        return ('single', fields[0][0] if fields else None)
+    sorted_fields = [field for field, _ in fields[len(shape.equals):]]
+    if not sorted_fields and not shape.composite:
+        # Equality-only queries are answered by a zig-zag merge of single-field indexes
+        return ('merge', [field for field, _ in fields])
+    return ('composite', fields)
+
+
+def composite_index(shape, fields):
+    return {
+        'collectionGroup': shape.collection,
+        'queryScope': 'COLLECTION_GROUP' if shape.group else 'COLLECTION',
+        'fields': [{'fieldPath': field, 'order': order} for field, order in fields],
+    }
+
+
+def field_override(collection, field):
+    """Single-field indexes on field for both collection and collection group queries"""
+    return {
+        'collectionGroup': collection,
+        'fieldPath': field,
+        'indexes': [{'order': ASC, 'queryScope': 'COLLECTION'}, {'order': ASC, 'queryScope': 'COLLECTION_GROUP'}],
+    }
+
+
+def required_indexes(shapes=QUERY_SHAPES):
+    """(composite indexes, field overrides) the shapes need beyond Firestore's automatic indexes"""
+    indexes, overrides = [], []
+    for shape in shapes:
+        kind, fields = plan(shape)
+        if kind == 'composite':
+            index = composite_index(shape, fields)
+            if index not in indexes:
+                indexes.append(index)
+        elif shape.group:
+            # Automatic single-field indexes only cover collection scope
+            for field in ([fields] if kind == 'single' else fields):
+                override = field_override(shape.collection, field)
+                if field and override not in overrides:
+                    overrides.append(override)
+    return indexes, overrides
+
+
+def _key(entry):
+    return json.dumps(entry, sort_keys=True)
+
+
+def merge(existing, shapes=QUERY_SHAPES):
+    """The index file with every required index added; entries already present are kept as they are"""
+    indexes, overrides = required_indexes(shapes)
+    merged = {'indexes': list(existing.get('indexes', [])), 'fieldOverrides': list(existing.get('fieldOverrides', []))}
+    present = {_key(index) for index in merged['indexes']}
+    merged['indexes'] += [index for index in indexes if _key(index) not in present]
+    overridden = {(override['collectionGroup'], override['fieldPath']) for override in merged['fieldOverrides']}
+    merged['fieldOverrides'] += [override for override in overrides
+                                 if (override['collectionGroup'], override['fieldPath']) not in overridden]
+    return merged
+
+
+def missing(existing, shapes=QUERY_SHAPES):
+    """Required indexes and field overrides that the index file does not declare"""
+    indexes, overrides = required_indexes(shapes)
+    present = {_key(index) for index in existing.get('indexes', [])}
+    overridden = {(override['collectionGroup'], override['fieldPath']) for override in existing.get('fieldOverrides', [])}
+    return ([index for index in indexes if _key(index) not in present]
+            + [override for override in overrides
+               if (override['collectionGroup'], override['fieldPath']) not in overridden])
+
+
+def render(document):
+    """JSON in the layout of firestore.indexes.json: one line per index field"""
+    text = json.dumps(document, indent=2, ensure_ascii=False)
+    # Collapse the innermost objects ({"fieldPath": ..., "order": ...}) onto one line
+    return re.sub(r'\{\n\s+("[^{}\[\]]*?)\n\s+\}',
+                  lambda m: '{ ' + re.sub(r',\n\s+', ', ', m.group(1)) + ' }', text) + '\n'
+
+
+def build_query(db, shape, value=''):
+    """The shape as a query on db with placeholder values, limited to one result"""
+    query = db.collection_group(shape.collection) if shape.group else db.collection(shape.collection)
+    for field in shape.equals:
+        query = query.where(field_path(field), '==', value)
+    if shape.range:
+        query = query.where(field_path(shape.range), '>=', value)
+    for field, direction in shape.order:
+        query = query.order_by(field_path(field), direction=direction)
+    return query.limit(1)
+
+
+def run_shapes(db, shapes=QUERY_SHAPES):
+    """Run every shape against db; returns [(shape, error message)] for the ones that fail"""
+    failures = []
+    for shape in shapes:
+        try:
+            list(build_query(db, shape).stream())
+        except Exception as e:
+            failures.append((shape, str(e)))
+    return failures
+
+
+def _index_path():
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'firestore.indexes.json')
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    path = _index_path()
+    if command == 'generate':
+        text = render(merge(_load(path)))
+        with open(path, 'w') as f:
+            f.write(text)
+        print(f"Wrote {path}")
+    elif command == 'check':
+        failed = False
+        for shape in QUERY_SHAPES:
+            kind, fields = plan(shape)
+            if kind == 'merge':
+                print(f"note: '{shape.name}' merges single-field indexes on {', '.join(fields)}")
+        for entry in missing(_load(path)):
+            print(f"MISSING in firestore.indexes.json: {json.dumps(entry)}")
+            failed = True
+        if '--run' in sys.argv[2:]:
+            from .firebase_config import firebase_config
+
+            if not firebase_config.firebase_available:
+                print("Firebase not available! Set FIRESTORE_EMULATOR_HOST to check against the emulator.")
+                sys.exit(1)
+            failures = run_shapes(firebase_config.db)
+            for shape, error in failures:
+                print(f"FAILED '{shape.name}' on {shape.collection}: {error}")
+            failed = failed or bool(failures)
+            print(f"Ran {len(QUERY_SHAPES)} query shapes, {len(failures)} failed")
+        sys.exit(1 if failed else 0)
+    else:
+        print("Usage: python -m portalflask.firestore_indexes generate | check [--run]")
+        sys.exit(1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Student ID sequence counters for TechZone Academy Student Management System
+Keeps one counter document per course-initials prefix in student_id_counters and
+increments it inside a Firestore transaction, so concurrent saves never receive
+the same number and no student scan is needed.
+
+A missing counter is seeded from existing student IDs the first time it is used;
+to seed every counter up front run:
+    python -m portalflask.id_counters backfill
+"""
+
+import re
+import sys
+from datetime import datetime
+
+COUNTERS_COLLECTION = 'student_id_counters'
+
+
+def _sequence_number(course_initials, student_id):
+    """Extract the sequence number from a student ID, e.g. "EPE003 (4:00)-(5:00) (01-AUG-2025)" -> 3"""
+    if not course_initials or not student_id or not student_id.startswith(course_initials):
+        return None
+    match = re.match(r'\d+', student_id[len(course_initials):])
+    return int(match.group()) if match else None
+
+
+def _highest_existing(db, course_initials, transaction=None):
+    """Highest sequence number already used by students with these course initials"""
+    query = db.collection('students').where('course_initials', '==', course_initials).select(['student_id'])
+    numbers = (_sequence_number(course_initials, doc.to_dict().get('student_id'))
+               for doc in query.stream(transaction=transaction))
+    return max((number for number in numbers if number is not None), default=0)
+
+
+def next_sequence(db, course_initials):
+    """Atomically increment and return the next sequence number for course_initials (starting at 1)"""
+    from firebase_admin import firestore
+    counter_ref = db.collection(COUNTERS_COLLECTION).document(course_initials)
+
+    @firestore.transactional
+    def increment(transaction):
+        snapshot = counter_ref.get(transaction=transaction)
+        if snapshot.exists:
+            value = snapshot.to_dict().get('value', 0) + 1
+        else:
+            # Counter not backfilled yet: seed it from existing IDs once, inside the same transaction
+            value = _highest_existing(db, course_initials, transaction=transaction) + 1
+        transaction.set(counter_ref, {
+            'value': value,
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        return value
+
+    return increment(db.transaction())
+
+
+def backfill_counters(db):
+    """Seed every counter with the highest sequence number already used in student IDs.
+
+    Counters are only ever raised, so running this again (or while admins are
+    adding students) is safe. Returns {course_initials: counter value}.
+    """
+    from firebase_admin import firestore
+    highest = {}
+    for doc in db.collection('students').select(['course_initials', 'student_id']).stream():
+        student = doc.to_dict()
+        course_initials = student.get('course_initials')
+        number = _sequence_number(course_initials, student.get('student_id'))
+        if number is not None:
+            highest[course_initials] = max(highest.get(course_initials, 0), number)
+
+    for course_initials, value in highest.items():
+        counter_ref = db.collection(COUNTERS_COLLECTION).document(course_initials)
+
+        @firestore.transactional
+        def raise_counter(transaction):
+            snapshot = counter_ref.get(transaction=transaction)
+            current = snapshot.to_dict().get('value', 0) if snapshot.exists else 0
+            if value > current:
+                transaction.set(counter_ref, {
+                    'value': value,
+                    'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                })
+            return max(value, current)
+
+        highest[course_initials] = raise_counter(db.transaction())
+    return highest
+
+
+if __name__ == "__main__":
+    from .firebase_config import firebase_config
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'backfill':
+        print("Usage: python -m portalflask.id_counters backfill")
+        sys.exit(1)
+    if not firebase_config.firebase_available:
+        print("Firebase not available!")
+        sys.exit(1)
+    for initials, counter in sorted(backfill_counters(firebase_config.db).items()):
+        print(f"{initials:<8} {counter}")
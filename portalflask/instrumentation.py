@@ -0,0 +1,427 @@
+"""
+Firestore / Storage instrumentation for TechZone Academy Student Management System
+The Firestore client and Storage bucket handed out by firebase_config are wrapped
+in thin proxies that time every call that goes over the network and count what
+it returned: documents read, writes committed and bytes transferred.
+
+Each call is added to
+    - the stats of the current request (a context variable, also exposed as
+      flask.g.backend_stats), reported in the Server-Timing response header and
+      in the slow-request log, and
+    - process-wide counters served by /metrics in the Prometheus text format.
+
+Environment:
+    FIRESTORE_INSTRUMENTATION   "0" to hand out the bare clients (default on)
+    SLOW_REQUEST_MS             log requests slower than this with a per-call breakdown (default 1000, 0 = off)
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from .log_config import get_logger
+
+log = get_logger('requests')
+
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUILDERS = frozenset(['where', 'order_by', 'limit', 'limit_to_last', 'offset', 'select',
+                            'start_at', 'start_after', 'end_at', 'end_before'])
+
+_current_stats = ContextVar('backend_request_stats', default=None)
+
+
+def instrumentation_enabled():
+    return os.getenv('FIRESTORE_INSTRUMENTATION', '1').lower() not in ('0', 'false', 'no', 'off')
+
+
+class RequestStats:
+    """Backend calls made while serving one request, aggregated per (service, op, target)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def add(self, service, op, target, seconds, documents, nbytes):
+        with self._lock:
+            entry = self._calls.setdefault((service, op, target), [0, 0.0, 0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += documents
+            entry[3] += nbytes
+
+    def breakdown(self):
+        """[{'service', 'op', 'target', 'calls', 'ms', 'documents', 'bytes'}], slowest first"""
+        with self._lock:
+            items = list(self._calls.items())
+        rows = [{'service': service, 'op': op, 'target': target, 'calls': calls, 'ms': round(seconds * 1000, 1),
+                 'documents': documents, 'bytes': nbytes}
+                for (service, op, target), (calls, seconds, documents, nbytes) in items]
+        return sorted(rows, key=lambda row: row['ms'], reverse=True)
+
+    def totals(self, service):
+        """(calls, seconds, documents, bytes) for one service"""
+        with self._lock:
+            entries = [entry for key, entry in self._calls.items() if key[0] == service]
+        return tuple(sum(entry[i] for entry in entries) for i in range(4))
+
+
+class MetricsRegistry:
+    """Process-wide counters rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._requests = {}
+        self._latency = {}
+
+    def record_call(self, service, op, target, seconds, documents, nbytes):
+        with self._lock:
+            entry = self._calls.setdefault((service, op, target), [0, 0.0, 0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += documents
+            entry[3] += nbytes
+
+    def record_request(self, endpoint, method, status, seconds, documents):
+        with self._lock:
+            self._requests[(endpoint, method, str(status))] = self._requests.get((endpoint, method, str(status)), 0) + 1
+            histogram = self._latency.setdefault(endpoint, [[0] * len(REQUEST_BUCKETS), 0, 0.0, 0])
+            for i, bound in enumerate(REQUEST_BUCKETS):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += 1
+            histogram[2] += seconds
+            histogram[3] += documents
+
+    def render(self):
+        with self._lock:
+            calls = dict(self._calls)
+            requests = dict(self._requests)
+            latency = {key: ([*value[0]], *value[1:]) for key, value in self._latency.items()}
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(**values):
+            return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in values.items()) + '}'
+
+        for index, (name, help_text) in enumerate([
+                ('techzone_backend_calls_total', 'Firestore/Storage calls'),
+                ('techzone_backend_call_seconds_total', 'Time spent in Firestore/Storage calls'),
+                ('techzone_backend_documents_total', 'Documents read or written'),
+                ('techzone_backend_bytes_total', 'Bytes transferred to or from Storage')]):
+            family(name, 'counter', help_text)
+            for (service, op, target), values in sorted(calls.items()):
+                lines.append(f"{name}{labels(service=service, op=op, target=target)} {_number(values[index])}")
+
+        family('techzone_http_requests_total', 'counter', 'HTTP requests served')
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f"techzone_http_requests_total{labels(endpoint=endpoint, method=method, status=status)} {count}")
+
+        family('techzone_http_request_duration_seconds', 'histogram', 'HTTP request latency')
+        for endpoint, (buckets, count, total, _) in sorted(latency.items()):
+            for bound, bucket_count in zip(REQUEST_BUCKETS, buckets):
+                lines.append(f"techzone_http_request_duration_seconds_bucket{labels(endpoint=endpoint, le=bound)} "
+                             f"{bucket_count}")
+            lines.append(f"techzone_http_request_duration_seconds_bucket{labels(endpoint=endpoint, le='+Inf')} {count}")
+            lines.append(f"techzone_http_request_duration_seconds_sum{labels(endpoint=endpoint)} {_number(total)}")
+            lines.append(f"techzone_http_request_duration_seconds_count{labels(endpoint=endpoint)} {count}")
+
+        family('techzone_http_request_documents_total', 'counter', 'Firestore documents read or written per endpoint')
+        for endpoint, (_, _, _, documents) in sorted(latency.items()):
+            lines.append(f"techzone_http_request_documents_total{labels(endpoint=endpoint)} {documents}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return f"{value:.6f}" if isinstance(value, float) else str(value)
+
+
+metrics = MetricsRegistry()
+
+
+def current_stats():
+    """RequestStats of the request being served, or None outside a request"""
+    return _current_stats.get()
+
+
+def record(service, op, target, seconds, documents=0, nbytes=0):
+    metrics.record_call(service, op, target, seconds, documents, nbytes)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(service, op, target, seconds, documents, nbytes)
+
+
+def _timed(service, op, target, func, *args, measure=None, **kwargs):
+    """Call func, then record its duration and measure(result) -> (documents, bytes)"""
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception:
+        record(service, op, target, time.perf_counter() - started)
+        raise
+    documents, nbytes = measure(result) if measure else (0, 0)
+    record(service, op, target, time.perf_counter() - started, documents, nbytes)
+    return result
+
+
+def _timed_stream(iterator, target):
+    """Yield from a Firestore stream, counting documents and the time spent waiting on the server"""
+    seconds = 0.0
+    documents = 0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                doc = next(iterator)
+            except StopIteration:
+                seconds += time.perf_counter() - started
+                return
+            seconds += time.perf_counter() - started
+            documents += 1
+            yield doc
+    finally:
+        record('firestore', 'stream', target, seconds, documents)
+
+
+def _unwrap(value):
+    return value._target if isinstance(value, _Proxy) else value
+
+
+class _Proxy:
+    """Delegates everything it does not override to the wrapped SDK object"""
+
+    def __init__(self, target, name):
+        self._target = target
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._target, attr)
+
+    def __eq__(self, other):
+        return self._target == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._name} {self._target!r}>"
+
+
+class InstrumentedClient(_Proxy):
+    def collection(self, *path):
+        return InstrumentedQuery(self._target.collection(*path), path[-1].split('/')[-1])
+
+    def collection_group(self, collection_id):
+        return InstrumentedQuery(self._target.collection_group(collection_id), collection_id)
+
+    def document(self, *path):
+        reference = self._target.document(*path)
+        return InstrumentedDocument(reference, reference.parent.id)
+
+    def batch(self):
+        return InstrumentedBatch(self._target.batch(), 'batch')
+
+
+class InstrumentedQuery(_Proxy):
+    """A collection reference or query; builders return instrumented queries"""
+
+    def __getattr__(self, attr):
+        value = getattr(self._target, attr)
+        if attr in QUERY_BUILDERS:
+            def build(*args, **kwargs):
+                return InstrumentedQuery(value(*args, **kwargs), self._name)
+            return build
+        return value
+
+    def document(self, *args, **kwargs):
+        return InstrumentedDocument(self._target.document(*args, **kwargs), self._name)
+
+    def stream(self, *args, **kwargs):
+        return _timed_stream(iter(self._target.stream(*args, **kwargs)), self._name)
+
+    def get(self, *args, **kwargs):
+        return _timed('firestore', 'get', self._name, self._target.get, *args,
+                      measure=lambda docs: (len(docs), 0), **kwargs)
+
+    def add(self, *args, **kwargs):
+        return _timed('firestore', 'add', self._name, self._target.add, *args, measure=lambda _: (1, 0), **kwargs)
+
+
+class InstrumentedDocument(_Proxy):
+    def collection(self, name):
+        return InstrumentedQuery(self._target.collection(name), name)
+
+    def get(self, *args, **kwargs):
+        return _timed('firestore', 'get', self._name, self._target.get, *args,
+                      measure=lambda snapshot: (1, 0), **kwargs)
+
+    def _write(self, op, *args, **kwargs):
+        return _timed('firestore', op, self._name, getattr(self._target, op), *args,
+                      measure=lambda _: (1, 0), **kwargs)
+
+    def set(self, *args, **kwargs):
+        return self._write('set', *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._write('update', *args, **kwargs)
+
+    def create(self, *args, **kwargs):
+        return self._write('create', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._write('delete', *args, **kwargs)
+
+
+class InstrumentedBatch(_Proxy):
+    """Counts the writes queued on a WriteBatch and times its commit"""
+
+    def __init__(self, target, name):
+        super().__init__(target, name)
+        self._writes = 0
+
+    def _queue(self, op, reference, *args, **kwargs):
+        self._writes += 1
+        return getattr(self._target, op)(_unwrap(reference), *args, **kwargs)
+
+    def set(self, reference, *args, **kwargs):
+        return self._queue('set', reference, *args, **kwargs)
+
+    def update(self, reference, *args, **kwargs):
+        return self._queue('update', reference, *args, **kwargs)
+
+    def create(self, reference, *args, **kwargs):
+        return self._queue('create', reference, *args, **kwargs)
+
+    def delete(self, reference, *args, **kwargs):
+        return self._queue('delete', reference, *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        return _timed('firestore', 'commit', self._name, self._target.commit, *args,
+                      measure=lambda _: (self._writes, 0), **kwargs)
+
+
+def _blob_prefix(name):
+    """Metric label for a blob: its top-level folder, so labels stay few"""
+    return name.split('/', 1)[0] if '/' in name else '(root)'
+
+
+class InstrumentedBucket(_Proxy):
+    def blob(self, blob_name, *args, **kwargs):
+        return InstrumentedBlob(self._target.blob(blob_name, *args, **kwargs), _blob_prefix(blob_name))
+
+    def get_blob(self, blob_name, *args, **kwargs):
+        blob = _timed('storage', 'get_blob', _blob_prefix(blob_name), self._target.get_blob, blob_name, *args,
+                      **kwargs)
+        return InstrumentedBlob(blob, _blob_prefix(blob_name)) if blob is not None else None
+
+    def list_blobs(self, *args, **kwargs):
+        return _timed('storage', 'list_blobs', kwargs.get('prefix') or '(root)',
+                      lambda: list(self._target.list_blobs(*args, **kwargs)), measure=lambda blobs: (len(blobs), 0))
+
+
+def _upload_size(source):
+    try:
+        return source.tell()
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+class InstrumentedBlob(_Proxy):
+    def _call(self, op, *args, measure=None, **kwargs):
+        return _timed('storage', op, self._name, getattr(self._target, op), *args, measure=measure, **kwargs)
+
+    def exists(self, *args, **kwargs):
+        return self._call('exists', *args, **kwargs)
+
+    def reload(self, *args, **kwargs):
+        return self._call('reload', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._call('delete', *args, **kwargs)
+
+    def download_as_bytes(self, *args, **kwargs):
+        return self._call('download_as_bytes', *args, measure=lambda data: (0, len(data)), **kwargs)
+
+    def download_as_text(self, *args, **kwargs):
+        return self._call('download_as_text', *args, measure=lambda data: (0, len(data)), **kwargs)
+
+    def download_to_filename(self, filename, *args, **kwargs):
+        return self._call('download_to_filename', filename, *args,
+                          measure=lambda _: (0, os.path.getsize(filename)), **kwargs)
+
+    def upload_from_string(self, data, *args, **kwargs):
+        return self._call('upload_from_string', data, *args, measure=lambda _: (0, len(data)), **kwargs)
+
+    def upload_from_file(self, file_obj, *args, **kwargs):
+        return self._call('upload_from_file', file_obj, *args, measure=lambda _: (0, _upload_size(file_obj)),
+                          **kwargs)
+
+    def upload_from_filename(self, filename, *args, **kwargs):
+        return self._call('upload_from_filename', filename, *args,
+                          measure=lambda _: (0, os.path.getsize(filename)), **kwargs)
+
+
+def instrument_client(client):
+    """The Firestore client wrapped for instrumentation (unchanged when it is disabled)"""
+    return InstrumentedClient(client, 'firestore') if client is not None and instrumentation_enabled() else client
+
+
+def instrument_bucket(bucket):
+    """The Storage bucket wrapped for instrumentation (unchanged when it is disabled)"""
+    return InstrumentedBucket(bucket, bucket.name) if bucket is not None and instrumentation_enabled() else bucket
+
+
+def _server_timing(stats, total_seconds):
+    entries = []
+    for service in ('firestore', 'storage'):
+        calls, seconds, documents, nbytes = stats.totals(service)
+        if calls:
+            detail = f"{calls} calls, {documents} docs" if service == 'firestore' else f"{calls} calls, {nbytes} bytes"
+            entries.append(f'{service};dur={seconds * 1000:.1f};desc="{detail}"')
+    entries.append(f"app;dur={total_seconds * 1000:.1f}")
+    return ', '.join(entries)
+
+
+def instrument_app(app):
+    """Per-request backend stats: Server-Timing header, request metrics and the slow-request log"""
+    from flask import g, request
+
+    slow_seconds = int(os.getenv('SLOW_REQUEST_MS', '1000')) / 1000.0
+
+    @app.before_request
+    def start_request_stats():
+        g.backend_stats = RequestStats()
+        g.backend_stats_token = _current_stats.set(g.backend_stats)
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_request_stats(response):
+        stats = g.get('backend_stats')
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - g.request_started
+        response.headers['Server-Timing'] = _server_timing(stats, elapsed)
+        endpoint = request.endpoint or 'unmatched'
+        metrics.record_request(endpoint, request.method, response.status_code, elapsed, stats.totals('firestore')[2])
+        if slow_seconds and elapsed >= slow_seconds:
+            breakdown = stats.breakdown()
+            log.warning("Slow request %s %s: %.0fms, %s", request.method, request.path, elapsed * 1000,
+                        '; '.join(f"{row['service']} {row['op']} {row['target']} x{row['calls']} "
+                                  f"{row['ms']}ms {row['documents']} docs {row['bytes']} bytes"
+                                  for row in breakdown) or 'no backend calls',
+                        extra={'endpoint': endpoint, 'duration_ms': round(elapsed * 1000, 1), 'calls': breakdown})
+        return response
+
+    @app.teardown_request
+    def reset_request_stats(exc=None):
+        token = g.pop('backend_stats_token', None)
+        if token is not None:
+            _current_stats.reset(token)
@@ -0,0 +1,99 @@
+"""
+Logging setup for TechZone Academy Student Management System
+Every area of the app logs through its own named logger (techzone.auth,
+techzone.files, techzone.students, techzone.messaging, ...), so each area's level
+can be tuned on its own. Messages use %-style arguments, which are only formatted
+when a record is actually emitted; a disabled debug call costs one level check.
+
+Environment:
+    LOG_LEVEL          root level (DEBUG, INFO, WARNING, ...; INFO by default)
+    LOG_LEVELS         per-area overrides, e.g. "files=DEBUG,auth=WARNING"
+    LOG_FORMAT         "json" for one JSON object per line, anything else for text
+    LOG_DEBUG_SAMPLE   emit only 1 of every N debug records per call site (default 1)
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+ROOT_LOGGER = 'techzone'
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s %(message)s'
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def _level(name, default=logging.INFO):
+    return getattr(logging, str(name).strip().upper(), default)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, any `extra` fields and the traceback"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Pass 1 of every `every` DEBUG records per call site; other levels always pass"""
+
+    def __init__(self, every):
+        super().__init__()
+        self._every = max(int(every), 1)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self._every == 1 or record.levelno > logging.DEBUG:
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self._every == 0
+
+
+def configure_logging():
+    """Install the root handler once per process (repeat calls are no-ops)"""
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        handler = logging.StreamHandler()
+        if os.getenv('LOG_FORMAT', 'text').lower() == 'json':
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        try:
+            every = int(os.getenv('LOG_DEBUG_SAMPLE', '1'))
+        except ValueError:
+            every = 1
+        handler.addFilter(DebugSampler(every))
+
+        root = logging.getLogger()
+        root.handlers[:] = [handler]
+        root.setLevel(_level(os.getenv('LOG_LEVEL', 'INFO')))
+        for override in filter(None, os.getenv('LOG_LEVELS', '').split(',')):
+            area, _, level = override.partition('=')
+            get_logger(area.strip()).setLevel(_level(level))
+        _configured = True
+
+
+def get_logger(area):
+    """The logger for one area of the app, e.g. get_logger('auth') -> techzone.auth"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{area}" if area else ROOT_LOGGER)
@@ -0,0 +1,254 @@
+"""
+Reporting replica for TechZone Academy Student Management System
+Mirrors the fields the reporting pages need from students, batches,
+course_tracking and student_feedback into an indexed SQLite file, so the batch
+summary, student management and Super Admin dashboard run SQL against it
+instead of scanning Firestore on every page load.
+
+A sync only reads documents written since the last watermark: every write to a
+mirrored collection stamps updated_at with the time of the write (created_at can
+be backdated, e.g. an enrollment date), and a sync re-reads a few minutes back
+for clock skew. Deletions, which a
+watermark cannot see, flag the replica for a full rebuild; it is also rebuilt
+every few hours. Workers on a host share one file: a sync holds a write
+transaction, and the watermarks and rebuild flag are stored in the file, so
+only one worker syncs at a time and the others just read.
+
+Run a sync by hand (e.g. from cron) with:
+    python -m portalflask.reporting_replica sync [--full]
+"""
+
+import json
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from .firestore_indexes import field_path
+from .log_config import get_logger
+from .sqlite_store import SQLiteFile
+
+log = get_logger('reports')
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Re-read writes from slightly before the watermark in case of clock skew between workers
+WATERMARK_OVERLAP = timedelta(minutes=5)
+WATERMARK_FIELD = 'updated_at'
+
+# The course tracking fields the views show (AI_firebase imports this list)
+TRACKING_FIELDS = ["Trainer Name", "Batch Name", "Ongoing Module Name",
+                   "Completed Module", "Upcoming Module", "Class Date",
+                   "Start Time", "End Time", "Time stamp"]
+
+# collection -> mirrored columns (name, SQLite type) and indexes (column tuples)
+MIRRORS = {
+    'students': {
+        'columns': [('batch_id', 'TEXT'), ('batch_time', 'TEXT'), ('student_name', 'TEXT'),
+                    ('course_name', 'TEXT'), ('fees_status', 'TEXT'), ('total_fees', 'REAL'),
+                    ('fees_paid', 'REAL'), ('due_fees', 'REAL'), ('created_at', 'TEXT'), ('updated_at', 'TEXT')],
+        'indexes': [('batch_id', 'fees_status')],
+    },
+    'batches': {
+        'columns': [('batch_name', 'TEXT'), ('original_batch_name', 'TEXT'), ('start_time', 'TEXT'),
+                    ('end_time', 'TEXT'), ('batch_start_date', 'TEXT'), ('created_at', 'TEXT'), ('updated_at', 'TEXT')],
+        'indexes': [('batch_name',)],
+    },
+    'course_tracking': {
+        'columns': [(field, 'TEXT') for field in TRACKING_FIELDS] + [('created_at', 'TEXT'), ('updated_at', 'TEXT')],
+        'indexes': [('Trainer Name',), ('Batch Name',)],
+    },
+    'student_feedback': {
+        'columns': [('student_id', 'TEXT'), ('student_name', 'TEXT'), ('batch_name', 'TEXT'),
+                    ('submitted_by', 'TEXT'), ('created_at', 'TEXT')],
+        'indexes': [('created_at',), ('batch_name',)],
+    },
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _schema():
+    statements = ["CREATE TABLE IF NOT EXISTS replica_meta (key TEXT PRIMARY KEY, value TEXT)"]
+    for collection, spec in MIRRORS.items():
+        columns = ', '.join(f"{_quote(name)} {kind}" for name, kind in spec['columns'])
+        statements.append(f"CREATE TABLE IF NOT EXISTS {_quote(collection)} (_id TEXT PRIMARY KEY, {columns})")
+        for index in spec['indexes']:
+            index_name = _quote(f"idx_{collection}_{'_'.join(index)}".replace(' ', '_').lower())
+            statements.append(f"CREATE INDEX IF NOT EXISTS {index_name} ON {_quote(collection)} "
+                              f"({', '.join(_quote(column) for column in index)})")
+    return ';\n'.join(statements) + ';'
+
+
+def _cell(value, kind):
+    """A Firestore value as a SQLite cell of the column's type"""
+    if value is None:
+        return None
+    if kind == 'REAL':
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+class ReportingReplica:
+    """Incrementally synced SQLite copy of the reporting fields"""
+
+    def __init__(self, db_loader, path, refresh_seconds=60, full_rebuild_seconds=6 * 3600):
+        self._db_loader = db_loader
+        self._path = path
+        self._refresh_seconds = refresh_seconds
+        self._full_rebuild_seconds = full_rebuild_seconds
+        self._lock = threading.Lock()
+        self._file = None
+        self._checked_at = None
+        self._sync_next = False
+
+    def _connection(self):
+        if self._file is None:
+            self._file = SQLiteFile(self._path, _schema())
+        return self._file.connection()
+
+    # ----- sync -----
+    def _fetch(self, db, collection, since):
+        query = db.collection(collection).select([field_path(name) for name, _ in MIRRORS[collection]['columns']])
+        if since is not None:
+            query = query.where(WATERMARK_FIELD, '>=', since)
+        return [(doc.id, doc.to_dict()) for doc in query.stream()]
+
+    def _sync(self, conn, db, full, since):
+        started = datetime.now().strftime(TIMESTAMP_FORMAT)
+        counts = {}
+        for collection, spec in MIRRORS.items():
+            rows = self._fetch(db, collection, None if full else since)
+            columns = ['_id'] + [name for name, _ in spec['columns']]
+            if full:
+                conn.execute(f"DELETE FROM {_quote(collection)}")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {_quote(collection)} ({', '.join(_quote(c) for c in columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                [[doc_id] + [_cell(data.get(name), kind) for name, kind in spec['columns']] for doc_id, data in rows])
+            counts[collection] = len(rows)
+        meta = {'watermark': started, 'needs_full_rebuild': '0'}
+        if full:
+            meta['full_built_at'] = str(time.time())
+        conn.executemany("INSERT OR REPLACE INTO replica_meta (key, value) VALUES (?, ?)", meta.items())
+        return counts
+
+    def sync(self, full=False):
+        """Bring the replica up to date now; returns {collection: rows written}, or None if another
+        worker synced within refresh_seconds"""
+        db = self._db_loader()
+        if db is None:
+            return None
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM replica_meta").fetchall())
+            watermark = meta.get('watermark')
+            full = (full or watermark is None or meta.get('needs_full_rebuild') == '1'
+                    or time.time() - float(meta.get('full_built_at', 0)) > self._full_rebuild_seconds)
+            if not full and not self._sync_next:
+                age = datetime.now() - datetime.strptime(watermark, TIMESTAMP_FORMAT)
+                if age.total_seconds() < self._refresh_seconds:
+                    conn.execute("ROLLBACK")
+                    return None
+            since = None if full else (datetime.strptime(watermark, TIMESTAMP_FORMAT) - WATERMARK_OVERLAP)\
+                .strftime(TIMESTAMP_FORMAT)
+            counts = self._sync(conn, db, full, since)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._sync_next = False
+        log.info("Reporting replica %s sync: %s", 'full' if full else 'incremental', counts)
+        return counts
+
+    def refresh(self, force=False):
+        """Sync at most once every refresh_seconds (unless forced or expired); on failure keep serving the last sync"""
+        with self._lock:
+            now = time.monotonic()
+            if force:
+                self._sync_next = True
+            if not self._sync_next and self._checked_at is not None \
+                    and now - self._checked_at < self._refresh_seconds:
+                return
+            try:
+                self.sync()
+            except Exception as e:
+                log.error("Reporting replica sync failed, serving the last synced data: %s", e)
+            self._checked_at = now
+
+    def expire(self):
+        """Sync on the next read (after a write this worker made)"""
+        self._sync_next = True
+
+    def invalidate(self):
+        """Rebuild from scratch on the next read (after deletions)"""
+        try:
+            with self._lock:
+                self._connection().execute(
+                    "INSERT OR REPLACE INTO replica_meta (key, value) VALUES ('needs_full_rebuild', '1')")
+        except Exception as e:
+            log.warning("Could not flag the reporting replica for a rebuild: %s", e)
+        self._sync_next = True
+
+    # ----- queries -----
+    def query(self, sql, params=()):
+        """Rows of a read-only SQL query as dicts, after bringing the replica up to date"""
+        self.refresh()
+        cursor = self._connection().execute(sql, params)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def batches(self):
+        """Every batch as a dict with '_id', in document ID order"""
+        rows = self.query("SELECT * FROM batches ORDER BY _id")
+        return [{key: value for key, value in row.items() if value is not None} for row in rows]
+
+    def batch_counts(self):
+        """{batch_id: {'total_students', 'paid_students'}}"""
+        rows = self.query("SELECT batch_id, COUNT(*) AS total_students, "
+                          "SUM(fees_status = 'Paid') AS paid_students FROM students GROUP BY batch_id")
+        return {row['batch_id']: {'total_students': row['total_students'], 'paid_students': row['paid_students']}
+                for row in rows}
+
+    def student_totals(self):
+        """{'students', 'paid', 'with_due_fees', 'total_fees'} over all students"""
+        row = self.query("SELECT COUNT(*) AS students, COALESCE(SUM(fees_status = 'Paid'), 0) AS paid, "
+                         "COALESCE(SUM(due_fees > 0), 0) AS with_due_fees, "
+                         "COALESCE(SUM(total_fees), 0) AS total_fees FROM students")[0]
+        row['total_fees'] = round(row['total_fees'], 2)
+        return row
+
+    def tracking_frame(self):
+        """Course tracking records as a DataFrame with the dashboard columns, in document ID order"""
+        import pandas as pd
+        rows = self.query(f"SELECT {', '.join(_quote(field) for field in TRACKING_FIELDS)} "
+                          f"FROM course_tracking ORDER BY _id")
+        return pd.DataFrame(rows, columns=TRACKING_FIELDS).fillna("")
+
+
+if __name__ == "__main__":
+    import os
+
+    from .firebase_config import firebase_config
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'sync':
+        print("Usage: python -m portalflask.reporting_replica sync [--full]")
+        sys.exit(1)
+    if not firebase_config.firebase_available:
+        print("Firebase not available!")
+        sys.exit(1)
+    replica = ReportingReplica(lambda: firebase_config.db,
+                               os.environ.get('REPORTING_DB_PATH', 'techzone_reports.sqlite3'))
+    replica.expire()
+    print(replica.sync(full='--full' in sys.argv[2:]))
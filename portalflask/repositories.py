@@ -0,0 +1,315 @@
+"""
+Data access layer for TechZone Academy Student Management System
+One repository per collection (students, batches, trainer_files, messages,
+course_tracking, student_feedback, role_credentials) owns the queries, the
+availability check and the error handling, so the views never talk to Firestore
+directly. Records are plain dicts with the document ID under '_id'.
+
+Repositories work against whatever client firebase_config serves: Firestore,
+the emulator, or a local store selected with DATA_BACKEND (sqlite_store,
+fake_firestore). A failed read returns an empty result and a failed write
+returns False; both are logged under the repository's area.
+"""
+
+import functools
+
+from .batch_cascade import cascade_delete_batch
+from .bulk_writer import bulk_delete, bulk_write
+from .firebase_config import LazyCollection
+from .firestore_indexes import field_path
+from .log_config import get_logger
+
+
+def guarded(action, default=None):
+    """Return default (or default() if callable) when the data backend is unavailable or the call raises.
+
+    action names the operation in the error log; {noun} and {nouns} are filled in from the repository.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.available():
+                return default() if callable(default) else default
+            try:
+                return method(self, *args, **kwargs)
+            except Exception as e:
+                self.log.error("Error %s: %s", action.format(noun=self.noun, nouns=self.nouns), e)
+                return default() if callable(default) else default
+        return wrapper
+    return decorate
+
+
+def to_record(doc):
+    """A document snapshot as a dict with its ID under '_id'"""
+    record = doc.to_dict()
+    record['_id'] = doc.id
+    return record
+
+
+class Repository:
+    """Base repository: generic reads and writes on one collection"""
+
+    collection_name = None
+    log_area = 'firestore'
+    noun, nouns = 'document', 'documents'
+
+    def __init__(self, config):
+        self.config = config
+        self.collection = LazyCollection(config, self.collection_name)
+        self.log = get_logger(self.log_area)
+
+    def available(self):
+        return self.config.firebase_available
+
+    @staticmethod
+    def records(query, fields=None):
+        """Records of a query; with fields (plain names, quoted here), only those are read (fields=[]: IDs only)"""
+        if fields is not None:
+            query = query.select([field_path(field) for field in fields])
+        return [to_record(doc) for doc in query.stream()]
+
+    @guarded("getting {noun}", None)
+    def get(self, doc_id):
+        doc = self.collection.document(doc_id).get()
+        return to_record(doc) if doc.exists else None
+
+    @guarded("getting {nouns}", list)
+    def all(self, fields=None):
+        return self.records(self.collection, fields)
+
+    @guarded("querying {nouns}", list)
+    def find(self, field, value, limit=None):
+        query = self.collection.where(field, '==', value)
+        return self.records(query.limit(limit) if limit else query)
+
+    @guarded("adding {noun}", False)
+    def add(self, data):
+        self.collection.document().set(data)
+        return True
+
+    @guarded("updating {noun}", False)
+    def update(self, doc_id, data):
+        self.collection.document(doc_id).update(data)
+        return True
+
+    @guarded("deleting {noun}", False)
+    def delete(self, doc_id):
+        self.collection.document(doc_id).delete()
+        return True
+
+    @guarded("deleting {nouns}", 0)
+    def delete_many(self, doc_ids):
+        """Delete documents by ID with batched writes; returns the number deleted"""
+        return bulk_delete(self.config.db, [self.collection.document(doc_id) for doc_id in doc_ids])
+
+
+class StudentRepo(Repository):
+    collection_name = 'students'
+    log_area = 'students'
+    noun, nouns = 'student', 'students'
+
+    @guarded("finding student", None)
+    def find_one(self, field, value):
+        for doc in self.collection.where(field, '==', value).limit(1).stream():
+            return to_record(doc)
+        return None
+
+    def holders(self, field, value, limit=2):
+        """Document IDs of students whose field equals value (raises on backend errors)"""
+        return [doc.id for doc in self.collection.where(field, '==', value).select([]).limit(limit).stream()]
+
+    @guarded("getting students page", lambda: {'students': [], 'next_cursor': None, 'prev_cursor': None})
+    def page(self, batch_time=None, fees_status=None, page_size=50, after=None, before=None):
+        """One page of students filtered server-side, ordered by document ID.
+
+        Pass the 'next_cursor' of a page as after= to get the following page, or its
+        'prev_cursor' as before= to go back. Returns a dict with 'students',
+        'next_cursor' and 'prev_cursor' (None when there is no such page).
+        """
+        query = self.collection
+        if batch_time:
+            query = query.where('batch_time', '==', batch_time)
+        if fees_status:
+            query = query.where('fees_status', '==', fees_status)
+        # '__name__' orders by document ID, which gives a stable cursor without an extra index
+        query = query.order_by('__name__')
+        if before:
+            docs = list(query.end_before({'__name__': before}).limit_to_last(page_size + 1).get())
+            has_more_before = len(docs) > page_size
+            docs = docs[-page_size:]
+            has_more_after = True
+        else:
+            if after:
+                query = query.start_after({'__name__': after})
+            docs = list(query.limit(page_size + 1).stream())
+            has_more_after = len(docs) > page_size
+            docs = docs[:page_size]
+            has_more_before = bool(after)
+        return {
+            'students': [to_record(doc) for doc in docs],
+            'next_cursor': docs[-1].id if docs and has_more_after else None,
+            'prev_cursor': docs[0].id if docs and has_more_before else None,
+        }
+
+
+class BatchRepo(Repository):
+    collection_name = 'batches'
+    log_area = 'batches'
+    noun, nouns = 'batch', 'batches'
+
+    @guarded("deleting batch", None)
+    def delete_cascade(self, batch_id, bucket):
+        """Delete a batch with its students, files and messages (batch_cascade); returns the counts"""
+        return cascade_delete_batch(self.config.db, bucket, batch_id)
+
+
+class FileRepo(Repository):
+    collection_name = 'trainer_files'
+    log_area = 'files'
+    noun, nouns = 'trainer file', 'trainer files'
+
+    def __init__(self, config, bucket):
+        super().__init__(config)
+        self.bucket = bucket
+
+    @guarded("getting {nouns}", list)
+    def by_uploader(self, username):
+        return self.records(self.collection.where('uploaded_by', '==', username))
+
+    @guarded("getting trainer files by batch", list)
+    def by_batch(self, batch_id, fields=None):
+        # batch_id is stored as a string
+        return self.records(self.collection.where('batch_id', '==', str(batch_id)), fields)
+
+    # What is_orphaned reads; list views select these instead of the base64 copy
+    SOURCE_FIELDS = ['filename', 'has_base64_backup', 'uploaded_to_storage', 'storage_path']
+
+    def _in_storage(self, record):
+        if not (record.get('uploaded_to_storage') and self.bucket):
+            return False
+        filename = record.get('filename')
+        try:
+            return self.bucket.blob(record.get('storage_path', f"trainer_uploads/{filename}")).exists()
+        except Exception as e:
+            self.log.warning("Error checking storage for %s: %s", filename, e)
+            return False
+
+    def is_orphaned(self, record):
+        """True when a file record has neither a base64 copy nor a blob in Storage"""
+        if record.get('file_data_base64') or record.get('has_base64_backup'):
+            return False
+        if self._in_storage(record):
+            return False
+        if not {'file_data_base64', 'has_base64_backup'} & record.keys() and record.get('_id'):
+            # Read without its base64 copy and older than has_base64_backup: check the whole document
+            full = self.get(record['_id'])
+            return full is not None and not full.get('file_data_base64')
+        return True
+
+    @guarded("deleting {noun}", False)
+    def delete_upload(self, filename, uploaded_by):
+        """Delete a trainer's file records and its Storage blob"""
+        query = self.collection.where('filename', '==', filename).where('uploaded_by', '==', uploaded_by)
+        bulk_delete(self.config.db, [doc.reference for doc in query.select([]).stream()])
+        if self.bucket:
+            blob = self.bucket.blob(f"trainer_uploads/{filename}")
+            if blob.exists():
+                blob.delete()
+        return True
+
+
+class MessageRepo(Repository):
+    collection_name = 'messages'
+    log_area = 'messaging'
+    noun, nouns = 'message', 'messages'
+
+    @guarded("getting messages", list)
+    def for_batch(self, batch_id):
+        query = self.collection.where('batch_id', '==', batch_id).order_by('timestamp', direction='DESCENDING')
+        return self.records(query)
+
+    @guarded("marking messages as read", False)
+    def mark_read(self, student_id, batch_id):
+        """Add student_id to read_by on the batch's messages, in batched writes, skipping ones already read"""
+        from firebase_admin import firestore
+        docs = self.collection.where('batch_id', '==', batch_id).select(['read_by']).stream()
+        unread = (doc.reference for doc in docs if student_id not in (doc.to_dict().get('read_by') or []))
+        bulk_write(self.config.db, (('update', ref, {'read_by': firestore.ArrayUnion([student_id])}) for ref in unread))
+        return True
+
+
+class TrackingRepo(Repository):
+    collection_name = 'course_tracking'
+    log_area = 'tracking'
+    noun, nouns = 'course tracking record', 'course tracking records'
+
+    @guarded("loading course tracking data by trainer", list)
+    def by_trainer(self, trainer_name):
+        # Field names with spaces have to be backquoted in a Firestore field path
+        return self.records(self.collection.where(field_path('Trainer Name'), '==', trainer_name))
+
+    @guarded("loading course tracking page", lambda: ([], None))
+    def page(self, page_size=50, after=None):
+        """One page of records ordered by document ID, and the cursor of the next page (or None)"""
+        query = self.collection.order_by('__name__')
+        if after:
+            query = query.start_after({'__name__': after})
+        docs = list(query.limit(page_size + 1).stream())
+        next_cursor = docs[page_size - 1].id if len(docs) > page_size else None
+        return [to_record(doc) for doc in docs[:page_size]], next_cursor
+
+    def _nth(self, index):
+        """Reference of the index-th record in document ID order, or None (reads only that document's ID)"""
+        if index < 0:
+            return None
+        docs = list(self.collection.select([]).offset(index).limit(1).stream())
+        return docs[0].reference if docs else None
+
+    @guarded("editing course tracking record", False)
+    def update_nth(self, index, data):
+        doc_ref = self._nth(index)
+        if doc_ref is None:
+            return False
+        doc_ref.update(data)
+        return True
+
+    @guarded("deleting course tracking record", False)
+    def delete_nth(self, index):
+        doc_ref = self._nth(index)
+        if doc_ref is None:
+            return False
+        doc_ref.delete()
+        return True
+
+
+class FeedbackRepo(Repository):
+    collection_name = 'student_feedback'
+    log_area = 'students'
+    noun, nouns = 'student feedback', 'student feedback'
+
+    @guarded("getting student feedback", list)
+    def all(self, fields=None):
+        return self.records(self.collection.order_by('created_at', direction='DESCENDING'), fields)
+
+    @guarded("deleting all {nouns}", None)
+    def delete_all(self):
+        """Delete every feedback record with batched writes; returns the number deleted"""
+        # Only document references are needed, so skip reading any fields
+        return bulk_delete(self.config.db, [doc.reference for doc in self.collection.select([]).stream()])
+
+
+class CredentialRepo(Repository):
+    collection_name = 'role_credentials'
+    log_area = 'auth'
+    noun, nouns = 'role credential', 'role credentials'
+
+    @guarded("getting {nouns}", list)
+    def by_role(self, role):
+        return self.records(self.collection.where('role', '==', role))
+
+    @guarded("looking up role credential", None)
+    def find_login(self, username, role):
+        query = self.collection.where('username', '==', username).where('role', '==', role).limit(1)
+        for doc in query.stream():
+            return to_record(doc)
+        return None
@@ -0,0 +1,197 @@
+"""
+Server-side sessions for TechZone Academy Student Management System
+Keeps session data (login role, batch and student ids, OTP state) in SQLite or
+Redis so the browser only carries a random session id cookie.
+
+Configured with environment variables:
+  SESSION_BACKEND      sqlite (default), redis, or cookie (Flask's signed-cookie sessions)
+  SESSION_SQLITE_PATH  SQLite file shared by all workers on the host (default: techzone_sessions.sqlite3)
+  SESSION_REDIS_URL    redis://host:port/db, required for the redis backend (multi-instance deployments)
+"""
+
+import os
+import random
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from .log_config import get_logger
+
+log = get_logger('sessions')
+
+
+def _new_sid():
+    return secrets.token_urlsafe(32)
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its id and whether it changed during the request"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.replaced_sid = None
+
+    def regenerate(self):
+        """Move the session to a fresh id; the stored session under the old id is deleted on save"""
+        if not self.new and self.replaced_sid is None:
+            self.replaced_sid = self.sid
+        self.sid = _new_sid()
+        self.modified = True
+
+
+def regenerate_session(session):
+    """Clear the session and give it a new id (call at login and logout against session fixation).
+
+    Signed-cookie sessions carry no id, so clearing them is enough.
+    """
+    session.clear()
+    if isinstance(session, ServerSideSession):
+        session.regenerate()
+
+
+class SQLiteSessionBackend:
+    """Session storage in a local SQLite file, safe to share between gunicorn workers"""
+
+    PURGE_PROBABILITY = 0.01
+
+    def __init__(self, path):
+        # The file is opened (and the table created) by the first request of each thread,
+        # not at import time
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    "sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+            self._local.conn = conn
+        return conn
+
+    def load(self, sid):
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, sid, data, ttl_seconds):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)",
+                (sid, data, time.time() + ttl_seconds)
+            )
+            if random.random() < self.PURGE_PROBABILITY:
+                conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, sid):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class RedisSessionBackend:
+    """Session storage in Redis (or any Redis-protocol server) for multi-instance deployments"""
+
+    KEY_PREFIX = 'techzone:session:'
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+
+    def load(self, sid):
+        data = self._client.get(self.KEY_PREFIX + sid)
+        return data.decode('utf-8') if data is not None else None
+
+    def save(self, sid, data, ttl_seconds):
+        self._client.setex(self.KEY_PREFIX + sid, ttl_seconds, data)
+
+    def delete(self, sid):
+        self._client.delete(self.KEY_PREFIX + sid)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface that stores session data in a backend and only a session id in the cookie"""
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            try:
+                data = self.backend.load(sid)
+            except Exception as e:
+                log.error("Error loading session: %s", e)
+                data = None
+            if data is not None:
+                return ServerSideSession(self.serializer.loads(data), sid=sid)
+        return ServerSideSession(sid=_new_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if session.replaced_sid:
+            self.backend.delete(session.replaced_sid)
+
+        if not session:
+            if session.modified:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if not self.should_set_cookie(app, session):
+            return
+
+        ttl_seconds = int(app.permanent_session_lifetime.total_seconds())
+        self.backend.save(session.sid, self.serializer.dumps(dict(session)), ttl_seconds)
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def configure_session_store(app):
+    """Install the session backend selected by SESSION_BACKEND on the Flask app"""
+    backend_name = os.environ.get('SESSION_BACKEND', 'sqlite').lower()
+    if backend_name == 'cookie':
+        return
+    if backend_name == 'redis':
+        backend = RedisSessionBackend(os.environ['SESSION_REDIS_URL'])
+    elif backend_name == 'sqlite':
+        backend = SQLiteSessionBackend(os.environ.get('SESSION_SQLITE_PATH', 'techzone_sessions.sqlite3'))
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend_name}")
+    app.session_interface = ServerSideSessionInterface(backend)
+    log.info("Using %s server-side sessions", backend_name)
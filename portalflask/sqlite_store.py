@@ -0,0 +1,164 @@
+"""
+Local SQLite data backend for TechZone Academy Student Management System
+SQLiteFirestore and SQLiteBucket serve the same client API as the in-process
+fakes (fake_firestore), with documents and blobs kept in one SQLite file, so the
+whole app (ledger, analytics, cascades included) runs and can be load-tested
+offline with DATA_BACKEND=sqlite.
+
+Documents are stored as JSON, one row per document path, indexed by parent
+collection and by collection id (for collection group queries). Equality filters
+on string fields are pushed down to SQL with json_extract; every other part of
+a query is evaluated with the fake's Firestore semantics. Commits run in a
+BEGIN IMMEDIATE transaction, so writes from several gunicorn workers on the
+host serialize correctly; transactions are not isolated against concurrent readers.
+"""
+
+import base64
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from .fake_firestore import FakeBucket, FakeFirestore
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Cannot store {type(value).__name__} in the SQLite backend")
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        if '__date__' in obj:
+            return date.fromisoformat(obj['__date__'])
+        if '__bytes__' in obj:
+            return base64.b64decode(obj['__bytes__'])
+    return obj
+
+
+def _dumps(data):
+    return json.dumps(data, default=_encode, separators=(',', ':'))
+
+
+def _loads(text):
+    return json.loads(text, object_hook=_decode)
+
+
+def _json_path(field):
+    return '$' + ''.join('."' + part.strip('`').replace('"', '""') + '"' for part in field.split('.'))
+
+
+class SQLiteFile:
+    """Per-thread connections to one SQLite file (WAL, shared between workers)"""
+
+    def __init__(self, path, schema):
+        self.path = path
+        self._local = threading.local()
+        with self.connection() as conn:
+            conn.executescript(schema)
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class SQLiteFirestore(FakeFirestore):
+    """A Firestore-compatible client over documents stored in a SQLite file"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            path TEXT PRIMARY KEY, parent TEXT NOT NULL, collection_id TEXT NOT NULL, data TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS idx_documents_parent ON documents (parent, path);
+        CREATE INDEX IF NOT EXISTS idx_documents_collection_id ON documents (collection_id, path);
+    """
+
+    def __init__(self, path, rpc_latency=0.0):
+        super().__init__(rpc_latency=rpc_latency)
+        self._file = SQLiteFile(path, self.SCHEMA)
+
+    def _read(self, path):
+        row = self._file.connection().execute("SELECT data FROM documents WHERE path = ?", (path,)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def _scan(self, collection_path, group, equalities):
+        if group is not None:
+            sql, params = "SELECT path, data FROM documents WHERE collection_id = ?", [group]
+        else:
+            sql, params = "SELECT path, data FROM documents WHERE parent = ?", [collection_path]
+        for field, value in equalities:
+            if isinstance(value, str):
+                sql += " AND json_extract(data, ?) = ?"
+                params += [_json_path(field), value]
+        rows = self._file.connection().execute(sql + " ORDER BY path", params).fetchall()
+        return [(path, _loads(data)) for path, data in rows]
+
+    @contextmanager
+    def _write_transaction(self):
+        with self._lock:
+            conn = self._file.connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _store(self, pending):
+        conn = self._file.connection()
+        for path, data in pending.items():
+            if data is None:
+                conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+            else:
+                parent = path.rpartition('/')[0]
+                conn.execute("INSERT OR REPLACE INTO documents (path, parent, collection_id, data) VALUES (?, ?, ?, ?)",
+                             (path, parent, parent.rsplit('/', 1)[-1], _dumps(data)))
+
+    def collections(self):
+        rows = self._file.connection().execute(
+            "SELECT DISTINCT substr(path, 1, instr(path, '/') - 1) AS name FROM documents ORDER BY name").fetchall()
+        return [self.collection(name) for name, in rows]
+
+
+class SQLiteBucket(FakeBucket):
+    """A Storage bucket over blobs stored in a SQLite file"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blobs (name TEXT PRIMARY KEY, content_type TEXT, data BLOB NOT NULL);
+    """
+
+    def __init__(self, path, name='techzone-local', rpc_latency=0.0):
+        super().__init__(name=name, rpc_latency=rpc_latency)
+        self._file = SQLiteFile(path, self.SCHEMA)
+
+    def _load_blob(self, name):
+        row = self._file.connection().execute("SELECT data, content_type FROM blobs WHERE name = ?", (name,)).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+    def _save_blob(self, name, data, content_type):
+        self._file.connection().execute("INSERT OR REPLACE INTO blobs (name, content_type, data) VALUES (?, ?, ?)",
+                                        (name, content_type, sqlite3.Binary(data)))
+
+    def _remove_blob(self, name):
+        return self._file.connection().execute("DELETE FROM blobs WHERE name = ?", (name,)).rowcount > 0
+
+    def _blob_names(self, prefix=None):
+        if prefix:
+            rows = self._file.connection().execute(
+                "SELECT name FROM blobs WHERE substr(name, 1, ?) = ? ORDER BY name", (len(prefix), prefix)).fetchall()
+        else:
+            rows = self._file.connection().execute("SELECT name FROM blobs ORDER BY name").fetchall()
+        return [name for name, in rows]
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Bulk student import for TechZone Academy Student Management System
+Reads a CSV or XLSX roster with pandas, validates every row in one vectorized
+pass (required fields, email/phone format, fees, course initials, batch, and
+duplicates inside the file and against existing students), then writes the valid
+rows, with their fee ledgers, in batched Firestore commits. Returns a per-row
+error report.
+
+Usage:  python -m portalflask.student_import roster.xlsx [--dry-run]
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .batch_time import find_batch
+from .bulk_writer import bulk_write
+from .credentials import hash_password, is_password_hash
+from .fee_ledger import ledger_writes
+
+REQUIRED_COLUMNS = ['course_initials', 'student_name', 'student_number', 'email', 'course_name',
+                    'batch_time', 'total_fees', 'fees_paid', 'username', 'password']
+OPTIONAL_COLUMNS = ['due_fees', 'installments', 'fees_due_date', 'fees_status']
+UNIQUE_FIELDS = ['student_id', 'email', 'username']
+EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+HASH_WORKERS = 8
+
+
+def read_roster(source, filename):
+    """Read a roster file (path or file object) into a DataFrame of strings"""
+    import pandas as pd
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    elif extension in ('.xlsx', '.xls'):
+        try:
+            df = pd.read_excel(source, dtype=str, keep_default_na=False)
+        except ImportError:
+            raise ValueError("Reading Excel files requires openpyxl; install it or upload a CSV file")
+    else:
+        raise ValueError("Unsupported file type; upload a .csv or .xlsx file")
+    df.columns = [str(column).strip().lower().replace(' ', '_') for column in df.columns]
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    for column in OPTIONAL_COLUMNS:
+        if column not in df.columns:
+            df[column] = ''
+    return df[REQUIRED_COLUMNS + OPTIONAL_COLUMNS].apply(lambda column: column.str.strip())
+
+
+def existing_student_index(students_collection):
+    """{field: set of values} for the unique student fields, from one projected read"""
+    index = {field: set() for field in UNIQUE_FIELDS}
+    for doc in students_collection.select(UNIQUE_FIELDS).stream():
+        student = doc.to_dict()
+        index['student_id'].add(doc.id)
+        for field in UNIQUE_FIELDS:
+            if student.get(field):
+                index[field].add(student[field])
+    return index
+
+
+def validate_roster(df, existing, batches):
+    """Validate a roster DataFrame.
+
+    Returns (valid, errors): valid is a DataFrame of the rows that can be imported,
+    with parsed fees, student_id and batch_id filled in; errors maps the 1-based
+    spreadsheet row number (header is row 1) to a list of messages.
+    """
+    import pandas as pd
+    df = df.copy()
+    problems = pd.DataFrame(index=df.index)
+
+    def flag(mask, message):
+        problems[message] = mask
+
+    for column in REQUIRED_COLUMNS:
+        flag(df[column] == '', f"{column} is required")
+
+    df['course_initials'] = df['course_initials'].str.upper()
+    flag((df['course_initials'] != '') & ~df['course_initials'].str.fullmatch(r'[A-Z]{2,4}'),
+         "course_initials must be 2-4 letters")
+    flag((df['email'] != '') & ~df['email'].str.match(EMAIL_PATTERN), "email is not valid")
+    flag((df['student_number'] != '') & ~df['student_number'].str.fullmatch(r'\d{10}'),
+         "student_number must be 10 digits")
+
+    for column in ('total_fees', 'fees_paid', 'due_fees'):
+        df[column] = pd.to_numeric(df[column].str.replace(',', ''), errors='coerce')
+    flag(problems['total_fees is required'].eq(False) & df['total_fees'].isna(), "total_fees must be a number")
+    flag(problems['fees_paid is required'].eq(False) & df['fees_paid'].isna(), "fees_paid must be a number")
+    flag((df['total_fees'] < 0) | (df['fees_paid'] < 0), "fees cannot be negative")
+    flag(df['fees_paid'] > df['total_fees'], "fees_paid exceeds total_fees")
+    df['due_fees'] = df['due_fees'].fillna(df['total_fees'] - df['fees_paid'])
+    df['fees_status'] = df['fees_status'].where(df['fees_status'] != '',
+                                                df['due_fees'].le(0).map({True: 'Paid', False: 'Unpaid'}))
+    flag(~df['fees_status'].isin(['Paid', 'Unpaid']), "fees_status must be Paid or Unpaid")
+    df['installments'] = df['installments'].where(df['installments'] != '', 'NAN')
+    df['fees_due_date'] = df['fees_due_date'].where(df['fees_due_date'] != '', 'NAN')
+
+    # Each distinct batch string is resolved against the catalog once
+    batch_ids = {}
+    for batch_time in df['batch_time'].unique():
+        batch = find_batch(batch_time, batches)
+        batch_ids[batch_time] = batch['_id'] if batch else None
+    df['batch_id'] = df['batch_time'].map(batch_ids)
+    flag((df['batch_time'] != '') & df['batch_id'].isna(), "batch_time does not match any batch")
+
+    df['student_id'] = df['course_initials'] + ' ' + df['student_number']
+    for field in UNIQUE_FIELDS:
+        present = df[field] != ''
+        flag(present & df[field].duplicated(keep=False), f"{field} appears more than once in the file")
+        flag(present & df[field].isin(existing.get(field, set())), f"{field} already exists")
+
+    failed = problems.any(axis=1)
+    errors = {}
+    for index, row in problems[failed].iterrows():
+        errors[int(index) + 2] = [message for message, bad in row.items() if bad]
+    return df[~failed], errors
+
+
+def import_students(students_collection, db, df, batches, dry_run=False, on_imported=None):
+    """Validate a roster and write its valid rows; invalid rows are skipped and reported.
+
+    on_imported(doc_id, student_data), if given, is called for every written student.
+    Returns {'total', 'imported', 'failed', 'errors': [{'row', 'student_name', 'errors'}]}.
+    """
+    valid, errors = validate_roster(df, existing_student_index(students_collection), batches)
+    report = {
+        'total': len(df),
+        'imported': 0,
+        'failed': len(errors),
+        'errors': [{'row': row, 'student_name': df.loc[row - 2, 'student_name'], 'errors': messages}
+                   for row, messages in sorted(errors.items())],
+    }
+    if dry_run or valid.empty:
+        return report
+
+    now = datetime.now()
+    records = valid.to_dict('records')
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+        hashed = list(executor.map(
+            lambda password: password if is_password_hash(password) else hash_password(password),
+            (record['password'] for record in records)))
+    students = []
+    for record, password in zip(records, hashed):
+        record.update({
+            'password': password,
+            'total_fees': float(record['total_fees']),
+            'fees_paid': float(record['fees_paid']),
+            'due_fees': float(record['due_fees']),
+            'created_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'updated_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'enrollment_date': now.strftime('%d-%m-%Y'),
+            'enrollment_time': now.strftime('%I:%M %p'),
+        })
+        students.append(record)
+
+    def writes():
+        # Each student's ledger goes into the same batched commits instead of a round trip per student
+        for student in students:
+            doc_ref = students_collection.document(student['student_id'])
+            ledger, summary = ledger_writes(doc_ref, student, today=now.date())
+            student.update(summary)
+            yield 'set', doc_ref, student
+            yield from ledger
+
+    bulk_write(db, writes())
+    report['imported'] = len(students)
+    if on_imported:
+        for student in students:
+            on_imported(student['student_id'], student)
+    return report
+
+
+if __name__ == "__main__":
+    from .firebase_config import firebase_config
+
+    args = [arg for arg in sys.argv[1:] if arg != '--dry-run']
+    if len(args) != 1:
+        print("Usage: python -m portalflask.student_import roster.csv|roster.xlsx [--dry-run]")
+        sys.exit(1)
+    if not firebase_config.firebase_available:
+        print("Firebase not available!")
+        sys.exit(1)
+    db = firebase_config.db
+    batches = [dict(doc.to_dict(), _id=doc.id) for doc in db.collection('batches').stream()]
+    try:
+        roster = read_roster(args[0], args[0])
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    result = import_students(db.collection('students'), db, roster, batches, dry_run='--dry-run' in sys.argv)
+    for error in result['errors']:
+        print(f"Row {error['row']} ({error['student_name']}): {'; '.join(error['errors'])}")
+    print(f"{result['imported']} imported, {result['failed']} rejected, {result['total']} rows")
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+In-process student search for TechZone Academy Student Management System
+Indexes normalized name, phone, email and student ID with a trigram inverted
+index (substring and fuzzy matches, e.g. the last digits of a phone number) plus a
+one/two-character prefix index for very short queries. The index is built from
+the student list, kept current by add/update/delete hooks and rebuilt
+periodically so writes made by other workers are picked up. Rebuilds run on a
+background thread and are swapped in whole, so searches never wait behind one
+(except the very first).
+
+Micro-benchmark:  python -m portalflask.student_search
+"""
+
+import bisect
+import math
+import re
+import threading
+import time
+
+from .log_config import get_logger
+
+SEARCH_FIELDS = ('student_name', 'student_number', 'email', 'student_id')
+RESULT_FIELDS = ('student_id', 'student_name', 'student_number', 'email', 'batch_time')
+# Above this many matches only the alphabetically first few are ranked in full
+RANK_WINDOW = 1000
+
+log = get_logger('students')
+
+_NON_ALNUM = re.compile(r'[^0-9a-z@.]+')
+
+
+def normalize(text):
+    """Lowercase and collapse everything except letters, digits, '@' and '.' to single spaces"""
+    return _NON_ALNUM.sub(' ', str(text or '').lower()).strip()
+
+
+def _trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class _IndexData:
+    """One generation of the index: trigram and prefix postings, summaries and the name order"""
+
+    def __init__(self):
+        self.records = {}
+        self.haystacks = {}
+        self.names = {}
+        self.student_ids = {}  # normalized student_id -> doc_id
+        self.ordered = []  # (normalized name, doc_id), kept sorted for ranking large result sets
+        self.grams = {}
+        self.prefixes = {}
+
+    @classmethod
+    def build(cls, students):
+        """Index every student, sorting the name order once at the end"""
+        data = cls()
+        for student in students:
+            data.add(student['_id'], student, keep_order=False)
+        data.ordered.sort()
+        return data
+
+    @staticmethod
+    def _terms(record):
+        terms = set()
+        for field in SEARCH_FIELDS:
+            value = normalize(record.get(field))
+            terms.update(value.split())
+            if field == 'student_number':
+                # Phone numbers are matched on their digits, whatever the formatting
+                terms.add(re.sub(r'\D', '', value))
+        terms.discard('')
+        return terms
+
+    def add(self, doc_id, record, keep_order=True):
+        terms = self._terms(record)
+        self.records[doc_id] = {field: record.get(field) for field in RESULT_FIELDS}
+        self.haystacks[doc_id] = ' '.join(sorted(terms))
+        self.names[doc_id] = normalize(record.get('student_name'))
+        self.student_ids[normalize(record.get('student_id'))] = doc_id
+        if keep_order:
+            bisect.insort(self.ordered, (self.names[doc_id], doc_id))
+        else:
+            self.ordered.append((self.names[doc_id], doc_id))
+        for term in terms:
+            for gram in _trigrams(term):
+                self.grams.setdefault(gram, set()).add(doc_id)
+            for length in (1, 2):
+                if len(term) >= length:
+                    self.prefixes.setdefault(term[:length], set()).add(doc_id)
+
+    def discard(self, doc_id):
+        haystack = self.haystacks.pop(doc_id, None)
+        record = self.records.pop(doc_id, None) or {}
+        if self.student_ids.get(normalize(record.get('student_id'))) == doc_id:
+            del self.student_ids[normalize(record.get('student_id'))]
+        name = self.names.pop(doc_id, None)
+        if haystack is None:
+            return
+        position = bisect.bisect_left(self.ordered, (name, doc_id))
+        if position < len(self.ordered) and self.ordered[position] == (name, doc_id):
+            del self.ordered[position]
+        for term in haystack.split():
+            for gram in _trigrams(term):
+                postings = self.grams.get(gram)
+                if postings is not None:
+                    postings.discard(doc_id)
+            for length in (1, 2):
+                postings = self.prefixes.get(term[:length])
+                if postings is not None:
+                    postings.discard(doc_id)
+
+    def upsert(self, doc_id, fields):
+        record = dict(self.records.get(doc_id, {}))
+        record.update(fields)
+        self.discard(doc_id)
+        self.add(doc_id, record)
+
+
+class StudentSearchIndex:
+    """Trigram + short-prefix inverted index over student records.
+
+    Rebuilds load and index the students on a background thread, without the
+    lock; searches keep using the current index until the new one is swapped in.
+    Only the very first search waits for a build.
+    """
+
+    def __init__(self, loader, rebuild_seconds=600, fuzzy_ratio=0.6, first_build_timeout=30):
+        self._loader = loader
+        self._rebuild_seconds = rebuild_seconds
+        self._fuzzy_ratio = fuzzy_ratio
+        self._first_build_timeout = first_build_timeout
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._data = None
+        self._built_at = None
+        self._stale = False
+        self._rebuilding = False
+        self._pending = None  # upserts/removes made while a rebuild is loading, replayed onto it
+        self._first_build = threading.Event()
+
+    # ----- maintenance -----
+    def rebuild(self):
+        """Rebuild the whole index from the loader now (searches keep using the current index meanwhile)"""
+        with self._rebuild_lock:
+            with self._lock:
+                self._pending = []
+            try:
+                data = _IndexData.build(self._loader())
+            except BaseException:
+                with self._lock:
+                    self._pending = None
+                raise
+            with self._lock:
+                for doc_id, fields in self._pending:
+                    if fields is None:
+                        data.discard(doc_id)
+                    else:
+                        data.upsert(doc_id, fields)
+                self._pending = None
+                self._data = data
+                self._built_at = time.monotonic()
+                self._stale = False
+        self._first_build.set()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            log.error("Student search index rebuild failed: %s", e)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+            # Let a waiting first search go ahead (with no results) instead of hanging on a failed build
+            self._first_build.set()
+
+    def _current(self):
+        """The index to search, starting a background rebuild when it is missing, stale or expired"""
+        with self._lock:
+            expired = self._stale or self._built_at is None or \
+                time.monotonic() - self._built_at > self._rebuild_seconds
+            if expired and not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(target=self._rebuild_in_background, name='student-search-rebuild',
+                                 daemon=True).start()
+            if self._data is not None:
+                return self._data
+        self._first_build.wait(self._first_build_timeout)
+        with self._lock:
+            return self._data
+
+    def invalidate(self):
+        """Rebuild in the background on the next search (e.g. after a bulk change)"""
+        with self._lock:
+            self._stale = True
+
+    def _apply(self, doc_id, fields):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((doc_id, fields))
+            if self._data is None:
+                return
+            if fields is None:
+                self._data.discard(doc_id)
+            else:
+                self._data.upsert(doc_id, fields)
+
+    def upsert(self, doc_id, fields):
+        """Add a student, or merge changed fields into an indexed one"""
+        self._apply(doc_id, dict(fields))
+
+    def remove(self, doc_id):
+        self._apply(doc_id, None)
+
+    # ----- queries -----
+    def _match_term(self, data, term):
+        if len(term) < 3:
+            # Prefixes of length 1 and 2 are indexed exactly
+            return data.prefixes.get(term, set())
+        grams = _trigrams(term)
+        postings = sorted((data.grams.get(gram, set()) for gram in grams), key=len)
+        candidates = set.intersection(*postings) if postings[0] else set()
+        if len(term) == 3:
+            # A single trigram posting is already an exact substring match
+            exact = candidates
+        else:
+            exact = {doc_id for doc_id in candidates if term in data.haystacks[doc_id]}
+        if exact:
+            return exact
+        # Fuzzy fallback: enough shared trigrams to tolerate a typo or two. A document with
+        # `needed` of the grams must appear in one of the len(grams) - needed + 1 rarest postings.
+        needed = max(1, math.ceil(len(grams) * self._fuzzy_ratio))
+        candidates = set().union(*postings[:len(grams) - needed + 1])
+        return {doc_id for doc_id in candidates
+                if sum(doc_id in posting for posting in postings) >= needed}
+
+    def search(self, query, limit=20):
+        """Return up to limit matching student summaries, best matches first"""
+        terms = normalize(query).split()
+        if not terms:
+            return []
+        data = self._current()
+        if data is None:
+            return []
+        with self._lock:
+            matches = None
+            for term in terms:
+                term_matches = self._match_term(data, term)
+                matches = term_matches if matches is None else matches & term_matches
+                if not matches:
+                    return []
+            query_text = normalize(query)
+            exact_id = data.student_ids.get(query_text)
+            if len(matches) > RANK_WINDOW:
+                # Broad query: rank only the alphabetically first matches (plus an exact ID hit)
+                window = [exact_id] if exact_id in matches else []
+                for _, doc_id in data.ordered:
+                    if doc_id in matches:
+                        window.append(doc_id)
+                        if len(window) >= limit * 5:
+                            break
+                matches = set(window)
+
+            def rank(doc_id):
+                name = data.names[doc_id]
+                return (
+                    doc_id != exact_id,
+                    not name.startswith(query_text),
+                    query_text not in data.haystacks[doc_id],
+                    name,
+                )
+
+            return [dict(data.records[doc_id], _id=doc_id) for doc_id in sorted(matches, key=rank)[:limit]]
+
+
+if __name__ == "__main__":
+    import random
+
+    first_names = ['Aarav', 'Priya', 'Rahul', 'Sneha', 'Vikram', 'Ananya', 'Karthik', 'Divya', 'Arjun', 'Meera']
+    last_names = ['Reddy', 'Sharma', 'Khan', 'Iyer', 'Patel', 'Rao', 'Naidu', 'Gupta', 'Verma', 'Das']
+    rng = random.Random(7)
+    students = []
+    for i in range(30000):
+        phone = f"9{rng.randint(100000000, 999999999)}"
+        name = f"{rng.choice(first_names)} {rng.choice(last_names)}"
+        students.append({
+            '_id': f"MDA {phone}", 'student_id': f"MDA {phone}", 'student_name': name,
+            'student_number': phone, 'email': f"{name.split()[0].lower()}{i}@example.com",
+        })
+
+    index = StudentSearchIndex(lambda: students)
+    start = time.perf_counter()
+    index.rebuild()
+    print(f"Built index over {len(students)} students in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for query in ['pri', 'priya red', students[123]['student_number'][-4:], 'karthk', 'mda 9', 'a']:
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            results = index.search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{query!r:<14} {len(results):>3} results, median {sorted(timings)[10]:.2f} ms")
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Role logins against the cached credential index: a password changed or an
+account deleted through another worker's AuthService stops working at once.
+"""
+
+from portalflask.auth_service import AuthService
+from portalflask.credentials import hash_password
+from portalflask.fake_firestore import FakeFirestore
+
+
+def test_credential_changes_apply_across_workers():
+    credentials = FakeFirestore().collection('role_credentials')
+    credentials.document('admin1').set({'username': 'asha', 'role': 'Admin', 'password': hash_password('old')})
+    worker_a, worker_b = AuthService(credentials), AuthService(credentials)
+    assert worker_a.verify_role_login('asha', 'old', 'Admin')
+    assert worker_b.verify_role_login('asha', 'old', 'Admin')
+
+    # Worker A changes the password; worker B's index is still cached
+    credentials.document('admin1').update({'password': hash_password('new')})
+    worker_a.invalidate()
+    assert not worker_b.verify_role_login('asha', 'old', 'Admin')
+    assert worker_b.verify_role_login('asha', 'new', 'Admin')
+
+    credentials.document('admin1').delete()
+    worker_a.invalidate()
+    assert not worker_b.verify_role_login('asha', 'new', 'Admin')
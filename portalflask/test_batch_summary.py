@@ -1,45 +1,108 @@
 #!/usr/bin/env python3
+"""
+Batch summary (students, paid and unpaid per batch) over a seeded in-process
+Firestore (fake_firestore). Run as a script to print the summary from live data.
+"""
 
-from AI_firebase import get_all_batches, get_all_students
+import os
+import tempfile
+from datetime import datetime
 
-def test_batch_summary():
-    batches = get_all_batches()
-    students = get_all_students()
-    
-    print(f"Found {len(batches)} batches and {len(students)} students")
-    
+os.environ.setdefault('SESSION_SQLITE_PATH', os.path.join(tempfile.mkdtemp(), 'sessions.sqlite3'))
+
+
+def summarize_batches(batches, students):
     batch_summary = []
     for batch in batches:
         batch_id = batch['_id']
         batch_display_name = f"{batch.get('batch_name', 'Unknown')} ({batch.get('start_time', 'Unknown')}-{batch.get('end_time', 'Unknown')}) ({batch.get('batch_start_date', 'Unknown')})"
-        
+
         # Count students in this batch
         batch_students = [s for s in students if s.get('batch_id') == batch_id]
         total_students = len(batch_students)
-        
+
         # Count paid and unpaid students
         paid_students = len([s for s in batch_students if s.get('fees_status') == 'Paid'])
         unpaid_students = total_students - paid_students
-        
+
         batch_summary.append({
             'batch_name': batch_display_name,
             'total_students': total_students,
             'paid_students': paid_students,
             'unpaid_students': unpaid_students
         })
-    
+
     # Sort batch summary by batch name
     batch_summary.sort(key=lambda x: x['batch_name'])
-    
+    return batch_summary
+
+
+def print_batch_summary(batch_summary):
     print("\nBatch Summary:")
     print("-" * 100)
     print(f"{'Batch Name':<50} {'Total':<10} {'Paid':<10} {'Unpaid':<10}")
     print("-" * 100)
-    
+
     for batch in batch_summary:
         print(f"{batch['batch_name']:<50} {batch['total_students']:<10} {batch['paid_students']:<10} {batch['unpaid_students']:<10}")
-    
-    return batch_summary
+
+
+def test_batch_summary():
+    from portalflask.bench_app import seed_academy
+    from portalflask.fake_firestore import FakeFirestore
+    from portalflask.firebase_config import firebase_config
+
+    db = FakeFirestore()
+    seed_academy(db, batches=4, students=42, tracking=0, files=0, messages=0, feedback=0)
+    firebase_config.use_clients(db)
+    from portalflask.AI_firebase import get_all_batches, get_all_students
+
+    batches = get_all_batches()
+    students = get_all_students()
+    batch_summary = summarize_batches(batches, students)
+
+    assert len(batch_summary) == 4
+    assert sum(batch['total_students'] for batch in batch_summary) == 42
+    assert sorted(batch['total_students'] for batch in batch_summary) == [10, 10, 11, 11]
+    paid = sum(1 for doc in db.collection('students').where('fees_status', '==', 'Paid').stream())
+    assert sum(batch['paid_students'] for batch in batch_summary) == paid
+    for batch in batch_summary:
+        assert batch['paid_students'] + batch['unpaid_students'] == batch['total_students']
+
+
+def test_reporting_replica_matches_firestore(tmp_path):
+    from portalflask.bench_app import seed_academy
+    from portalflask.fake_firestore import FakeFirestore
+    from portalflask.reporting_replica import ReportingReplica
+
+    db = FakeFirestore()
+    seed_academy(db, batches=4, students=42, tracking=30, files=0, messages=0, feedback=5)
+    replica = ReportingReplica(lambda: db, str(tmp_path / 'reports.sqlite3'))
+    batches = [dict(doc.to_dict(), _id=doc.id) for doc in db.collection('batches').stream()]
+    students = [doc.to_dict() for doc in db.collection('students').stream()]
+
+    counts = replica.batch_counts()
+    for batch in batches:
+        batch_students = [s for s in students if s.get('batch_id') == batch['_id']]
+        assert counts[batch['_id']] == {'total_students': len(batch_students),
+                                        'paid_students': len([s for s in batch_students if s.get('fees_status') == 'Paid'])}
+    assert len(replica.tracking_frame()) == 30 and len(replica.batches()) == 4
+
+    # New writes show up after an incremental sync (even when backdated), deletions after the forced rebuild
+    db.collection('students').document('NEW1').set({'batch_id': batches[0]['_id'], 'fees_status': 'Paid',
+                                                     'total_fees': 100.0, 'created_at': '2020-01-06 09:00:00',
+                                                     'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+    replica.expire()
+    assert replica.student_totals()['students'] == 43
+    db.collection('students').document('NEW1').delete()
+    replica.invalidate()
+    assert replica.student_totals()['students'] == 42
+
 
 if __name__ == "__main__":
-    test_batch_summary()
+    from portalflask.AI_firebase import get_all_batches, get_all_students
+
+    batches = get_all_batches()
+    students = get_all_students()
+    print(f"Found {len(batches)} batches and {len(students)} students")
+    print_batch_summary(summarize_batches(batches, students))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Property tests for the batch_time parser over a seeded random corpus.
+Micro-benchmark:  python -m portalflask.test_batch_time
+"""
+
+import random
+import string
+
+from portalflask.batch_time import BatchTime, display_name, format_batch_date, parse_batch_time, resolve_batch_time
+
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+NAME_CHARS = string.ascii_letters + string.digits + ' &.+-'
+
+
+def random_batch(rng):
+    """A random batch as (expected BatchTime, current display string, older display string)"""
+    name = (rng.choice(string.ascii_letters) + ''.join(rng.choice(NAME_CHARS) for _ in range(rng.randint(0, 30)))).strip()
+    start_hour = rng.randint(1, 12)
+    start = f"{start_hour}:{rng.choice(['00', '15', '30', '45'])}"
+    end = f"{start_hour % 12 + 1}:{rng.choice(['00', '30'])}"
+    date = f"{rng.randint(1, 28):02d}-{rng.choice(MONTHS)}-{rng.randint(2023, 2027)}"
+    expected = BatchTime(name, start, end, date)
+    return expected, f"{name} ({start})-({end}) ({date})", f"{name} ({date}) ({start}-{end})"
+
+
+def corpus(size=500, seed=35):
+    rng = random.Random(seed)
+    return [random_batch(rng) for _ in range(size)]
+
+
+def test_current_format_round_trips():
+    for expected, current, _ in corpus():
+        assert parse_batch_time(current) == expected, current
+
+
+def test_older_format_round_trips():
+    for expected, _, older in corpus():
+        assert parse_batch_time(older) == expected, older
+
+
+def test_lowercase_dates_are_normalized():
+    for expected, current, _ in corpus(50):
+        assert parse_batch_time(current.replace(expected.start_date, expected.start_date.lower())) == expected
+
+
+def test_arbitrary_input_never_raises():
+    rng = random.Random(350)
+    alphabet = string.printable + '()-'
+    for _ in range(2000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        parsed = parse_batch_time(text)
+        assert isinstance(parsed, BatchTime)
+    assert parse_batch_time(None) == BatchTime(None, None, None, None)
+    assert parse_batch_time('') == BatchTime(None, None, None, None)
+
+
+def test_plain_name_keeps_only_the_name():
+    assert parse_batch_time('Prompt Engineering') == BatchTime('Prompt Engineering', None, None, None)
+    assert parse_batch_time('Prompt Engineering (Unknown)') == BatchTime('Prompt Engineering', None, None, None)
+
+
+def test_missing_parts_resolve_from_catalog():
+    batches = [
+        {'_id': 'b1', 'batch_name': 'Data Science', 'start_time': '6:00', 'end_time': '7:00', 'batch_start_date': '2025-08-01'},
+        {'_id': 'b2', 'batch_name': 'prompt_eng', 'original_batch_name': 'Prompt Engineering',
+         'start_time': '4:00', 'end_time': '5:00', 'batch_start_date': ''},
+    ]
+    assert display_name(batches[0]) == 'Data Science (6:00)-(7:00) (01-AUG-2025)'
+    assert display_name(batches[1]) == 'Prompt Engineering (4:00)-(5:00) (Unknown)'
+    assert resolve_batch_time('Data Science', batches) == BatchTime('Data Science', '6:00', '7:00', '01-AUG-2025')
+    assert resolve_batch_time(display_name(batches[1]), batches) == BatchTime('Prompt Engineering', '4:00', '5:00', None)
+    assert resolve_batch_time('Unknown Batch', batches) == BatchTime('Unknown Batch', None, None, None)
+
+
+def test_format_batch_date():
+    assert format_batch_date('2025-08-01') == '01-AUG-2025'
+    assert format_batch_date('01-AUG-2025') == '01-AUG-2025'
+    assert format_batch_date(None) is None
+
+
+if __name__ == "__main__":
+    import timeit
+
+    texts = [current for _, current, _ in corpus(1000)]
+    parse_batch_time.cache_clear()
+    cold = timeit.timeit(lambda: [parse_batch_time.__wrapped__(text) for text in texts], number=20) / (20 * len(texts))
+    [parse_batch_time(text) for text in texts]
+    warm = timeit.timeit(lambda: [parse_batch_time(text) for text in texts], number=20) / (20 * len(texts))
+    print(f"parse (uncached): {cold * 1e6:.2f} us/call")
+    print(f"parse (memoized): {warm * 1e6:.2f} us/call")
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Password verification: scrypt hashes, and legacy stored values (including
+numeric passwords imported from spreadsheets) that are rehashed on login.
+"""
+
+from portalflask.credentials import hash_password, verify_password
+
+
+def test_scrypt_hash_round_trip():
+    stored = hash_password('s3cret')
+    assert verify_password('s3cret', stored) == (True, False)
+    assert verify_password('wrong', stored) == (False, False)
+
+
+def test_numeric_legacy_password():
+    assert verify_password('12345', 12345) == (True, True)
+    assert verify_password('12345', 12345.0) == (True, True)
+    assert verify_password('54321', 12345) == (False, True)
+    assert verify_password('12345', ['12345']) == (False, False)
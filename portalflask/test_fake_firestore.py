@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Query semantics of the in-process Firestore fake, checked where the app relies
+on them: default and explicit ordering, cursor pagination, projections,
+collection groups, atomic batches and firestore.transactional.
+"""
+
+import pytest
+
+from portalflask.fake_firestore import FakeBucket, FakeFirestore, NotFound
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    students = db.collection('students')
+    for number, (batch_id, fees) in enumerate([('b1', 300), ('b2', 100), ('b1', 200), ('b2', None)]):
+        students.document(f"s{number}").set({'batch_id': batch_id, 'total_fees': fees, 'name': f"Student {number}"})
+    return db
+
+
+def test_default_order_is_document_id_and_order_by_skips_missing_fields(db):
+    assert [doc.id for doc in db.collection('students').stream()] == ['s0', 's1', 's2', 's3']
+    by_fees = db.collection('students').order_by('total_fees', direction='DESCENDING').stream()
+    assert [doc.id for doc in by_fees] == ['s0', 's2', 's1', 's3']
+    ranged = db.collection('students').where('total_fees', '>=', 150).stream()
+    assert [doc.id for doc in ranged] == ['s2', 's0']
+
+
+def test_cursor_pagination_by_document_id(db):
+    query = db.collection('students').order_by('__name__').limit(3)
+    first = [doc.id for doc in query.stream()]
+    second = [doc.id for doc in query.start_after({'__name__': first[-1]}).stream()]
+    assert first == ['s0', 's1', 's2'] and second == ['s3']
+
+
+def test_select_and_reads(db):
+    db.reset_stats()
+    docs = list(db.collection('students').where('batch_id', '==', 'b1').select(['name']).stream())
+    assert [doc.to_dict() for doc in docs] == [{'name': 'Student 0'}, {'name': 'Student 2'}]
+    assert db.stats == {'calls': 1, 'reads': 2, 'writes': 0}
+
+
+def test_field_paths_are_parsed_like_the_client(db):
+    db.collection('tracking').document('t1').set({'Trainer Name': 'A'})
+    for build in (lambda q: q.select(['Trainer Name']), lambda q: q.where('Trainer Name', '==', 'A'),
+                  lambda q: q.order_by('Trainer Name'), lambda q: q.where(filter=('name', '==', 'A'))):
+        with pytest.raises(ValueError):
+            build(db.collection('tracking'))
+    docs = db.collection('tracking').where('`Trainer Name`', '==', 'A').select(['`Trainer Name`']).stream()
+    assert [doc.to_dict() for doc in docs] == [{'Trainer Name': 'A'}]
+
+
+def test_collection_group_and_failed_batch_is_atomic(db):
+    db.collection('students').document('s0').collection('payments').document('p1').set({'kind': 'payment'})
+    db.collection('students').document('s1').collection('payments').document('p2').set({'kind': 'installment'})
+    payments = db.collection_group('payments').where('kind', '==', 'payment').stream()
+    assert [doc.reference.path for doc in payments] == ['students/s0/payments/p1']
+
+    batch = db.batch()
+    batch.update(db.collection('students').document('s0'), {'name': 'Changed'})
+    batch.update(db.collection('students').document('missing'), {'name': 'x'})
+    with pytest.raises(NotFound):
+        batch.commit()
+    assert db.collection('students').document('s0').get().to_dict()['name'] == 'Student 0'
+
+
+def test_transactional_counter():
+    pytest.importorskip('firebase_admin.firestore')
+    from portalflask.id_counters import next_sequence
+
+    db = FakeFirestore()
+    db.collection('students').document('PE003').set({'course_initials': 'PE', 'student_id': 'PE003 (4:00)'})
+    assert [next_sequence(db, 'PE') for _ in range(3)] == [4, 5, 6]
+
+
+def test_bucket_round_trip():
+    bucket = FakeBucket()
+    bucket.blob('trainer_uploads/a.pdf').upload_from_string(b'%PDF', content_type='application/pdf')
+    assert bucket.blob('trainer_uploads/a.pdf').download_as_bytes() == b'%PDF'
+    assert [blob.name for blob in bucket.list_blobs(prefix='trainer_uploads/')] == ['trainer_uploads/a.pdf']
+    assert not bucket.blob('missing').exists()
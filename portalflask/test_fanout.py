@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Concurrent reads (fanout.gather): results come back in call order, calls made
+in the pool are counted against the request's stats, one gather() runs at most
+FANOUT_PER_REQUEST calls at once, and a call that misses the request deadline
+yields its default.
+"""
+
+import threading
+import time
+
+from portalflask import fanout
+from portalflask.instrumentation import RequestStats, _current_stats, current_stats, record
+
+
+def test_gather_runs_concurrently_in_request_context():
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    barrier = threading.Barrier(3, timeout=5)
+
+    def read(value):
+        def call():
+            barrier.wait()  # only returns once all three calls are running at the same time
+            record('firestore', 'stream', 'students', 0.001, documents=value)
+            assert current_stats() is stats
+            return value
+        return call
+
+    try:
+        assert fanout.gather(read(1), read(2), read(3)) == [1, 2, 3]
+    finally:
+        _current_stats.reset(token)
+    assert stats.totals('firestore')[0] == 3 and stats.totals('firestore')[2] == 6
+
+
+def test_gather_honours_deadline(monkeypatch):
+    monkeypatch.setattr(fanout, 'deadline', lambda: time.perf_counter() + 0.05)
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return 'late'
+
+    try:
+        assert fanout.gather(lambda: 'fast', slow, defaults=(None, [])) == ['fast', []]
+    finally:
+        release.set()
+
+
+def test_gather_caps_calls_per_request(monkeypatch):
+    monkeypatch.setattr(fanout, 'FANOUT_PER_REQUEST', 2)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def read(value):
+        def call():
+            with lock:
+                running.append(value)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(value)
+            return value
+        return call
+
+    assert fanout.gather(*[read(i) for i in range(6)]) == list(range(6))
+    assert max(peak) == 2
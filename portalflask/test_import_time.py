@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the web app, measured with `python -X importtime`.
+Worker boot must not pull in pandas or the Firestore client, and must stay under
+IMPORT_TIME_BUDGET_MS (default 1000 ms) for the whole portalflask.AI_firebase import.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', '1000'))
+DEFERRED_MODULES = ('pandas', 'numpy', 'firebase_admin.firestore', 'firebase_admin.storage', 'google.cloud.firestore')
+
+
+def measure_import():
+    """{module: cumulative microseconds} for a fresh `import portalflask.AI_firebase`"""
+    env = dict(os.environ, SESSION_SQLITE_PATH=os.path.join(tempfile.mkdtemp(), 'sessions.sqlite3'))
+    env.pop('FIREBASE_CONFIG', None)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import portalflask.AI_firebase'],
+                            cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        timings[module.strip()] = int(cumulative)
+    return timings
+
+
+def test_heavy_modules_are_deferred():
+    timings = measure_import()
+    loaded = [module for module in DEFERRED_MODULES if module in timings]
+    assert not loaded, f"imported at boot: {loaded}"
+
+
+def test_import_time_budget():
+    timings = measure_import()
+    elapsed_ms = timings['portalflask.AI_firebase'] / 1000
+    assert elapsed_ms < BUDGET_MS, f"portalflask.AI_firebase took {elapsed_ms:.0f} ms (budget {BUDGET_MS} ms)"
+
+
+if __name__ == "__main__":
+    timings = measure_import()
+    for module, cumulative in sorted(timings.items(), key=lambda item: item[1], reverse=True)[:15]:
+        print(f"{cumulative / 1000:8.1f} ms  {module}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Server-side sessions: the SQLite file is only opened by the first request, and
+logging in or out moves the session to a new id and deletes the old one.
+"""
+
+import os
+
+from flask import Flask, session
+
+from portalflask.session_store import (SQLiteSessionBackend, ServerSideSessionInterface,
+                                       regenerate_session)
+
+
+def session_cookie(response):
+    """The session id the response sets ('' when it deletes the cookie), None if it leaves it alone"""
+    for header in response.headers.getlist('Set-Cookie'):
+        name, _, rest = header.partition('=')
+        if name == 'session':
+            value = rest.split(';', 1)[0]
+            return '' if 'Expires=Thu, 01 Jan 1970' in header else value
+    return None
+
+
+def test_login_and_logout_rotate_the_session_id(tmp_path):
+    path = str(tmp_path / 'sessions.sqlite3')
+    backend = SQLiteSessionBackend(path)
+    assert not os.path.exists(path)
+
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = ServerSideSessionInterface(backend)
+
+    @app.route('/visit')
+    def visit():
+        session['theme'] = 'dark'
+        return ''
+
+    @app.route('/login')
+    def login():
+        regenerate_session(session)
+        session['logged_in'] = True
+        return ''
+
+    @app.route('/logout')
+    def logout():
+        regenerate_session(session)
+        return ''
+
+    client = app.test_client()
+    planted = session_cookie(client.get('/visit'))
+    assert backend.load(planted) is not None
+
+    logged_in = session_cookie(client.get('/login'))
+    assert logged_in != planted
+    assert backend.load(planted) is None
+    assert backend.load(logged_in) is not None
+
+    assert session_cookie(client.get('/logout')) == ''
+    assert backend.load(logged_in) is None
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+The SQLite data backend (sqlite_store) and the repositories over it: documents,
+types and queries survive a reopen of the file, and repository reads and writes
+behave as they do against Firestore.
+"""
+
+from datetime import datetime
+
+from portalflask.sqlite_store import SQLiteBucket, SQLiteFirestore
+
+
+def test_documents_and_blobs_persist(tmp_path):
+    path = str(tmp_path / 'data.sqlite3')
+    db = SQLiteFirestore(path)
+    sent = datetime(2025, 3, 1, 9, 30)
+    db.collection('messages').document('m1').set({'batch_id': 'b1', 'timestamp': sent, 'read_by': []})
+    db.collection('messages').document('m2').set({'batch_id': 'b2', 'timestamp': sent, 'read_by': ['s1']})
+    db.collection('students').document('s1').collection('payments').document('p1').set({'amount': 500.0})
+    SQLiteBucket(path).blob('trainer_uploads/a.pdf').upload_from_string(b'%PDF', content_type='application/pdf')
+
+    reopened = SQLiteFirestore(path)
+    docs = list(reopened.collection('messages').where('batch_id', '==', 'b1').stream())
+    assert [doc.id for doc in docs] == ['m1'] and docs[0].to_dict()['timestamp'] == sent
+    assert [doc.reference.path for doc in reopened.collection_group('payments').stream()] == ['students/s1/payments/p1']
+    assert [collection.id for collection in reopened.collections()] == ['messages', 'students']
+    assert SQLiteBucket(path).blob('trainer_uploads/a.pdf').download_as_bytes() == b'%PDF'
+
+
+def test_repositories_over_sqlite(tmp_path):
+    from portalflask.firebase_config import FirebaseConfig
+    from portalflask.repositories import MessageRepo, TrackingRepo
+
+    config = FirebaseConfig()
+    config.use_clients(SQLiteFirestore(str(tmp_path / 'data.sqlite3')))
+    messages = MessageRepo(config)
+    for minute in range(3):
+        messages.add({'batch_id': 'b1', 'timestamp': datetime(2025, 3, 1, 9, minute), 'read_by': []})
+    assert [m['timestamp'].minute for m in messages.for_batch('b1')] == [2, 1, 0]
+    assert messages.mark_read('s1', 'b1') and all(m['read_by'] == ['s1'] for m in messages.for_batch('b1'))
+
+    tracking = TrackingRepo(config)
+    for trainer in ['A', 'B', 'C']:
+        tracking.add({'Trainer Name': trainer})
+    assert tracking.update_nth(1, {'Batch Name': 'Evening'}) and not tracking.delete_nth(3)
+    assert [r.get('Batch Name') for r in tracking.all()].count('Evening') == 1
+    assert tracking.get('missing') is None
+
+
+def test_projected_file_listing(tmp_path):
+    from portalflask.firebase_config import FirebaseConfig
+    from portalflask.repositories import FileRepo
+
+    path = str(tmp_path / 'data.sqlite3')
+    config = FirebaseConfig()
+    config.use_clients(SQLiteFirestore(path), SQLiteBucket(path))
+    files = FileRepo(config, config.storage_bucket)
+    # A legacy record: base64 copy but no has_base64_backup flag; and one with no source at all
+    files.add({'batch_id': 'b1', 'filename': 'old.pdf', 'file_data_base64': 'JVBERg=='})
+    files.add({'batch_id': 'b1', 'filename': 'gone.pdf', 'uploaded_to_storage': True})
+    listed = files.by_batch('b1', FileRepo.SOURCE_FIELDS)
+    assert all('file_data_base64' not in record for record in listed)
+    assert {record['filename']: files.is_orphaned(record) for record in listed} == {'old.pdf': False, 'gone.pdf': True}
+
+
+def test_spaced_field_names_are_quoted():
+    from portalflask.fake_firestore import FakeFirestore
+    from portalflask.firebase_config import FirebaseConfig
+    from portalflask.reporting_replica import TRACKING_FIELDS
+    from portalflask.repositories import TrackingRepo
+
+    config = FirebaseConfig()
+    config.use_clients(FakeFirestore())
+    tracking = TrackingRepo(config)
+    tracking.add({'Trainer Name': 'A', 'Batch Name': 'Morning', 'notes': 'not listed'})
+    assert [sorted(record) for record in tracking.all(TRACKING_FIELDS)] == [['Batch Name', 'Trainer Name', '_id']]
+    assert len(tracking.by_trainer('A')) == 1
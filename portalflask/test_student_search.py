@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+The in-process student search index: substring, phone-digit and fuzzy matches,
+upserts and removals, and background rebuilds that keep serving the current
+index and do not lose writes made while they load.
+"""
+
+import threading
+import time
+
+from portalflask.student_search import StudentSearchIndex
+
+STUDENTS = [
+    {'_id': 'MDA 9876543210', 'student_id': 'MDA 9876543210', 'student_name': 'Priya Reddy',
+     'student_number': '98765 43210', 'email': 'priya@example.com', 'batch_time': 'Morning'},
+    {'_id': 'EPE 9123456780', 'student_id': 'EPE 9123456780', 'student_name': 'Karthik Rao',
+     'student_number': '9123456780', 'email': 'karthik@example.com', 'batch_time': 'Evening'},
+]
+
+
+def names(results):
+    return [result['student_name'] for result in results]
+
+
+def test_search_matches_and_upserts():
+    index = StudentSearchIndex(lambda: [dict(student) for student in STUDENTS])
+    assert names(index.search('pri')) == ['Priya Reddy']
+    assert names(index.search('43210')) == ['Priya Reddy']  # phone digits, whatever the formatting
+    assert names(index.search('karthk')) == ['Karthik Rao']  # fuzzy
+    assert index.search('EPE 9123456780')[0]['batch_time'] == 'Evening'
+
+    index.upsert('EPE 9123456780', {'student_name': 'Karthik Iyer'})
+    assert names(index.search('iyer')) == ['Karthik Iyer'] and index.search('rao') == []
+    index.upsert('NEW', {'student_id': 'NEW', 'student_name': 'Meera Das'})
+    assert names(index.search('meera')) == ['Meera Das']
+    index.remove('NEW')
+    assert index.search('meera') == []
+
+
+def test_rebuild_keeps_serving_and_replays_writes():
+    loading, release = threading.Event(), threading.Event()
+    students = [dict(student) for student in STUDENTS]
+
+    def slow_loader():
+        loading.set()
+        release.wait(5)
+        return students
+
+    index = StudentSearchIndex(lambda: students)
+    assert names(index.search('priya')) == ['Priya Reddy']
+    index._loader = slow_loader
+    index.invalidate()
+
+    # The next search starts a background rebuild and answers from the current index meanwhile
+    assert names(index.search('priya')) == ['Priya Reddy']
+    assert loading.wait(5)
+    index.upsert('NEW', {'student_id': 'NEW', 'student_name': 'Meera Das'})
+    release.set()
+    for _ in range(100):
+        if not index._rebuilding:
+            break
+        time.sleep(0.01)
+    assert names(index.search('meera')) == ['Meera Das']